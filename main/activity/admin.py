@@ -0,0 +1,25 @@
+from django.contrib import admin
+from main.utils.admin import InputFilter, LargeTableAdmin
+from .models import Activity
+
+
+class ProjectFilter(InputFilter):
+    title = "project id"
+    parameter_name = "project"
+    lookup = "project_id"
+
+
+@admin.register(Activity)
+class ActivityAdmin(LargeTableAdmin):
+    list_display = ["timestamp", "actor_username", "verb", "target_type", "target_title", "project_id"]
+    list_filter = [ProjectFilter, "verb", "target_type"]
+
+    # The log is append-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
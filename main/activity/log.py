@@ -0,0 +1,129 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.db import transaction
+from .models import Activity
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT when a buffer is written
+ACTIVITY_BATCH_SIZE = 500
+# A buffer holding more entries than this (a big import) is written early
+ACTIVITY_BUFFER_LIMIT = 5000
+
+TARGET_TYPES = {"items": Activity.Target.ITEM, "project": Activity.Target.PROJECT}
+
+
+class ActivityBuffer:
+    def __init__(self, actor=None):
+        # Who entries are attributed to unless `record` is told otherwise
+        self.actor = actor
+        self.entries = []
+        self.closed = False
+
+    def add(self, entries):
+        self.entries.extend(entries)
+        # After close, entries from a transaction that outlived the buffer are
+        # written straight away rather than lost
+        if self.closed or len(self.entries) >= ACTIVITY_BUFFER_LIMIT:
+            self.flush()
+
+    def flush(self):
+        entries, self.entries = self.entries, []
+        write_entries(entries)
+
+    def close(self):
+        self.closed = True
+        self.flush()
+
+
+def write_entries(entries):
+    if entries:
+        Activity.objects.bulk_create(entries, batch_size=ACTIVITY_BATCH_SIZE)  # type: ignore
+
+
+# Set by ActivityMiddleware for a request and by `buffered()` around bulk work.
+# Like the replica routing state, a mutable object so entries recorded on
+# sync_to_async threads land in the same buffer.
+_buffer: ContextVar = ContextVar("activity_buffer", default=None)
+
+
+@contextmanager
+def collect(actor=None):
+    """Collect entries recorded in the block; the caller writes them with `close()`."""
+    buffer = ActivityBuffer(actor)
+    token = _buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _buffer.reset(token)
+
+
+@contextmanager
+def buffered(actor=None):
+    """
+    Write the entries recorded in the block in one batch when it ends.
+
+    Inside a request (or another `buffered` block) the entries simply join the
+    outer buffer, so a request writes its whole log in one go.
+    """
+    current = _buffer.get()
+    if current is not None:
+        yield current
+        return
+    with collect(actor) as buffer:
+        try:
+            yield buffer
+        finally:
+            buffer.close()
+
+
+def resolve_actor(actor):
+    if actor is None:
+        buffer = _buffer.get()
+        actor = buffer.actor if buffer is not None else None
+    if actor is None or not actor.is_authenticated:
+        return None
+    return actor
+
+
+def add_entries(entries):
+    buffer = _buffer.get()
+    # Entries only count once the change they describe has committed
+    if buffer is None:
+        # Outside requests and `buffered` blocks (shell, jobs) there's nothing to batch with
+        transaction.on_commit(lambda: write_entries(entries))
+    else:
+        transaction.on_commit(lambda: buffer.add(entries))
+
+
+def record_many(verb, target_type, targets, project_id, actor=None):
+    """
+    Log `verb` for each `(id, title)` in `targets`, all within one project.
+
+    Nothing is written yet: the entries wait in the current buffer until the
+    response has been sent (or the `buffered` block ends), and are dropped if
+    the surrounding transaction rolls back.
+    """
+    actor = resolve_actor(actor)
+    entries = [
+        Activity(
+            project_id=project_id,
+            actor_id=actor.pk if actor else None,
+            actor_username=actor.get_username() if actor else "",
+            verb=verb,
+            target_type=target_type,
+            target_id=pk,
+            target_title=title[:120],
+        )
+        for pk, title in targets
+    ]
+    if entries:
+        add_entries(entries)
+
+
+def record(verb, target, actor=None):
+    """Log `verb` for one item or project."""
+    target_type = TARGET_TYPES[target._meta.model_name]
+    project_id = target.pk if target_type == Activity.Target.PROJECT else target.project_id
+    record_many(verb, target_type, [(target.pk, target.title)], project_id, actor)
@@ -0,0 +1,50 @@
+import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from .log import collect
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityMiddleware:
+    """
+    Buffer the activity entries a request records and write them in one
+    INSERT once the response has been sent.
+
+    The write is hooked onto `response.close()`, which servers call after the
+    last byte goes out, so it adds nothing to the response time. Put it after
+    AuthenticationMiddleware: entries are attributed to `request.user`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with collect(request.user) as buffer:
+            response = self.get_response(request)
+        return self.finish(response, buffer)
+
+    async def __acall__(self, request):
+        with collect(request.user) as buffer:
+            response = await self.get_response(request)
+        return self.finish(response, buffer)
+
+    def finish(self, response, buffer):
+        # The hook FileResponse uses to close its file after sending it
+        response._resource_closers.append(lambda: self.close(buffer))
+        return response
+
+    def close(self, buffer):
+        count = len(buffer.entries)
+        try:
+            buffer.close()
+        except Exception:
+            # The response is already out; losing the entries beats a 500 nobody sees
+            logger.exception("Failed to write %s activity entries", count)
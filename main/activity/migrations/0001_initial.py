@@ -0,0 +1,38 @@
+# Generated by Django 4.2.24 on 2026-10-18 05:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('projects', '0006_project_projects_ts_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Activity',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('actor_username', models.CharField(blank=True, max_length=150)),
+                ('verb', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted'), ('moved', 'Moved'), ('activated', 'Activated')], max_length=10)),
+                ('target_type', models.CharField(choices=[('item', 'Item'), ('project', 'Project')], max_length=10)),
+                ('target_id', models.BigIntegerField()),
+                ('target_title', models.CharField(max_length=120)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='activity', to='projects.project')),
+            ],
+            options={
+                'verbose_name_plural': 'Activity',
+                'ordering': ['-timestamp', 'id'],
+                'indexes': [models.Index(fields=['project', '-timestamp', 'id'], name='activity_project_ts_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+User = settings.AUTH_USER_MODEL
+
+
+class Activity(models.Model):
+    """
+    One entry in the append-only activity log.
+
+    Rows are only ever inserted (in batches, see activity.log) and read newest
+    first per project. The foreign keys have no database constraints so an
+    insert never has to check or lock the parent rows, and entries outlive the
+    project, item or user they describe; the titles are copied for that reason.
+    """
+
+    class Verb(models.TextChoices):
+        CREATED = "created", "Created"
+        UPDATED = "updated", "Updated"
+        DELETED = "deleted", "Deleted"
+        MOVED = "moved", "Moved"
+        ACTIVATED = "activated", "Activated"
+
+    class Target(models.TextChoices):
+        ITEM = "item", "Item"
+        PROJECT = "project", "Project"
+
+    id = models.BigAutoField(primary_key=True)
+    project = models.ForeignKey(
+        "projects.Project",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="activity",
+    )
+    actor = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name="+"
+    )
+    actor_username = models.CharField(max_length=150, blank=True)
+    verb = models.CharField(max_length=10, choices=Verb.choices)
+    target_type = models.CharField(max_length=10, choices=Target.choices)
+    target_id = models.BigIntegerField()
+    target_title = models.CharField(max_length=120)
+    # When it happened, not when the buffered row was written
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-timestamp", "id"]
+        indexes = [
+            # The feed and time-range queries: one project, newest first
+            models.Index(
+                fields=["project", "-timestamp", "id"], name="activity_project_ts_idx"
+            ),
+        ]
+        verbose_name_plural = "Activity"
+
+    def __str__(self):
+        return f"{self.actor_username or 'Someone'} {self.verb} {self.target_type} '{self.target_title}'"
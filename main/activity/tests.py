@@ -0,0 +1,127 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from items.bulk import bulk_move
+from items.models import Items
+from projects.middleware import store_active_project
+from projects.models import Project
+from . import log
+from .log import buffered
+from .models import Activity
+
+User = get_user_model()
+
+TEST_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+def feed(project):
+    return list(
+        Activity.objects.filter(project=project)
+        .order_by("timestamp", "id")
+        .values_list("actor_username", "verb", "target_type", "target_title")
+    )
+
+
+class ActivityBufferTests(TransactionTestCase):
+    # Entries wait for commits, which a TestCase never makes
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.project = Project.objects.create(owner=self.user, title="Launch")
+        Activity.objects.all().delete()
+
+    def test_block_is_written_in_one_insert_at_the_end(self):
+        with buffered(self.user):
+            item = Items.objects.create(project=self.project, title="First")
+            item.title = "Renamed"
+            item.save()
+            item.delete()
+            self.assertEqual(Activity.objects.count(), 0)
+        self.assertEqual(
+            feed(self.project),
+            [
+                ("owner", "created", "item", "First"),
+                ("owner", "updated", "item", "Renamed"),
+                ("owner", "deleted", "item", "Renamed"),
+            ],
+        )
+
+    def test_rolled_back_changes_are_not_logged(self):
+        with buffered(self.user):
+            try:
+                with transaction.atomic():
+                    Items.objects.create(project=self.project, title="Doomed")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(feed(self.project), [])
+
+    def test_bulk_move_appears_in_both_projects(self):
+        other = Project.objects.create(owner=self.user, title="Other")
+        items = [Items.objects.create(project=self.project, title=f"Item {i}") for i in range(3)]
+        Activity.objects.all().delete()
+        # One transaction of SELECT, UPDATE items, two counter UPDATEs and the
+        # board columns (the target's is created on first use: UPDATE, INSERT,
+        # UPDATE), then one INSERT for all six entries in its own
+        with self.assertNumQueries(13):
+            bulk_move(self.project, [item.pk for item in items], other, self.user)
+        self.assertEqual(len(feed(self.project)), 3)
+        self.assertEqual(len(feed(other)), 3)
+
+    def test_request_writes_after_the_response(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        session = self.client.session
+        store_active_project(session, self.project)
+        session.save()
+        with override_settings(STORAGES=TEST_STORAGES):
+            writes = []
+            original = log.write_entries
+            log.write_entries = lambda entries: writes.append(len(entries)) or original(entries)
+            try:
+                self.client.post("/items/create/", {"title": "From a request"})
+            finally:
+                log.write_entries = original
+        self.assertEqual(writes, [1])
+        self.assertIn(("owner", "created", "item", "From a request"), feed(self.project))
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class ActivityFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.project = Project.objects.create(owner=self.user, title="Launch")
+        self.client.force_login(self.user)
+        Activity.objects.bulk_create(
+            Activity(
+                project=self.project,
+                actor_username="owner",
+                verb="updated",
+                target_type="item",
+                target_id=i,
+                target_title=f"Entry {i}",
+            )
+            for i in range(30)
+        )
+
+    def test_feed_is_keyset_paginated_on_the_project_page(self):
+        url = f"/projects/{self.project.handle}/"
+        response = self.client.get(url)
+        page = response.context["activity"]
+        self.assertEqual(len(page), 24)
+        self.assertTrue(page.has_next)
+        response = self.client.get(url, {"cursor": page.next_cursor})
+        self.assertEqual(len(response.context["activity"]), 6)
+
+    def test_new_activity_changes_the_etag(self):
+        url = f"/projects/{self.project.handle}/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Activity.objects.create(
+            project=self.project, verb="updated", target_type="item", target_id=1, target_title="Late"
+        )
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
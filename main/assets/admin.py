@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Asset
+
+
+@admin.register(Asset)
+class AssetAdmin(admin.ModelAdmin):
+    list_display = ["filename", "project", "kind", "status", "size", "timestamp"]
+    list_filter = ["kind", "status"]
+    list_select_related = ["project"]
+    readonly_fields = ["bytes_received", "chunk_count", "checksum", "timestamp", "updated"]
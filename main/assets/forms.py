@@ -0,0 +1,17 @@
+from django import forms
+from django.conf import settings
+from .models import Asset
+
+
+class AssetCreateForm(forms.ModelForm):
+    class Meta:
+        model = Asset
+        fields = ["filename", "size", "content_type"]
+
+    def clean_size(self):
+        size = self.cleaned_data.get("size")
+        if size is None or size <= 0:
+            raise forms.ValidationError("Size must be a positive number of bytes.")
+        if size > settings.ASSET_MAX_SIZE:
+            raise forms.ValidationError("File is too large.")
+        return size
@@ -0,0 +1,27 @@
+"""
+Image resizing run inside derivative worker processes.
+
+Kept free of Django imports so workers can be started with any
+multiprocessing start method without configuring settings.
+"""
+import io
+from PIL import Image, ImageOps
+
+
+def render_derivatives(source, specs):
+    """
+    Resize `source` image bytes to every spec, returning
+    {kind: (jpeg_bytes, width, height)}.
+    """
+    results = {}
+    with Image.open(io.BytesIO(source)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        for kind, (max_width, max_height, quality) in specs.items():
+            derivative = image.copy()
+            derivative.thumbnail((max_width, max_height))
+            buffer = io.BytesIO()
+            derivative.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+            results[kind] = (buffer.getvalue(), derivative.width, derivative.height)
+    return results
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from assets.derivatives import benchmark, default_worker_count, generate_derivatives
+from assets.models import Asset
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnails and web previews for image assets in a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", help="Only assets of this project handle")
+        parser.add_argument("--asset", type=int, action="append", help="Asset id (repeatable)")
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument("--force", action="store_true", help="Rebuild up-to-date derivatives")
+        parser.add_argument(
+            "--benchmark",
+            type=int,
+            metavar="N",
+            help="Resize N synthetic images and report throughput instead",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"] or default_worker_count()
+        if options["benchmark"]:
+            run = benchmark(options["benchmark"], workers=workers)
+        else:
+            queryset = Asset.objects.all()  # type: ignore
+            if options["project"]:
+                queryset = queryset.filter(project__handle=options["project"])
+            if options["asset"]:
+                queryset = queryset.filter(pk__in=options["asset"])
+            run = generate_derivatives(queryset, workers=workers, force=options["force"])
+            self.stdout.write(
+                f"Processed {run.processed}, skipped {run.skipped} up to date, "
+                f"{run.failed} failed."
+            )
+        self.stdout.write(
+            f"{run.images_per_second:.1f} images/s on {run.workers} workers "
+            f"({run.images_per_second_per_core:.1f} images/s/core)"
+        )
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.24 on 2026-10-18 04:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('projects', '0002_project_projects_owner_ts_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Asset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255)),
+                ('content_type', models.CharField(blank=True, max_length=120)),
+                ('kind', models.CharField(choices=[('file', 'File'), ('image', 'Image'), ('video', 'Video')], default='file', max_length=10)),
+                ('size', models.BigIntegerField(help_text='Declared total size in bytes')),
+                ('bytes_received', models.BigIntegerField(default=0)),
+                ('chunk_count', models.PositiveIntegerField(default=0)),
+                ('checksum', models.CharField(blank=True, max_length=64)),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('complete', 'Complete'), ('failed', 'Failed')], default='uploading', max_length=10)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assets', to='projects.project')),
+                ('uploaded_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assets_uploaded', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AssetChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField()),
+                ('name', models.CharField(help_text='Storage name of this part', max_length=255)),
+                ('size', models.PositiveIntegerField()),
+                ('sha256', models.CharField(max_length=64)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='assets.asset')),
+            ],
+            options={
+                'ordering': ['index'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='assetchunk',
+            constraint=models.UniqueConstraint(fields=('asset', 'index'), name='asset_chunk_unique_index'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['project', '-timestamp'], name='assets_project_ts_idx'),
+        ),
+    ]
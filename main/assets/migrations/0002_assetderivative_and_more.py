@@ -0,0 +1,33 @@
+# Generated by Django 4.2.24 on 2026-10-18 04:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetDerivative',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('thumbnail', 'Thumbnail'), ('preview', 'Web preview')], max_length=20)),
+                ('name', models.CharField(help_text='Storage name of the derivative', max_length=255)),
+                ('content_type', models.CharField(max_length=120)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('bytes', models.PositiveIntegerField()),
+                ('source_checksum', models.CharField(max_length=64)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='derivatives', to='assets.asset')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='assetderivative',
+            constraint=models.UniqueConstraint(fields=('asset', 'kind'), name='asset_derivative_unique_kind'),
+        ),
+    ]
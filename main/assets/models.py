@@ -0,0 +1,137 @@
+import hashlib
+import uuid
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import models
+from projects.models import Project
+
+User = settings.AUTH_USER_MODEL
+
+
+class Asset(models.Model):
+    class Kind(models.TextChoices):
+        FILE = "file", "File"
+        IMAGE = "image", "Image"
+        VIDEO = "video", "Video"
+
+    class Status(models.TextChoices):
+        UPLOADING = "uploading", "Uploading"
+        COMPLETE = "complete", "Complete"
+        FAILED = "failed", "Failed"
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="assets")
+    uploaded_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, related_name="assets_uploaded"
+    )
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=120, blank=True)
+    kind = models.CharField(max_length=10, choices=Kind.choices, default=Kind.FILE)
+    size = models.BigIntegerField(help_text="Declared total size in bytes")
+    bytes_received = models.BigIntegerField(default=0)
+    chunk_count = models.PositiveIntegerField(default=0)
+    checksum = models.CharField(max_length=64, blank=True)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.UPLOADING
+    )
+    updated = models.DateTimeField(auto_now=True)
+    timestamp = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["project", "-timestamp"], name="assets_project_ts_idx"),
+        ]
+
+    def __str__(self):
+        return self.filename
+
+    @staticmethod
+    def kind_for(content_type):
+        major = (content_type or "").split("/", 1)[0]
+        if major == "image":
+            return Asset.Kind.IMAGE
+        if major == "video":
+            return Asset.Kind.VIDEO
+        return Asset.Kind.FILE
+
+    @property
+    def storage_prefix(self):
+        return f"assets/{self.project_id}/{self.pk}"  # type: ignore
+
+    def chunk_name(self, index):
+        """
+        A fresh storage name for an attempt at chunk `index`.
+
+        Unique per attempt: S3-style storages overwrite on save, so requests
+        racing on one index must never write (or delete) the same object.
+        """
+        return f"{self.storage_prefix}/parts/{index:06d}-{uuid.uuid4().hex[:12]}"
+
+    def upload_state(self):
+        return {
+            "id": self.pk,
+            "filename": self.filename,
+            "status": self.status,
+            "size": self.size,
+            "bytes_received": self.bytes_received,
+            "next_chunk": self.chunk_count,
+            "chunk_size": settings.ASSET_CHUNK_SIZE,
+            "checksum": self.checksum,
+        }
+
+    def compute_checksum(self):
+        """SHA-256 over the ordered per-chunk SHA-256 digests (a one-level hash tree)."""
+        digest = hashlib.sha256()
+        for chunk_digest in self.chunks.values_list("sha256", flat=True):  # type: ignore
+            digest.update(bytes.fromhex(chunk_digest))
+        return digest.hexdigest()
+
+    def iter_content(self, storage=None):
+        """Yield the asset's bytes part by part, straight from storage."""
+        storage = storage or default_storage
+        for name in self.chunks.values_list("name", flat=True):  # type: ignore
+            with storage.open(name, "rb") as part:
+                yield from iter(lambda: part.read(64 * 1024), b"")
+
+
+class AssetChunk(models.Model):
+    asset = models.ForeignKey(Asset, on_delete=models.CASCADE, related_name="chunks")
+    index = models.PositiveIntegerField()
+    name = models.CharField(max_length=255, help_text="Storage name of this part")
+    size = models.PositiveIntegerField()
+    sha256 = models.CharField(max_length=64)
+    timestamp = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["index"]
+        constraints = [
+            models.UniqueConstraint(fields=["asset", "index"], name="asset_chunk_unique_index"),
+        ]
+
+    def __str__(self):
+        return f"{self.asset_id}#{self.index}"  # type: ignore
+
+
+class AssetDerivative(models.Model):
+    class Kind(models.TextChoices):
+        THUMBNAIL = "thumbnail", "Thumbnail"
+        PREVIEW = "preview", "Web preview"
+
+    asset = models.ForeignKey(Asset, on_delete=models.CASCADE, related_name="derivatives")
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    name = models.CharField(max_length=255, help_text="Storage name of the derivative")
+    content_type = models.CharField(max_length=120)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    bytes = models.PositiveIntegerField()
+    # Re-processing is skipped while this still matches the asset's checksum
+    source_checksum = models.CharField(max_length=64)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["asset", "kind"], name="asset_derivative_unique_kind"),
+        ]
+
+    def __str__(self):
+        return f"{self.asset_id} {self.kind}"  # type: ignore
@@ -0,0 +1,10 @@
+from jobs.queue import task
+from .derivatives import build_derivatives
+from .models import Asset
+
+
+@task(queue="default")
+def generate_asset_derivatives(asset_id):
+    asset = Asset.objects.filter(pk=asset_id).first()  # type: ignore
+    if asset is not None:
+        build_derivatives(asset)
@@ -0,0 +1,185 @@
+import hashlib
+import io
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.storage import InMemoryStorage, default_storage
+from django.test import TestCase, override_settings
+from projects.middleware import store_active_project
+from projects.models import Project
+from .derivatives import build_derivatives, generate_derivatives, shutdown_render_pool
+from .models import Asset, AssetDerivative
+from .uploads import commit_chunk
+
+User = get_user_model()
+
+
+class AssetTestCase(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, ASSET_CHUNK_SIZE=4)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.project = Project.objects.create(owner=self.user, title="Launch")
+        self.client.force_login(self.user)
+        session = self.client.session
+        store_active_project(session, self.project)
+        session.save()
+
+    def start(self, data, filename="clip.mp4", content_type="video/mp4"):
+        response = self.client.post(
+            "/assets/uploads/",
+            {"filename": filename, "size": len(data), "content_type": content_type},
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def put_chunk(self, asset_id, index, data):
+        return self.client.generic(
+            "PUT",
+            f"/assets/uploads/{asset_id}/chunks/{index}/",
+            data,
+            content_type="application/octet-stream",
+        )
+
+
+class AssetUploadTests(AssetTestCase):
+    def test_chunked_upload_round_trip(self):
+        data = b"0123456789"
+        state = self.start(data)
+        for index, offset in enumerate(range(0, len(data), 4)):
+            response = self.put_chunk(state["id"], index, data[offset : offset + 4])
+            self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(f"/assets/uploads/{state['id']}/complete/")
+        self.assertEqual(response.json()["status"], "complete")
+
+        asset = Asset.objects.get(pk=state["id"])
+        self.assertEqual(asset.kind, Asset.Kind.VIDEO)
+        self.assertEqual(b"".join(asset.iter_content()), data)
+        expected = hashlib.sha256(
+            b"".join(
+                hashlib.sha256(data[i : i + 4]).digest() for i in range(0, len(data), 4)
+            )
+        ).hexdigest()
+        self.assertEqual(asset.checksum, expected)
+
+    def test_interrupted_upload_resumes_from_last_committed_chunk(self):
+        data = b"abcdefgh"
+        state = self.start(data)
+        self.put_chunk(state["id"], 0, data[:4])
+
+        status = self.client.get(f"/assets/uploads/{state['id']}/").json()
+        self.assertEqual(status["next_chunk"], 1)
+        self.assertEqual(status["bytes_received"], 4)
+
+        # A retried chunk is accepted without being stored twice
+        self.assertEqual(self.put_chunk(state["id"], 0, data[:4]).status_code, 200)
+        # Skipping ahead is refused
+        self.assertEqual(self.put_chunk(state["id"], 2, b"zz").status_code, 409)
+
+        self.put_chunk(state["id"], 1, data[4:])
+        self.client.post(f"/assets/uploads/{state['id']}/complete/")
+        asset = Asset.objects.get(pk=state["id"])
+        self.assertEqual(asset.chunks.count(), 2)
+        self.assertEqual(b"".join(asset.iter_content()), data)
+
+    def test_losing_a_chunk_race_leaves_the_winners_object(self):
+        state = self.start(b"abcd")
+        stale = Asset.objects.get(pk=state["id"])
+        # Saves overwrite, as on S3
+        storage = InMemoryStorage()
+        storage.get_available_name = lambda name, max_length=None: name
+
+        commit_chunk(Asset.objects.get(pk=stale.pk), 0, io.BytesIO(b"abcd"), 4, storage)
+        # A duplicate that passed its checks before the first one committed
+        commit_chunk(stale, 0, io.BytesIO(b"abcd"), 4, storage)
+
+        (chunk,) = stale.chunks.all()
+        with storage.open(chunk.name) as stored:
+            self.assertEqual(stored.read(), b"abcd")
+        # The loser removed only its own object
+        _, files = storage.listdir(f"{stale.storage_prefix}/parts")
+        self.assertEqual(files, [chunk.name.rsplit("/", 1)[1]])
+
+    def test_rejects_oversized_and_incomplete_uploads(self):
+        state = self.start(b"abcdef")
+        self.assertEqual(self.put_chunk(state["id"], 0, b"abcde").status_code, 400)
+        self.put_chunk(state["id"], 0, b"abcd")
+        response = self.client.post(f"/assets/uploads/{state['id']}/complete/")
+        self.assertEqual(response.status_code, 409)
+
+
+class AssetDerivativeTests(AssetTestCase):
+    def upload_image(self, width=800, height=600):
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (width, height), "teal").save(buffer, "PNG")
+        data = buffer.getvalue()
+        with override_settings(ASSET_CHUNK_SIZE=len(data)):
+            state = self.start(data, filename="cover.png", content_type="image/png")
+            self.put_chunk(state["id"], 0, data)
+            self.client.post(f"/assets/uploads/{state['id']}/complete/")
+        return Asset.objects.get(pk=state["id"])
+
+    def test_generates_thumbnail_and_preview(self):
+        asset = self.upload_image()
+        run = generate_derivatives(Asset.objects.all(), workers=1)
+        self.assertEqual((run.processed, run.failed), (1, 0))
+
+        derivatives = {d.kind: d for d in asset.derivatives.all()}
+        thumbnail = derivatives[AssetDerivative.Kind.THUMBNAIL]
+        self.assertEqual((thumbnail.width, thumbnail.height), (320, 240))
+        self.assertEqual(thumbnail.name, f"{asset.storage_prefix}/derivatives/thumbnail.jpg")
+        self.assertEqual(thumbnail.source_checksum, asset.checksum)
+        # Never upscaled past the original
+        preview = derivatives[AssetDerivative.Kind.PREVIEW]
+        self.assertEqual((preview.width, preview.height), (800, 600))
+        self.assertEqual(default_storage.size(thumbnail.name), thumbnail.bytes)
+
+    def test_job_path_renders_in_the_pool(self):
+        asset = self.upload_image()
+        self.addCleanup(shutdown_render_pool)
+        with mock.patch.object(
+            ProcessPoolExecutor, "submit", autospec=True, side_effect=ProcessPoolExecutor.submit
+        ) as submit:
+            self.assertTrue(build_derivatives(asset))
+        submit.assert_called_once()
+        self.assertEqual(asset.derivatives.count(), 2)
+
+    def test_batch_pool_is_spawned(self):
+        self.upload_image()
+        with mock.patch(
+            "assets.derivatives.ProcessPoolExecutor", wraps=ProcessPoolExecutor
+        ) as executor:
+            run = generate_derivatives(Asset.objects.all(), workers=1)
+        self.assertEqual(run.processed, 1)
+        self.assertEqual(executor.call_args.kwargs["mp_context"].get_start_method(), "spawn")
+        # The queryset's connection stays usable; nothing closed it under us
+        self.assertEqual(AssetDerivative.objects.count(), 2)
+
+    def test_failures_are_logged_with_the_asset(self):
+        asset = self.upload_image()
+        with default_storage.open(asset.chunks.get().name, "wb") as broken:
+            broken.write(b"not an image")
+        with self.assertLogs("assets.derivatives", "ERROR") as logs:
+            run = generate_derivatives(Asset.objects.all(), workers=1)
+        self.assertEqual(run.failed, 1)
+        self.assertIn(f"Derivatives failed for asset {asset.pk}", logs.output[0])
+        self.assertIn("Traceback", logs.output[0])
+
+    def test_reprocessing_is_idempotent(self):
+        asset = self.upload_image()
+        generate_derivatives(Asset.objects.all(), workers=1)
+        run = generate_derivatives(Asset.objects.all(), workers=1)
+        self.assertEqual((run.processed, run.skipped), (0, 1))
+
+        run = generate_derivatives(Asset.objects.all(), workers=1, force=True)
+        self.assertEqual(run.processed, 1)
+        self.assertEqual(asset.derivatives.count(), 2)
@@ -0,0 +1,104 @@
+import hashlib
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from .models import Asset, AssetChunk
+from .tasks import generate_asset_derivatives
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class HashingReader:
+    """
+    Read at most `limit` bytes from `stream`, hashing and counting as we go.
+
+    Storage backends pull from this in small blocks, so a chunk goes from the
+    socket to storage without being held in memory or spooled to /tmp.
+    """
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.remaining = limit
+        self.bytes_read = 0
+        self.digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.stream.read(size)
+        self.remaining -= len(data)
+        self.bytes_read += len(data)
+        self.digest.update(data)
+        return data
+
+
+def commit_chunk(asset, index, stream, length, storage=None):
+    """
+    Stream one chunk into storage and record it, returning the refreshed asset.
+
+    Chunks must arrive in order; re-sending an already committed chunk is a
+    no-op so clients can safely retry after a dropped connection. Each attempt
+    writes its own object, recorded on the chunk row, so a request that loses
+    a race for an index only ever deletes what it wrote itself.
+    """
+    storage = storage or default_storage
+
+    if asset.status != Asset.Status.UPLOADING:
+        raise UploadError("Upload is already finished", status=409)
+    if index < asset.chunk_count:
+        return asset
+    if index > asset.chunk_count:
+        raise UploadError(f"Expected chunk {asset.chunk_count}", status=409)
+    if length <= 0 or length > settings.ASSET_CHUNK_SIZE:
+        raise UploadError(f"Chunk must be 1..{settings.ASSET_CHUNK_SIZE} bytes")
+    if asset.bytes_received + length > asset.size:
+        raise UploadError("Chunk exceeds the declared file size")
+
+    reader = HashingReader(stream, length)
+    name = storage.save(asset.chunk_name(index), File(reader, name=asset.filename))
+    if reader.bytes_read != length:
+        storage.delete(name)
+        raise UploadError("Chunk body was shorter than Content-Length")
+
+    with transaction.atomic():
+        locked = Asset.objects.select_for_update().get(pk=asset.pk)
+        if locked.chunk_count != index:
+            # Another request committed this index first; `name` is ours alone
+            storage.delete(name)
+            return locked
+        AssetChunk.objects.create(
+            asset=locked,
+            index=index,
+            name=name,
+            size=length,
+            sha256=reader.digest.hexdigest(),
+        )
+        Asset.objects.filter(pk=asset.pk).update(
+            chunk_count=F("chunk_count") + 1,
+            bytes_received=F("bytes_received") + length,
+        )
+    asset.refresh_from_db()
+    return asset
+
+
+def complete_upload(asset):
+    if asset.status == Asset.Status.COMPLETE:
+        return asset
+    if asset.bytes_received != asset.size:
+        raise UploadError(
+            f"Received {asset.bytes_received} of {asset.size} bytes", status=409
+        )
+    asset.checksum = asset.compute_checksum()
+    asset.status = Asset.Status.COMPLETE
+    asset.save(update_fields=["checksum", "status", "updated"])
+    if asset.kind == Asset.Kind.IMAGE:
+        transaction.on_commit(lambda: generate_asset_derivatives.enqueue(asset.pk))
+    return asset
@@ -0,0 +1,19 @@
+from django.urls import path
+from . import views
+
+app_name = "assets"
+
+urlpatterns = [
+    path("uploads/", views.asset_upload_create_view, name="upload_create"),
+    path("uploads/<int:id>/", views.asset_upload_status_view, name="upload_status"),
+    path(
+        "uploads/<int:id>/chunks/<int:index>/",
+        views.asset_chunk_upload_view,
+        name="upload_chunk",
+    ),
+    path(
+        "uploads/<int:id>/complete/",
+        views.asset_upload_complete_view,
+        name="upload_complete",
+    ),
+]
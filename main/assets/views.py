@@ -0,0 +1,82 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+from projects.permissions import CHANGE_ITEMS, role_allows
+from .forms import AssetCreateForm
+from .models import Asset
+from .uploads import UploadError, commit_chunk, complete_upload
+
+
+def active_project_required(request):
+    if getattr(request, "active_project", None) is None:
+        return JsonResponse({"error": "Please activate a project first."}, status=400)
+    # Every step of an upload adds content to the project
+    if not role_allows(request.project_role, CHANGE_ITEMS):
+        return JsonResponse({"error": "You can't upload to this project."}, status=403)
+    return None
+
+
+@login_required
+@require_POST
+def asset_upload_create_view(request):
+    """Start an upload session; the client then PUTs chunks in order."""
+    error = active_project_required(request)
+    if error:
+        return error
+
+    form = AssetCreateForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    asset = form.save(commit=False)
+    asset.project = request.active_project
+    asset.uploaded_by = request.user
+    asset.kind = Asset.kind_for(asset.content_type)
+    asset.save()
+    return JsonResponse(asset.upload_state(), status=201)
+
+
+@login_required
+@require_GET
+def asset_upload_status_view(request, id=None):
+    """Where to resume: `next_chunk` is the first index not yet committed."""
+    error = active_project_required(request)
+    if error:
+        return error
+
+    asset = get_object_or_404(Asset, id=id, project=request.active_project)
+    return JsonResponse(asset.upload_state())
+
+
+@login_required
+@require_http_methods(["PUT"])
+def asset_chunk_upload_view(request, id=None, index=None):
+    error = active_project_required(request)
+    if error:
+        return error
+
+    asset = get_object_or_404(Asset, id=id, project=request.active_project)
+    try:
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+        # Read the raw body as a stream; request.body would load it into memory
+        asset = commit_chunk(asset, index, request, length)
+    except ValueError:
+        return JsonResponse({"error": "Invalid Content-Length"}, status=400)
+    except UploadError as exc:
+        return JsonResponse({"error": str(exc), **asset.upload_state()}, status=exc.status)
+    return JsonResponse(asset.upload_state())
+
+
+@login_required
+@require_POST
+def asset_upload_complete_view(request, id=None):
+    error = active_project_required(request)
+    if error:
+        return error
+
+    asset = get_object_or_404(Asset, id=id, project=request.active_project)
+    try:
+        asset = complete_upload(asset)
+    except UploadError as exc:
+        return JsonResponse({"error": str(exc), **asset.upload_state()}, status=exc.status)
+    return JsonResponse(asset.upload_state())
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from benchmarks.seeding import seed, use_memory_databases
+from benchmarks.servers import compare_servers
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and serve the same pages through the WSGI "
+        "handler (a fixed pool of worker threads) and the ASGI handler (one event "
+        "loop) at rising concurrency, reporting throughput and latency for each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", default="1,8,32,128", help="Requests in flight, comma separated"
+        )
+        parser.add_argument("--requests", type=int, default=200, help="Requests per level")
+        parser.add_argument(
+            "--workers", type=int, default=4, help="WSGI worker threads (the fixed budget)"
+        )
+        parser.add_argument("--items", type=int, default=1000, help="Items per project")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options["concurrency"].split(",")]
+        except ValueError:
+            raise CommandError("--concurrency must be comma separated integers")
+
+        setup_test_environment()
+        use_memory_databases()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            seed(users=1, projects_per_user=2, items_per_project=options["items"])
+            results = compare_servers(levels, options["requests"], options["workers"])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(
+            f"{'server':<8}{'in flight':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result.server:<8}{result.concurrency:>10}{result.throughput:>10.1f}"
+                f"{result.p50_ms:>10.2f}{result.p95_ms:>10.2f}{result.errors:>8}"
+            )
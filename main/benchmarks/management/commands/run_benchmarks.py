@@ -0,0 +1,81 @@
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from benchmarks.seeding import clear_seeded, seed, use_memory_databases
+from benchmarks.suite import compare, load_baseline, run_suite, save_baseline, to_baseline
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[2] / "baselines.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database at several sizes, run every benchmarked view "
+        "through the test client and compare p50/p95 latency and query counts with "
+        "the stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", default="100,1000,10000", help="Items per project, comma separated"
+        )
+        parser.add_argument("--users", type=int, default=3)
+        parser.add_argument("--projects", type=int, default=3, help="Projects per user")
+        parser.add_argument("--requests", type=int, default=30, help="Timed requests per view")
+        parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+        parser.add_argument(
+            "--threshold", type=float, default=0.5, help="Allowed p50 regression (0.5 = 50%%)"
+        )
+        parser.add_argument(
+            "--update-baseline", action="store_true", help="Save these results as the baseline"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",")]
+        except ValueError:
+            raise CommandError("--sizes must be comma separated integers")
+
+        baseline = load_baseline(options["baseline"])
+        results = []
+        setup_test_environment()
+        use_memory_databases()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            for size in sizes:
+                clear_seeded()
+                seed(
+                    users=options["users"],
+                    projects_per_user=options["projects"],
+                    items_per_project=size,
+                )
+                results += run_suite(size, requests=options["requests"])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        if not options["update_baseline"]:
+            compare(results, baseline, options["threshold"])
+
+        self.stdout.write(
+            f"{'view':<22}{'items':>8}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'budget':>8}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result.scenario:<22}{result.size:>8}{result.p50_ms:>10.2f}"
+                f"{result.p95_ms:>10.2f}{result.queries:>9}{result.budget:>8}"
+            )
+            for failure in result.failures:
+                self.stderr.write(f"  FAIL {result.scenario} @ {result.size}: {failure}")
+
+        if options["update_baseline"]:
+            save_baseline(options["baseline"], to_baseline(results, baseline))
+            self.stdout.write(f"Baseline written to {options['baseline']}")
+            return
+        failed = [result for result in results if result.failures]
+        if failed:
+            raise CommandError(f"{len(failed)} benchmark(s) failed")
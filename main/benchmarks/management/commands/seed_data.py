@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+from benchmarks.seeding import clear_seeded, seed
+
+
+class Command(BaseCommand):
+    help = "Bulk-insert a deterministic users × projects × items dataset for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--projects", type=int, default=5, help="Projects per user")
+        parser.add_argument("--items", type=int, default=1000, help="Items per project")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--reset", action="store_true", help="Remove previously seeded data first"
+        )
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            clear_seeded()
+        start = time.perf_counter()
+        result = seed(
+            users=options["users"],
+            projects_per_user=options["projects"],
+            items_per_project=options["items"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"Seeded {result.users} users, {result.projects} projects and "
+            f"{result.items} items in {elapsed:.1f}s "
+            f"({result.items / elapsed if elapsed else 0:.0f} items/s)."
+        )
@@ -0,0 +1,107 @@
+import random
+from dataclasses import dataclass
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connections, router, transaction
+from items.models import Items
+from projects.deletion import delete_items_batch
+from projects.models import Project
+
+User = get_user_model()
+
+USERNAME_PREFIX = "bench-"
+PASSWORD = "bench"
+WORDS = (
+    "launch teaser trailer cover story draft final cut script storyboard interview "
+    "podcast episode thumbnail banner caption hook intro outro edit review campaign "
+    "summer winter product tutorial behind scenes recap highlight short long"
+).split()
+
+
+@dataclass
+class SeedResult:
+    users: int = 0
+    projects: int = 0
+    items: int = 0
+
+
+def use_memory_databases():
+    """
+    Put SQLite test databases in memory for this run.
+
+    The settings give SQLite a test database file so spawned job workers can
+    open it; benchmarked there, every commit would also time an fsync.
+    """
+    for connection in connections.all():
+        if connection.vendor == "sqlite":
+            connection.settings_dict["TEST"]["NAME"] = None
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def clear_seeded(batch_size=10_000):
+    """Remove everything a previous seed created."""
+    users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+    projects = Project.all_objects.filter(owner__in=users)  # type: ignore
+    using = router.db_for_write(Items)
+    for project_id in projects.values_list("pk", flat=True):
+        while delete_items_batch(project_id, batch_size, using):
+            pass
+    projects.delete()
+    users.delete()
+
+
+def seed(users=10, projects_per_user=5, items_per_project=1000, seed=0, batch_size=5000):
+    """
+    Create a deterministic users × projects × items dataset with bulk inserts.
+
+    The same arguments always produce the same titles, descriptions and
+    handles, so benchmark runs are comparable. Items are generated lazily in
+    batches of `batch_size`, so millions of rows never sit in memory at once.
+    """
+    rng = random.Random(seed)
+    result = SeedResult()
+    password = make_password(PASSWORD)
+
+    new_users = User.objects.bulk_create(
+        User(username=f"{USERNAME_PREFIX}{i}", password=password) for i in range(users)
+    )
+    result.users = len(new_users)
+    # bulk_create doesn't return pks on every backend
+    owners = list(User.objects.filter(username__startswith=USERNAME_PREFIX).order_by("pk"))
+
+    new_projects = [
+        Project(owner=owner, title=f"{sentence(rng, 2)} {owner.pk}-{p}")
+        for owner in owners
+        for p in range(projects_per_user)
+    ]
+    Project.objects.bulk_create(new_projects)
+    result.projects = len(new_projects)
+    project_ids = list(
+        Project.objects.filter(owner__in=owners).order_by("pk").values_list("pk", flat=True)
+    )
+
+    batch = []
+    for project_id in project_ids:
+        for _ in range(items_per_project):
+            batch.append(
+                Items(
+                    project_id=project_id,
+                    title=sentence(rng, rng.randint(2, 6)),
+                    description=". ".join(sentence(rng, 8) for _ in range(rng.randint(0, 3))),
+                )
+            )
+            if len(batch) >= batch_size:
+                result.items += insert_items(batch)
+                batch = []
+    if batch:
+        result.items += insert_items(batch)
+    return result
+
+
+def insert_items(batch):
+    with transaction.atomic():
+        Items.objects.bulk_create(batch)
+    return len(batch)
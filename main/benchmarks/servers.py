@@ -0,0 +1,124 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from .suite import BENCHMARK_STORAGES, make_fixture, percentile
+
+# Read-only pages: concurrent writers would mostly measure SQLite's write lock
+PATHS = {
+    "item_list": lambda f: "/items/",
+    "item_detail": lambda f: f"/items/{f.item.pk}/",
+    "project_list": lambda f: "/projects/",
+}
+
+
+@dataclass
+class ServerMeasurement:
+    server: str
+    concurrency: int
+    requests: int
+    elapsed: float
+    p50_ms: float
+    p95_ms: float
+    errors: int
+
+    @property
+    def throughput(self):
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+
+def _summarize(server, concurrency, timings, elapsed, errors):
+    return ServerMeasurement(
+        server=server,
+        concurrency=concurrency,
+        requests=len(timings),
+        elapsed=elapsed,
+        p50_ms=round(statistics.median(timings), 2),
+        p95_ms=round(percentile(timings, 95), 2),
+        errors=errors,
+    )
+
+
+def run_wsgi(paths, cookie, concurrency, requests, workers):
+    """
+    Keep `concurrency` requests in flight against a WSGI server with `workers`
+    threads: anything beyond `workers` waits for a free thread, as behind
+    gunicorn's gthread worker. Latency includes that wait.
+    """
+    cookie_name = settings.SESSION_COOKIE_NAME
+
+    def send(path, queued):
+        client = Client()
+        client.cookies[cookie_name] = cookie
+        try:
+            status = client.get(path).status_code
+        finally:
+            connections.close_all()
+        return status, time.perf_counter() - queued
+
+    timings, errors = [], 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+        for sent in range(requests):
+            if len(in_flight) >= concurrency:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    status, latency = future.result()
+                    errors += status != 200
+                    timings.append(latency * 1000)
+            path = paths[sent % len(paths)]
+            in_flight.add(pool.submit(send, path, time.perf_counter()))
+        for future in wait(in_flight).done:
+            status, latency = future.result()
+            errors += status != 200
+            timings.append(latency * 1000)
+    return _summarize("wsgi", concurrency, timings, time.perf_counter() - start, errors)
+
+
+def run_asgi(paths, cookie, concurrency, requests):
+    """Keep `concurrency` requests in flight against one ASGI event loop."""
+    cookie_name = settings.SESSION_COOKIE_NAME
+    timings, errors = [], 0
+
+    async def send(path, slots):
+        nonlocal errors
+        async with slots:
+            client = AsyncClient()
+            client.cookies[cookie_name] = cookie
+            queued = time.perf_counter()
+            response = await client.get(path)
+            timings.append((time.perf_counter() - queued) * 1000)
+            errors += response.status_code != 200
+
+    async def main():
+        slots = asyncio.Semaphore(concurrency)
+        await asyncio.gather(
+            *(send(paths[sent % len(paths)], slots) for sent in range(requests))
+        )
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return _summarize("asgi", concurrency, timings, time.perf_counter() - start, errors)
+
+
+def compare_servers(levels=(1, 8, 32), requests=200, workers=4):
+    """
+    Serve the same read-only pages through Django's WSGI and ASGI handlers at
+    each concurrency level; returns a measurement per server and level.
+    """
+    cache.clear()
+    results = []
+    with override_settings(STORAGES=BENCHMARK_STORAGES):
+        client, fixture = make_fixture()
+        cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+        paths = [path(fixture) for path in PATHS.values()]
+        for concurrency in levels:
+            results.append(run_wsgi(paths, cookie, concurrency, requests, workers))
+            results.append(run_asgi(paths, cookie, concurrency, requests))
+    return results
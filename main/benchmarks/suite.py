@@ -0,0 +1,289 @@
+import json
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Optional
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from items.models import Items
+from main.utils.admin import CURSOR_VAR
+from main.utils.pagination import encode_cursor
+from projects.middleware import store_active_project
+from projects.models import Project
+from .seeding import USERNAME_PREFIX
+
+User = get_user_model()
+
+# Template rendering needs a non-manifest static storage outside collectstatic
+BENCHMARK_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+# Untimed requests per view that warm template loaders, caches and the DB
+WARMUP_REQUESTS = 3
+# A p50 rise smaller than this is treated as noise whatever the percentage
+REGRESSION_FLOOR_MS = 2.0
+# Writes log activity after the response is sent: BEGIN, one INSERT, COMMIT.
+# The test client closes the response inside the measured window.
+ACTIVITY_WRITE_QUERIES = 3
+# Throttling stays on so its cost is in every write's timings, at a rate no
+# scenario reaches
+UNLIMITED_RATE = "1000000/second"
+
+
+@dataclass
+class Fixture:
+    user: object
+    project: Project
+    item: Items
+    # Row created by a scenario's `prepare` for its request to consume
+    disposable: Optional[object] = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Query budget: the most queries the view may run, at every data size
+    budget: int
+    path: Callable[[Fixture], str]
+    data: Optional[Callable[[Fixture], dict]] = None
+    # Untimed per-request setup (e.g. creating the row a delete will remove)
+    prepare: Optional[Callable[[Fixture], None]] = None
+    # Views throttled (at UNLIMITED_RATE) on top of THROTTLE_RATES
+    throttled: tuple = ()
+
+
+def new_item(fixture):
+    fixture.disposable = Items.objects.create(project=fixture.project, title="Disposable")
+
+
+def new_project(fixture):
+    fixture.disposable = Project.objects.create(owner=fixture.user, title="Disposable")
+
+
+SCENARIOS = [
+    Scenario("item_list", "get", 3, lambda f: "/items/"),
+    Scenario("item_detail", "get", 3, lambda f: f"/items/{f.item.pk}/"),
+    # Compare with item_detail for the per-request cost of throttling
+    Scenario(
+        "item_detail_throttled",
+        "get",
+        3,
+        lambda f: f"/items/{f.item.pk}/",
+        throttled=("item_detail",),
+    ),
+    Scenario(
+        "item_create",
+        "post",
+        # Plus the board column counter for the new item's status
+        6 + ACTIVITY_WRITE_QUERIES,
+        lambda f: "/items/create/",
+        data=lambda f: {"title": "Benchmark item", "description": "Created by the suite"},
+    ),
+    Scenario(
+        "item_update",
+        "post",
+        # Plus bumping the project's `updated`, which the item list's ETag reads
+        4 + ACTIVITY_WRITE_QUERIES,
+        lambda f: f"/items/{f.item.pk}/update",
+        data=lambda f: {"title": "Benchmark update", "description": ""},
+    ),
+    Scenario(
+        "item_delete",
+        "post",
+        # Plus the board column counter for the deleted item's status
+        7 + ACTIVITY_WRITE_QUERIES,
+        lambda f: f"/items/{f.disposable.pk}/delete/",
+        data=lambda f: {"confirm_title": "Disposable", "confirm_understand": "on"},
+        prepare=new_item,
+    ),
+    Scenario("project_list", "get", 3, lambda f: "/projects/"),
+    Scenario(
+        "project_create",
+        "post",
+        # Plus the owner membership, and the creator's permission matrix
+        # reloaded after the previous create changed it
+        7 + ACTIVITY_WRITE_QUERIES,
+        lambda f: "/projects/create/",
+        data=lambda f: {"title": "Benchmark project", "active": "on"},
+    ),
+    Scenario(
+        "project_update",
+        "post",
+        4 + ACTIVITY_WRITE_QUERIES,
+        lambda f: f"/projects/{f.project.handle}/update/",
+        data=lambda f: {"title": f.project.title, "active": "on"},
+    ),
+    Scenario(
+        "project_delete",
+        "post",
+        # Plus the matrix reloaded after `prepare` created the project, and the
+        # members whose matrices the deletion invalidates
+        6 + ACTIVITY_WRITE_QUERIES,
+        lambda f: f"/projects/{f.disposable.handle}/delete/",
+        data=lambda f: {"confirm_title": "Disposable", "confirm_understand": "on"},
+        prepare=new_project,
+    ),
+    # Admin changelists span every user's rows, so these grow with the table
+    Scenario("admin_item_list", "get", 3, lambda f: "/admin/items/items/"),
+    Scenario(
+        "admin_item_list_deep",
+        "get",
+        3,
+        # The fixture item is among the oldest: a page near the end of the table
+        lambda f: f"/admin/items/items/?{CURSOR_VAR}={encode_cursor('next', f.item)}",
+    ),
+    Scenario(
+        "admin_item_filter",
+        "get",
+        3,
+        lambda f: f"/admin/items/items/?project={f.project.handle}",
+    ),
+    Scenario("admin_project_list", "get", 3, lambda f: "/admin/projects/project/"),
+]
+
+
+@dataclass
+class Measurement:
+    scenario: str
+    size: int
+    p50_ms: float
+    p95_ms: float
+    queries: int
+    budget: int
+    failures: list = field(default_factory=list)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def make_fixture():
+    """The first seeded user's first project, activated in a logged-in client."""
+    user = User.objects.filter(username__startswith=USERNAME_PREFIX).order_by("pk").first()
+    # Staff so the admin scenarios can open the changelists
+    User.objects.filter(pk=user.pk).update(is_staff=True, is_superuser=True)
+    project = Project.objects.filter(owner=user).order_by("pk").first()
+    item = Items.objects.filter(project=project).order_by("pk").first()
+    if item is None:
+        item = Items.objects.create(project=project, title="Benchmark item")
+    client = Client()
+    client.force_login(user)
+    session = client.session
+    store_active_project(session, project)
+    session.save()
+    return client, Fixture(user=user, project=project, item=item)
+
+
+def throttle_rates(scenario):
+    views = [*settings.THROTTLE_RATES, *scenario.throttled]
+    return {view: UNLIMITED_RATE for view in views}
+
+
+def run_scenario(client, fixture, scenario, size, requests):
+    with override_settings(
+        THROTTLE_DEFAULT_RATE=UNLIMITED_RATE, THROTTLE_RATES=throttle_rates(scenario)
+    ):
+        return measure_scenario(client, fixture, scenario, size, requests)
+
+
+def measure_scenario(client, fixture, scenario, size, requests):
+    timings, queries = [], []
+    for attempt in range(WARMUP_REQUESTS + requests):
+        if scenario.prepare:
+            scenario.prepare(fixture)
+        send = getattr(client, scenario.method)
+        args = [scenario.path(fixture)]
+        if scenario.data:
+            args.append(scenario.data(fixture))
+        # A full query log (it's capped) would make every capture read as 0
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = send(*args)
+            elapsed = time.perf_counter() - start
+        if response.status_code not in (200, 302):
+            raise RuntimeError(f"{scenario.name}: HTTP {response.status_code}")
+        if attempt >= WARMUP_REQUESTS:
+            timings.append(elapsed * 1000)
+            queries.append(len(captured))
+
+    measurement = Measurement(
+        scenario=scenario.name,
+        size=size,
+        p50_ms=round(statistics.median(timings), 2),
+        p95_ms=round(percentile(timings, 95), 2),
+        queries=max(queries),
+        budget=scenario.budget,
+    )
+    if measurement.queries > scenario.budget:
+        measurement.failures.append(
+            f"{measurement.queries} queries exceeds the budget of {scenario.budget}"
+        )
+    return measurement
+
+
+def run_suite(size, requests=20, scenarios=None):
+    """Benchmark every scenario against the currently seeded dataset."""
+    cache.clear()
+    # Sessions as deployed, in the shared cache (CACHE_URL)
+    with override_settings(
+        STORAGES=BENCHMARK_STORAGES, SESSION_ENGINE=settings.SESSION_ENGINES["cache"]
+    ):
+        client, fixture = make_fixture()
+        return [
+            run_scenario(client, fixture, scenario, size, requests)
+            for scenario in scenarios or SCENARIOS
+        ]
+
+
+def compare(measurements, baseline, threshold):
+    """Flag measurements that regressed against `baseline` (as saved by `to_baseline`)."""
+    for measurement in measurements:
+        previous = baseline.get(str(measurement.size), {}).get(measurement.scenario)
+        if previous is None:
+            continue
+        if measurement.queries > previous["queries"]:
+            measurement.failures.append(
+                f"queries rose from {previous['queries']} to {measurement.queries}"
+            )
+        # Gate on the median: with a few dozen samples p95 is mostly noise
+        limit = max(
+            previous["p50_ms"] * (1 + threshold), previous["p50_ms"] + REGRESSION_FLOOR_MS
+        )
+        if measurement.p50_ms > limit:
+            measurement.failures.append(
+                f"p50 {measurement.p50_ms}ms regressed past {limit:.2f}ms "
+                f"(baseline {previous['p50_ms']}ms)"
+            )
+    return measurements
+
+
+def to_baseline(measurements, baseline=None):
+    baseline = dict(baseline or {})
+    for measurement in measurements:
+        entry = asdict(measurement)
+        baseline.setdefault(str(measurement.size), {})[measurement.scenario] = {
+            key: entry[key] for key in ("p50_ms", "p95_ms", "queries")
+        }
+    return baseline
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as fileobj:
+            return json.load(fileobj)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, baseline):
+    with open(path, "w", encoding="utf-8") as fileobj:
+        json.dump(baseline, fileobj, indent=2, sort_keys=True)
+        fileobj.write("\n")
@@ -0,0 +1,49 @@
+from django.test import TestCase, TransactionTestCase
+from items.models import Items
+from .seeding import clear_seeded, seed
+from .servers import compare_servers
+from .suite import compare, run_suite, to_baseline
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_views_stay_within_query_budgets_at_every_size(self):
+        counts = {}
+        for size in (5, 60):
+            clear_seeded()
+            seed(users=2, projects_per_user=2, items_per_project=size)
+            for result in run_suite(size, requests=2):
+                self.assertEqual(result.failures, [], result.scenario)
+                counts.setdefault(result.scenario, set()).add(result.queries)
+        # A view whose query count grows with the data has an N+1
+        for scenario, seen in counts.items():
+            self.assertEqual(len(seen), 1, scenario)
+
+    def test_seeding_is_deterministic(self):
+        seed(users=1, projects_per_user=2, items_per_project=3, seed=7)
+        first = list(Items.objects.order_by("pk").values_list("title", "description"))
+        clear_seeded()
+        seed(users=1, projects_per_user=2, items_per_project=3, seed=7)
+        second = list(Items.objects.order_by("pk").values_list("title", "description"))
+        self.assertEqual(first, second)
+
+    def test_regressions_against_baseline_are_flagged(self):
+        seed(users=1, projects_per_user=1, items_per_project=5)
+        results = run_suite(5, requests=2)
+        baseline = to_baseline(results)
+        baseline["5"]["item_list"]["queries"] -= 1
+        baseline["5"]["item_detail"]["p50_ms"] = 0.01
+
+        flagged = {r.scenario: r.failures for r in compare(results, baseline, 0.25)}
+        self.assertIn("queries rose", flagged["item_list"][0])
+        self.assertIn("p50", flagged["item_detail"][0])
+
+
+class ServerComparisonTests(TransactionTestCase):
+    # Requests run on other threads, which can't see an open test transaction
+    def test_both_handlers_serve_the_same_pages(self):
+        seed(users=1, projects_per_user=1, items_per_project=5)
+        results = compare_servers(levels=(2,), requests=6, workers=2)
+        self.assertEqual([r.server for r in results], ["wsgi", "asgi"])
+        for result in results:
+            self.assertEqual(result.requests, 6)
+            self.assertEqual(result.errors, 0, result.server)
@@ -1,12 +1,23 @@
 from django.contrib import admin
+from main.utils.admin import InputFilter, LargeTableAdmin
 from .models import Items
+from .search import search_items
+
+
+class ProjectHandleFilter(InputFilter):
+    # A dropdown of every project would load the whole projects table
+    title = "project handle"
+    parameter_name = "project"
+    lookup = "project__handle"
 
 
 @admin.register(Items)
-class ItemsAdmin(admin.ModelAdmin):
+class ItemsAdmin(LargeTableAdmin):
     list_display = ["title", "project", "added_by", "timestamp", "last_modified_at"]
-    list_filter = ["project", "timestamp", "last_modified_at"]
-    search_fields = ["title", "description", "project__title"]
+    list_select_related = ["project", "added_by"]
+    list_filter = [ProjectHandleFilter, "timestamp", "last_modified_at"]
+    autocomplete_fields = ["project", "added_by", "last_modified_by"]
+    search_fields = ["title", "description"]
     readonly_fields = ["added_by_username", "timestamp", "last_modified_at"]
 
     fieldsets = (
@@ -26,6 +37,12 @@ class ItemsAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text index instead of icontains scans across a join
+        if not search_term:
+            return queryset, False
+        return search_items(queryset, search_term), False
+
     def save_model(self, request, obj, form, change):
         if not change:  # If creating new object
             obj.added_by = request.user
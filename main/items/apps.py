@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ItemsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'items'
+
+    def ready(self):
+        from .search import ensure_sqlite_search_triggers
+
+        post_migrate.connect(ensure_sqlite_search_triggers, sender=self)
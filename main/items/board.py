@@ -0,0 +1,73 @@
+from typing import NamedTuple
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from .models import STATUS_TRANSITIONS, Items, StatusCount
+
+
+class BoardColumn(NamedTuple):
+    status: str
+    label: str
+    count: int
+    items: list
+    # Where the column's items may go next, as (status, label)
+    moves: list
+
+
+def first_per_status(queryset, per_column):
+    """
+    The newest `per_column` items of every status, in one query.
+
+    ROW_NUMBER() restarts for each status, so however many columns the board
+    has this is a single scan of the (project, status, timestamp) index.
+    """
+    return (
+        queryset.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F("status")],
+                order_by=[F("timestamp").desc(), F("id").asc()],
+            )
+        )
+        .filter(position__lte=per_column)
+        .order_by("-timestamp", "id")
+    )
+
+
+def build_columns(counts, items):
+    by_status = {status: [] for status in Items.Status.values}
+    for item in items:
+        by_status[item.status].append(item)
+    labels = dict(Items.Status.choices)
+    return [
+        BoardColumn(
+            status=status,
+            label=labels[status],
+            count=counts.get(status, 0),
+            items=by_status[status],
+            moves=[
+                (target, labels[target])
+                for target in Items.Status.values
+                if target in STATUS_TRANSITIONS[status]
+            ],
+        )
+        for status in Items.Status.values
+    ]
+
+
+async def aload_board(project, per_column):
+    """
+    The board's columns in two queries: the stored per-status counters, and
+    the first page of every column.
+    """
+    counts = {
+        status: count
+        async for status, count in StatusCount.objects.filter(project=project)  # type: ignore
+        .values_list("status", "count")
+    }
+    items = [
+        item
+        async for item in first_per_status(
+            Items.objects.filter(project=project), per_column  # type: ignore
+        )
+    ]
+    return build_columns(counts, items)
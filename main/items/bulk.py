@@ -0,0 +1,139 @@
+from collections import Counter
+from django.db import transaction
+from django.utils import timezone
+from activity.log import buffered, record_many
+from activity.models import Activity
+from projects.counters import adjust_item_counters, mark_items_changed
+from .models import Items, StatusCount, statuses_leading_to
+from .search import search_items
+
+# Fields a batch edit may set on every selected item
+BULK_UPDATE_FIELDS = ("description",)
+
+
+def selected_items(project, ids=None):
+    """The project's items with the given ids, or all of them when `ids` is None."""
+    queryset = Items.objects.filter(project=project)  # type: ignore
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+    return queryset
+
+
+def filtered_ids(project, status=None, query=""):
+    """
+    The ids of the project's items the list shows for `status` and the search
+    `query`, as a subquery for `selected_items`.
+    """
+    queryset = Items.objects.filter(project=project)  # type: ignore
+    if status:
+        queryset = queryset.filter(status=status)
+    if query:
+        queryset = search_items(queryset, query)
+    return queryset.order_by().values("id")
+
+
+def log_selected(verb, queryset, project_id, user):
+    """Log `verb` for every selected item: one SELECT, entries written as one batch."""
+    targets = queryset.values_list("id", "title")
+    record_many(verb, Activity.Target.ITEM, targets, project_id, user)
+
+
+def bulk_delete(project, ids=None, user=None):
+    """
+    Delete the selected items with one DELETE; returns how many went.
+
+    `ItemsQuerySet.delete` moves the project's counter once for the batch.
+    """
+    with buffered(user), transaction.atomic():
+        queryset = selected_items(project, ids)
+        log_selected(Activity.Verb.DELETED, queryset, project.pk, user)
+        deleted, _ = queryset.delete()
+    return deleted
+
+
+def bulk_move(project, ids, target, user):
+    """
+    Move the selected items into `target` with one UPDATE; returns how many moved.
+
+    Both projects' counters (and board columns) change once for the whole
+    batch, and the moved items count as modified by `user`.
+    """
+    with buffered(user), transaction.atomic():
+        queryset = selected_items(project, ids)
+        # What the log and the counters need, in one SELECT. Locked, so a
+        # concurrent edit or move can't change the rows the deltas come from.
+        rows = list(
+            queryset.select_for_update().values_list("id", "title", "timestamp", "status")
+        )
+        if not rows:
+            return 0
+        targets = [(pk, title) for pk, title, *_ in rows]
+        statuses = Counter(status for *_, status in rows)
+        # Shows in both projects' feeds
+        for project_id in (project.pk, target.pk):
+            record_many(Activity.Verb.MOVED, Activity.Target.ITEM, targets, project_id, user)
+        # Only the locked rows: items selected since then aren't in the deltas
+        moved = queryset.filter(id__in=[pk for pk, *_ in rows]).update(
+            project=target, last_modified_by=user, last_modified_at=timezone.now()
+        )
+        adjust_item_counters(project, -moved)
+        adjust_item_counters(target, moved, max(timestamp for _, _, timestamp, _ in rows))
+        StatusCount.objects.adjust(
+            project.pk, {status: -count for status, count in statuses.items()}
+        )
+        StatusCount.objects.adjust(target.pk, statuses)
+    return moved
+
+
+def bulk_set_status(project, ids, user, status):
+    """
+    Move the selected items to `status` with one UPDATE; returns how many moved.
+
+    Items that can't go there from where they are (see STATUS_TRANSITIONS) are
+    left alone. The board's columns are adjusted once for the whole batch.
+    """
+    with buffered(user), transaction.atomic():
+        queryset = selected_items(project, ids).filter(status__in=statuses_leading_to(status))
+        # Locked, so the counts can't drift from what the UPDATE changes
+        rows = list(queryset.select_for_update().values_list("id", "title", "status"))
+        if not rows:
+            return 0
+        record_many(
+            Activity.Verb.UPDATED,
+            Activity.Target.ITEM,
+            [(pk, title) for pk, title, _ in rows],
+            project.pk,
+            user,
+        )
+        moved = queryset.filter(id__in=[pk for pk, *_ in rows]).update(
+            status=status, last_modified_by=user, last_modified_at=timezone.now()
+        )
+        deltas = Counter()
+        for *_, source in rows:
+            deltas[source] -= 1
+        deltas[status] += moved
+        StatusCount.objects.adjust(project.pk, deltas)
+        mark_items_changed(project)
+    return moved
+
+
+def bulk_update(project, ids, user, **changes):
+    """
+    Set `changes` (a subset of BULK_UPDATE_FIELDS) on the selected items with one
+    UPDATE; returns how many changed.
+
+    Bumping `last_modified_at` changes each item's card cache key, and the
+    project's `updated` the list's ETag, so nothing needs invalidating per row.
+    """
+    unknown = set(changes) - set(BULK_UPDATE_FIELDS)
+    if unknown:
+        raise ValueError(f"Can't bulk update {', '.join(sorted(unknown))}")
+    with buffered(user), transaction.atomic():
+        queryset = selected_items(project, ids)
+        log_selected(Activity.Verb.UPDATED, queryset, project.pk, user)
+        updated = queryset.update(
+            **changes, last_modified_by=user, last_modified_at=timezone.now()
+        )
+        if updated:
+            mark_items_changed(project)
+        return updated
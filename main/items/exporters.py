@@ -0,0 +1,54 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Items
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "added_by_username",
+    "timestamp",
+    "last_modified_at",
+)
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class Echo:
+    """File-like object whose write() just returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_queryset(project):
+    # Matches the (project, -timestamp, id) index, so rows stream without a sort
+    return (
+        Items.objects.filter(project=project)  # type: ignore
+        .order_by("-timestamp", "id")
+        .values_list(*EXPORT_FIELDS)
+    )
+
+
+def iter_export(project, fmt="csv", chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the project's items as CSV or NDJSON text, one record at a time.
+
+    Rows come from `.values_list().iterator()`, so no model instances are built
+    and memory stays flat. The CSV header is yielded before the query runs so
+    the first byte goes out immediately.
+    """
+    rows = export_queryset(project).iterator(chunk_size=chunk_size)
+    if fmt == "ndjson":
+        encoder = DjangoJSONEncoder()
+        for row in rows:
+            yield encoder.encode(dict(zip(EXPORT_FIELDS, row))) + "\n"
+    else:
+        writer = csv.writer(Echo())
+        yield writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            yield writer.writerow(row)
@@ -1,11 +1,14 @@
-from .models import Items
+from .bulk import filtered_ids
+from .models import STATUS_TRANSITIONS, Items
 from django import forms
+from projects.models import Project
+from projects.permissions import CHANGE_ITEMS, role_allows
 
 
 class ItemsForm(forms.ModelForm):
     class Meta:
         model = Items
-        fields = ["title", "description"]
+        fields = ["title", "description", "status"]
         widgets = {
             "title": forms.TextInput(
                 attrs={
@@ -22,6 +25,11 @@ class ItemsForm(forms.ModelForm):
                     "rows": 6,
                 }
             ),
+            "status": forms.Select(
+                attrs={
+                    "class": "block w-full px-4 py-3 text-gray-900 border border-gray-300 rounded-lg bg-gray-50 focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors",
+                }
+            ),
         }
 
     def __init__(self, *args, **kwargs):
@@ -35,6 +43,17 @@ class ItemsForm(forms.ModelForm):
         # Make title required
         self.fields["title"].required = True
 
+        # Left out of the POST, the item keeps its status
+        self.fields["status"].required = False
+        # An existing item can only stay put or take one of its next steps;
+        # Items.clean enforces the same rule for anything else that saves it
+        if self.instance.pk:
+            current = self.instance.status
+            allowed = {current, *STATUS_TRANSITIONS[current]}
+            self.fields["status"].choices = [
+                choice for choice in Items.Status.choices if choice[0] in allowed
+            ]
+
     def clean_title(self):
         title = self.cleaned_data.get("title")
         if title:
@@ -42,3 +61,98 @@ class ItemsForm(forms.ModelForm):
             if len(title) < 3:
                 raise forms.ValidationError("Title must be at least 3 characters long.")
         return title
+
+
+class ItemsImportForm(forms.Form):
+    FORMAT_CHOICES = [
+        ("", "Detect from file name"),
+        ("csv", "CSV (title, description columns)"),
+        ("ndjson", "NDJSON (one JSON object per line)"),
+    ]
+
+    file = forms.FileField(
+        widget=forms.ClearableFileInput(
+            attrs={
+                "class": "block w-full text-sm text-gray-900 border border-gray-300 rounded-lg cursor-pointer bg-gray-50 focus:outline-none",
+                "accept": ".csv,.ndjson,.jsonl",
+            }
+        )
+    )
+    format = forms.ChoiceField(
+        choices=FORMAT_CHOICES,
+        required=False,
+        widget=forms.Select(
+            attrs={
+                "class": "block w-full px-4 py-3 text-gray-900 border border-gray-300 rounded-lg bg-gray-50 focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors",
+            }
+        ),
+    )
+
+
+class ItemIdsField(forms.Field):
+    """The ids of the checked items; each must be a whole number."""
+
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            return [int(pk) for pk in value]
+        except (TypeError, ValueError):
+            raise forms.ValidationError("Invalid item selection.")
+
+
+class ItemsBulkForm(forms.Form):
+    ACTION_CHOICES = [
+        ("delete", "Delete"),
+        ("move", "Move to project"),
+        ("update", "Set description"),
+        ("status", "Set status"),
+    ]
+
+    action = forms.ChoiceField(choices=ACTION_CHOICES)
+    items = ItemIdsField(required=False)
+    # Act on every item the list shows, not only the checked ones
+    select_all = forms.BooleanField(required=False)
+    # The list's filters, which select_all is bound by
+    filter_status = forms.ChoiceField(choices=Items.Status.choices, required=False)
+    q = forms.CharField(required=False)
+    target = forms.ModelChoiceField(queryset=None, required=False)
+    description = forms.CharField(required=False, widget=forms.Textarea)
+    status = forms.ChoiceField(choices=Items.Status.choices, required=False)
+    confirm = forms.BooleanField(required=False)
+
+    def __init__(self, *args, roles=None, project=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.project = project
+        # Items can only move into projects whose items the user may change
+        editable = [pk for pk, role in (roles or {}).items() if role_allows(role, CHANGE_ITEMS)]
+        self.fields["target"].queryset = Project.objects.filter(pk__in=editable).exclude(  # type: ignore
+            pk=getattr(project, "pk", None)
+        )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get("action")
+        if not cleaned_data.get("items") and not cleaned_data.get("select_all"):
+            raise forms.ValidationError("Select at least one item.")
+        if action == "move" and not cleaned_data.get("target"):
+            self.add_error("target", "Choose the project to move the items to.")
+        if action == "status" and not cleaned_data.get("status"):
+            self.add_error("status", "Choose the status to set.")
+        if action == "delete" and not cleaned_data.get("confirm"):
+            self.add_error("confirm", "Confirm that the items should be deleted.")
+        return cleaned_data
+
+    def selected_ids(self):
+        """
+        The checked ids. With select_all, None for every item in the project, or
+        the ids matching the list's filters when it was filtered.
+        """
+        if not self.cleaned_data["select_all"]:
+            return self.cleaned_data["items"]
+        status, query = self.cleaned_data["filter_status"], self.cleaned_data["q"].strip()
+        if not status and not query:
+            return None
+        return filtered_ids(self.project, status, query)
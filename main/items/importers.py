@@ -0,0 +1,148 @@
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from django.db import transaction
+from django.utils import timezone
+from activity.log import buffered, record_many
+from activity.models import Activity
+from .forms import ItemsForm
+from .models import Items
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_FORMATS = ("csv", "ndjson")
+# Keep the error report bounded no matter how broken the file is
+MAX_REPORTED_ERRORS = 50
+
+
+class ImportFileError(ValueError):
+    """The file itself can't be read: a bad encoding or malformed CSV."""
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+    # Why the import stopped early, if the file couldn't be read to the end
+    file_error: str = ""
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return (self.created + self.skipped) / self.elapsed if self.elapsed else 0.0
+
+
+def guess_format(filename):
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def iter_rows(fileobj, fmt="csv", encoding="utf-8"):
+    """
+    Yield one dict per record from a binary file object, without reading it all.
+
+    CSV files need a header row naming the columns (`title`, `description`).
+    Raises ImportFileError once the file stops being readable.
+    """
+    text = io.TextIOWrapper(fileobj, encoding=encoding, newline="")
+    try:
+        yield from _iter_text_rows(text, fmt)
+    except UnicodeDecodeError as exc:
+        raise ImportFileError(
+            f"The file isn't valid {encoding.upper()} text. Save it as {encoding.upper()} "
+            "and upload it again."
+        ) from exc
+    except csv.Error as exc:
+        raise ImportFileError(f"The file isn't valid CSV: {exc}.") from exc
+    finally:
+        # Don't let the wrapper close the caller's file
+        text.detach()
+
+
+def _iter_text_rows(text, fmt):
+    if fmt == "ndjson":
+        for line in text:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Reported as an invalid row instead of aborting the import
+                yield line
+    else:
+        yield from csv.DictReader(text)
+
+
+def build_item(row, project, user, now):
+    """Validate a row with ItemsForm rules and return an unsaved Items, or the errors."""
+    if not isinstance(row, dict):
+        return None, {"__all__": ["Row must be a JSON object"]}
+    form = ItemsForm(data={"title": row.get("title"), "description": row.get("description")})
+    if not form.is_valid():
+        return None, {name: list(errors) for name, errors in form.errors.items()}
+    item = form.save(commit=False)
+    item.project = project
+    item.added_by = user
+    item.added_by_username = user.username if user else None
+    item.last_modified_by = user
+    item.timestamp = now
+    item.last_modified_at = now
+    return item, None
+
+
+def import_items(rows, project, user, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Validate and insert `rows` into `project` in fixed-size `bulk_create` batches.
+
+    Only one batch is held in memory at a time and each batch commits in its
+    own transaction, so a failure loses at most the batch in flight. A file
+    that becomes unreadable stops the import with `result.file_error` set.
+    """
+    result = ImportResult()
+    start = time.perf_counter()
+    rows = enumerate(rows, start=1)
+
+    # One batched write of the log for the whole import
+    with buffered(user):
+        while True:
+            try:
+                chunk = list(islice(rows, batch_size))
+            except ImportFileError as exc:
+                processed = result.created + result.skipped
+                result.file_error = (
+                    f"{exc} The import stopped after row {processed}; "
+                    f"{result.created} items were imported."
+                )
+                break
+            if not chunk:
+                break
+            now = timezone.now()
+            batch = []
+            for row_number, row in chunk:
+                item, errors = build_item(row, project, user, now)
+                if item is None:
+                    result.skipped += 1
+                    if len(result.errors) < MAX_REPORTED_ERRORS:
+                        result.errors.append((row_number, errors))
+                    continue
+                batch.append(item)
+            if batch:
+                with transaction.atomic():
+                    Items.objects.bulk_create(batch)
+                    record_many(
+                        Activity.Verb.CREATED,
+                        Activity.Target.ITEM,
+                        [(item.pk, item.title) for item in batch],
+                        project.pk,
+                        user,
+                    )
+                result.created += len(batch)
+
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from items.exporters import EXPORT_CHUNK_SIZE, EXPORT_CONTENT_TYPES, iter_export
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = "Stream a project's items to CSV or NDJSON without loading them into memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", required=True, help="Project handle")
+        parser.add_argument("--format", choices=list(EXPORT_CONTENT_TYPES), default="csv")
+        parser.add_argument("--output", default="-", help="Output file ('-' for stdout)")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(handle=options["project"])  # type: ignore
+        except Project.DoesNotExist:  # type: ignore
+            raise CommandError(f"Project '{options['project']}' does not exist")
+
+        chunks = iter_export(project, options["format"], options["chunk_size"])
+        if options["output"] == "-":
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+        else:
+            with open(options["output"], "w", encoding="utf-8", newline="") as fileobj:
+                fileobj.writelines(chunks)
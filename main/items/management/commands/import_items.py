@@ -0,0 +1,57 @@
+import sys
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from items.importers import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    guess_format,
+    import_items,
+    iter_rows,
+)
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or NDJSON file of items into a project using batched inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import ('-' reads stdin)")
+        parser.add_argument("--project", required=True, help="Project handle")
+        parser.add_argument("--user", required=True, help="Username recorded as added_by")
+        parser.add_argument("--format", choices=IMPORT_FORMATS)
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(handle=options["project"])  # type: ignore
+        except Project.DoesNotExist:  # type: ignore
+            raise CommandError(f"Project '{options['project']}' does not exist")
+        try:
+            user = get_user_model().objects.get(username=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist")
+
+        path = options["path"]
+        fmt = options["format"] or guess_format(path)
+        if path == "-":
+            result = self.run_import(sys.stdin.buffer, fmt, project, user, options)
+        else:
+            with open(path, "rb") as fileobj:
+                result = self.run_import(fileobj, fmt, project, user, options)
+
+        for row_number, errors in result.errors:
+            self.stderr.write(f"row {row_number}: {errors}")
+        if result.file_error:
+            raise CommandError(result.file_error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.created} items into '{project.handle}' "
+                f"({result.skipped} skipped) in {result.elapsed:.2f}s "
+                f"- {result.rows_per_second:,.0f} rows/s"
+            )
+        )
+
+    def run_import(self, fileobj, fmt, project, user, options):
+        return import_items(
+            iter_rows(fileobj, fmt), project, user, batch_size=options["batch_size"]
+        )
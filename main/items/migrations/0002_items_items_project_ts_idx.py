@@ -0,0 +1,17 @@
+# Generated by Django 4.2.24 on 2026-10-18 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='items',
+            index=models.Index(fields=['project', '-timestamp', 'id'], name='items_project_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,101 @@
+from django.db import migrations
+
+# The index is maintained by the database itself (triggers), so it stays in
+# sync for save(), delete(), queryset.update() and bulk_create() alike.
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE items_items ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION items_items_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER items_items_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON items_items
+    FOR EACH ROW EXECUTE FUNCTION items_items_search_vector_update()
+    """,
+    "UPDATE items_items SET title = title",
+    "CREATE INDEX items_search_vector_idx ON items_items USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS items_search_vector_idx",
+    "DROP TRIGGER IF EXISTS items_items_search_vector_trigger ON items_items",
+    "DROP FUNCTION IF EXISTS items_items_search_vector_update()",
+    "ALTER TABLE items_items DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE items_items_fts USING fts5(
+        title, description, content='items_items', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER items_items_fts_insert AFTER INSERT ON items_items BEGIN
+        INSERT INTO items_items_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER items_items_fts_delete AFTER DELETE ON items_items BEGIN
+        INSERT INTO items_items_fts(items_items_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER items_items_fts_update AFTER UPDATE OF title, description
+    ON items_items BEGIN
+        INSERT INTO items_items_fts(items_items_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO items_items_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO items_items_fts(items_items_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS items_items_fts_update",
+    "DROP TRIGGER IF EXISTS items_items_fts_delete",
+    "DROP TRIGGER IF EXISTS items_items_fts_insert",
+    "DROP TABLE IF EXISTS items_items_fts",
+]
+
+STATEMENTS = {
+    "postgresql": (POSTGRES_FORWARD, POSTGRES_BACKWARD),
+    "sqlite": (SQLITE_FORWARD, SQLITE_BACKWARD),
+}
+
+
+def run_statements(schema_editor, index):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    for sql in statements[index]:
+        schema_editor.execute(sql)
+
+
+def forwards(apps, schema_editor):
+    run_statements(schema_editor, 0)
+
+
+def backwards(apps, schema_editor):
+    run_statements(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("items", "0002_items_items_project_ts_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
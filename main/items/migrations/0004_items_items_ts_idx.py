@@ -0,0 +1,17 @@
+# Generated by Django 4.2.24 on 2026-10-18 05:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0003_items_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='items',
+            index=models.Index(fields=['-timestamp', 'id'], name='items_ts_idx'),
+        ),
+    ]
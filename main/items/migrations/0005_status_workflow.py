@@ -0,0 +1,61 @@
+# Generated by Django 4.2.24 on 2026-10-18 05:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def backfill_status_counts(apps, schema_editor):
+    Items = apps.get_model("items", "Items")
+    StatusCount = apps.get_model("items", "StatusCount")
+    # Every existing item starts out pre-filming: one GROUP BY fills the counters
+    rows = (
+        Items.objects.order_by()
+        .values_list("project_id", "status")
+        .annotate(count=Count("id"))
+    )
+    StatusCount.objects.bulk_create(
+        (
+            StatusCount(project_id=project_id, status=status, count=count)
+            for project_id, status, count in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_memberships'),
+        ('items', '0004_items_items_ts_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pre_filming', 'Pre-filming'), ('filming', 'Filming'), ('post_production', 'Post-production'), ('review', 'In review'), ('delivered', 'Delivered')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='items',
+            name='status',
+            field=models.CharField(choices=[('pre_filming', 'Pre-filming'), ('filming', 'Filming'), ('post_production', 'Post-production'), ('review', 'In review'), ('delivered', 'Delivered')], default='pre_filming', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='items',
+            index=models.Index(fields=['project', 'status', '-timestamp', 'id'], name='items_project_status_ts_idx'),
+        ),
+        migrations.AddField(
+            model_name='statuscount',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_counts', to='projects.project'),
+        ),
+        migrations.AddConstraint(
+            model_name='statuscount',
+            constraint=models.UniqueConstraint(fields=('project', 'status'), name='items_status_count_unique'),
+        ),
+        migrations.RunPython(backfill_status_counts, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,61 @@
+from collections import Counter
 from django.conf import settings
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Count, F
 from django.utils import timezone
+from activity.log import record
+from activity.models import Activity
+from projects.counters import adjust_item_counters, mark_items_changed
 from projects.models import Project
 from django.urls import reverse
 
 User = settings.AUTH_USER_MODEL
 
 
+class ItemsQuerySet(models.QuerySet):
+    """Keeps `Project.items_count`/`last_item_at` in step on the bulk paths too."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            counts = {}
+            statuses = {}
+            for obj in objs:
+                count, latest = counts.get(obj.project_id, (0, obj.timestamp))
+                counts[obj.project_id] = (count + 1, max(latest, obj.timestamp))
+                statuses.setdefault(obj.project_id, Counter())[obj.status] += 1
+            for project_id, (count, latest) in counts.items():
+                adjust_item_counters(Project(pk=project_id), count, latest)
+                StatusCount.objects.adjust(project_id, statuses[project_id])
+        return created
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            rows = self.order_by().values("project_id", "status").annotate(count=Count("id"))
+            statuses = {}
+            for row in rows:
+                statuses.setdefault(row["project_id"], Counter())[row["status"]] -= row["count"]
+            result = super().delete()
+            for project_id, deltas in statuses.items():
+                adjust_item_counters(Project(pk=project_id), sum(deltas.values()))
+                StatusCount.objects.adjust(project_id, deltas)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 # Create your models here.
 class Items(models.Model):
+    class Status(models.TextChoices):
+        PRE_FILMING = "pre_filming", "Pre-filming"
+        FILMING = "filming", "Filming"
+        POST_PRODUCTION = "post_production", "Post-production"
+        REVIEW = "review", "In review"
+        DELIVERED = "delivered", "Delivered"
+
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
     added_by = models.ForeignKey(
         User, related_name="items_added", on_delete=models.SET_NULL, null=True
@@ -20,8 +67,35 @@ class Items(models.Model):
     last_modified_at = models.DateTimeField(auto_now=True)
     title = models.CharField(max_length=120)
     description = models.TextField(blank=True, null=True)
+    # Production workflow; moves are limited to STATUS_TRANSITIONS
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PRE_FILMING
+    )
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    objects = ItemsQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the board counts this item under until the next save
+        instance._loaded_status = instance.status
+        return instance
+
+    def can_move_to(self, status):
+        current = getattr(self, "_loaded_status", None)
+        return current is None or status == current or status in STATUS_TRANSITIONS[current]
+
+    def clean(self):
+        super().clean()
+        if not self.can_move_to(self.status):
+            raise ValidationError(
+                {
+                    "status": f"Can't move from {Items.Status(self._loaded_status).label} "
+                    f"to {Items.Status(self.status).label}."
+                }
+            )
+
     def save(self, *args, **kwargs):
         # Update modified timestamp
         self.last_modified_at = timezone.now()
@@ -30,16 +104,65 @@ class Items(models.Model):
         if self.added_by:
             self.added_by_username = self.added_by.username  # type: ignore
 
-        super().save(*args, **kwargs)
+        if not self._state.adding:
+            previous = getattr(self, "_loaded_status", self.status)
+            update_fields = kwargs.get("update_fields")
+            if previous == self.status or (
+                update_fields is not None and "status" not in update_fields
+            ):
+                result = super().save(*args, **kwargs)
+                mark_items_changed(Project(pk=self.project_id))
+                record(Activity.Verb.UPDATED, self)
+                return result
+            # A status change moves the item between the board's counters
+            with transaction.atomic(using=kwargs.get("using")):
+                result = super().save(*args, **kwargs)
+                mark_items_changed(Project(pk=self.project_id))
+                StatusCount.objects.adjust(self.project_id, {previous: -1, self.status: 1})
+                record(Activity.Verb.UPDATED, self)
+            self._loaded_status = self.status
+            return result
+        # The row and the project's counters change together or not at all
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+            adjust_item_counters(self.project, 1, self.timestamp)
+            StatusCount.objects.adjust(self.project_id, {self.status: 1})
+            record(Activity.Verb.CREATED, self)
+        self._loaded_status = self.status
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using")):
+            record(Activity.Verb.DELETED, self)
+            status = getattr(self, "_loaded_status", self.status)
+            result = super().delete(*args, **kwargs)
+            adjust_item_counters(self.project, -1)
+            StatusCount.objects.adjust(self.project_id, {status: -1})
+        return result
 
     def get_absolute_url(self):
         return reverse("items:detail", kwargs={"pk": self.pk})
 
     def __str__(self):
-        return f"{self.title} ({self.project.title})"  # type: ignore
+        # Only mention the project when it's already loaded, so listing items
+        # by name (admin, autocomplete) doesn't fetch one project per row
+        if Items.project.is_cached(self):  # type: ignore
+            return f"{self.title} ({self.project.title})"  # type: ignore
+        return self.title
 
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(
+                fields=["project", "-timestamp", "id"], name="items_project_ts_idx"
+            ),
+            # Keyset order of the admin changelist across all projects
+            models.Index(fields=["-timestamp", "id"], name="items_ts_idx"),
+            # One board column, newest first
+            models.Index(
+                fields=["project", "status", "-timestamp", "id"],
+                name="items_project_status_ts_idx",
+            ),
+        ]
         verbose_name = "Item"
         verbose_name_plural = "Items"
 
@@ -50,3 +173,74 @@ class Items(models.Model):
             desc_str = str(self.description)  # Convert to string
             return desc_str[:100] + "..." if len(desc_str) > 100 else desc_str
         return "No description provided"
+
+
+# Where an item may go from each status: on to the next stage, or back for rework
+STATUS_TRANSITIONS = {
+    Items.Status.PRE_FILMING: {Items.Status.FILMING},
+    Items.Status.FILMING: {Items.Status.PRE_FILMING, Items.Status.POST_PRODUCTION},
+    Items.Status.POST_PRODUCTION: {Items.Status.FILMING, Items.Status.REVIEW},
+    Items.Status.REVIEW: {Items.Status.POST_PRODUCTION, Items.Status.DELIVERED},
+    Items.Status.DELIVERED: {Items.Status.REVIEW},
+}
+
+
+def statuses_leading_to(status):
+    """The statuses an item may be moved to `status` from."""
+    return [source for source, targets in STATUS_TRANSITIONS.items() if status in targets]
+
+
+class StatusCountManager(models.Manager):
+    def adjust(self, project_id, deltas):
+        """
+        Add each `{status: delta}` to the project's board counters, one UPDATE
+        per column that changed.
+
+        Like `adjust_item_counters`, the F() expressions make concurrent changes
+        add up. A column's row is created the first time it's needed.
+        """
+        for status, delta in deltas.items():
+            if not delta:
+                continue
+            row = self.filter(project_id=project_id, status=status)
+            if row.update(count=F("count") + delta):
+                continue
+            # Another transaction may be creating the same row; either way it exists after this
+            self.bulk_create(
+                [StatusCount(project_id=project_id, status=status)], ignore_conflicts=True
+            )
+            row.update(count=F("count") + delta)
+
+    def rebuild(self, project_ids):
+        """Recount the board columns of `project_ids` with one GROUP BY over their items."""
+        rows = (
+            Items.objects.filter(project_id__in=project_ids)  # type: ignore
+            .order_by()
+            .values_list("project_id", "status")
+            .annotate(count=Count("id"))
+        )
+        counts = [
+            StatusCount(project_id=project_id, status=status, count=count)
+            for project_id, status, count in rows
+        ]
+        with transaction.atomic(using=self.db):
+            self.filter(project_id__in=project_ids).delete()
+            self.bulk_create(counts)
+
+
+class StatusCount(models.Model):
+    """How many of a project's items are in each status: the board's column headers."""
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="status_counts")
+    status = models.CharField(max_length=20, choices=Items.Status.choices)
+    count = models.IntegerField(default=0)
+
+    objects = StatusCountManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["project", "status"], name="items_status_count_unique")
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} {self.status}: {self.count}"
@@ -0,0 +1,113 @@
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = "english"
+# bm25() column weights for (title, description) on SQLite
+SQLITE_BM25_WEIGHTS = (10.0, 1.0)
+
+# Kept here so the post_migrate hook can put them back: SQLite drops a table's
+# triggers whenever a migration rebuilds it (e.g. AddField with a default).
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS items_items_fts_insert AFTER INSERT ON items_items
+    BEGIN
+        INSERT INTO items_items_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_items_fts_delete AFTER DELETE ON items_items
+    BEGIN
+        INSERT INTO items_items_fts(items_items_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_items_fts_update
+    AFTER UPDATE OF title, description ON items_items
+    BEGIN
+        INSERT INTO items_items_fts(items_items_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO items_items_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+
+def ensure_sqlite_search_triggers(using="default", **kwargs):
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+        if "items_items_fts" not in tables:
+            return
+        for sql in SQLITE_TRIGGERS:
+            cursor.execute(sql)
+
+
+def fts5_query(query):
+    """Quote every term so user input can't inject FTS5 operators."""
+    terms = query.split()
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def search_items(queryset, query):
+    """
+    Filter `queryset` to items matching `query`, best matches first.
+
+    Uses the trigger-maintained GIN-indexed `search_vector` on PostgreSQL and
+    the FTS5 `items_items_fts` table on SQLite; other backends fall back to
+    `icontains`.
+    """
+    query = (query or "").strip()
+    if not query:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return (
+            queryset.filter(
+                RawSQL(
+                    f"items_items.search_vector @@ {tsquery}",
+                    [query],
+                    output_field=BooleanField(),
+                )
+            )
+            .annotate(
+                rank=RawSQL(
+                    f"ts_rank(items_items.search_vector, {tsquery})",
+                    [query],
+                    output_field=FloatField(),
+                )
+            )
+            .order_by("-rank", "-timestamp")
+        )
+    if vendor == "sqlite":
+        match = fts5_query(query)
+        if not match:
+            return queryset.none()
+        weights = ", ".join(str(w) for w in SQLITE_BM25_WEIGHTS)
+        # bm25() only works inside a MATCH query, so the rank is a correlated
+        # lookup by rowid: one index seek per matching row
+        return (
+            queryset.filter(
+                id__in=RawSQL(
+                    "SELECT rowid FROM items_items_fts WHERE items_items_fts MATCH %s",
+                    [match],
+                )
+            )
+            .annotate(
+                rank=RawSQL(
+                    f"SELECT bm25(items_items_fts, {weights}) FROM items_items_fts"
+                    " WHERE items_items_fts MATCH %s AND rowid = items_items.id",
+                    [match],
+                    output_field=FloatField(),
+                )
+            )
+            .order_by("rank", "-timestamp")
+        )
+    return queryset.filter(Q(title__icontains=query) | Q(description__icontains=query))
@@ -1,3 +1,651 @@
-from django.test import TestCase
+import html
+import io
+import json
+import re
+import os
+import tempfile
+from django.contrib.auth import get_user_model
+from unittest import mock
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, QuerySet
+from django.http import QueryDict
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from main.utils import admin as admin_utils
+from main.utils.fragments import attach_cached_fragments
+from main.utils.pagination import keyset_paginate, paginate_request
+from projects.middleware import store_active_project
+from projects.counters import reconcile_item_counters
+from projects.models import Project
+from .bulk import bulk_move, bulk_set_status
+from .exporters import iter_export
+from .importers import import_items, iter_rows
+from .models import Items, ItemsQuerySet, StatusCount
+from .search import search_items
 
-# Create your tests here.
+User = get_user_model()
+
+# The manifest storage needs collectstatic; tests that render pages don't care
+# Query counts are pinned for the deployed setup, where sessions live in the
+# shared cache
+CACHE_SESSIONS = "main.utils.sessions"
+TEST_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+class ItemsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.project = Project.objects.create(owner=self.user, title="Launch")
+
+
+class KeysetPaginationTests(ItemsTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(7):
+            Items.objects.create(project=self.project, title=f"Item {i}")
+        # Force timestamp ties so the id tiebreaker is exercised
+        Items.objects.filter(title__in=["Item 2", "Item 3", "Item 4"]).update(
+            timestamp=timezone.now()
+        )
+        self.qs = Items.objects.filter(project=self.project)
+        self.expected = list(self.qs.order_by("-timestamp", "id"))
+
+    def test_walks_forward_and_back_without_gaps(self):
+        seen = []
+        cursor = None
+        pages = []
+        while True:
+            with self.assertNumQueries(1):
+                page = keyset_paginate(self.qs, cursor=cursor, page_size=3)
+            pages.append(page)
+            seen.extend(page.object_list)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, self.expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertFalse(pages[0].has_previous)
+
+        previous = keyset_paginate(self.qs, cursor=pages[-1].prev_cursor, page_size=3)
+        self.assertEqual(previous.object_list, pages[1].object_list)
+        self.assertTrue(previous.has_next)
+
+    def test_page_links_keep_the_search_and_filters(self):
+        request = RequestFactory().get(
+            "/items/", {"q": "item", "status": "filming", "cursor": "x", "page_size": 3}
+        )
+        page = paginate_request(request, self.qs)
+        self.assertTrue(page.has_next)
+        query = QueryDict(page.next_query)
+        self.assertEqual(query["q"], "item")
+        self.assertEqual(query["status"], "filming")
+        self.assertEqual(query.getlist("cursor"), [page.next_cursor])
+
+    @override_settings(STORAGES=TEST_STORAGES)
+    def test_second_page_of_a_filtered_list_stays_filtered(self):
+        Items.objects.create(project=self.project, title="Filming", status="filming")
+        self.client.force_login(self.user)
+        session = self.client.session
+        store_active_project(session, self.project)
+        session.save()
+
+        response = self.client.get("/items/", {"status": "pre_filming", "page_size": 3})
+        link = re.search(r'href="\?([^"]*cursor=[^"]*)"', response.content.decode())
+        response = self.client.get(f"/items/?{html.unescape(link.group(1))}")
+
+        self.assertEqual(response.context["status"], "pre_filming")
+        titles = {item.title for item in response.context["object_list"]}
+        self.assertEqual(len(titles), 3)
+        self.assertNotIn("Filming", titles)
+
+    def test_tampered_cursor_starts_from_first_page(self):
+        page = keyset_paginate(self.qs, cursor="not-a-cursor", page_size=3)
+        self.assertEqual(page.object_list, self.expected[:3])
+
+
+class ItemImportTests(ItemsTestCase):
+    def test_csv_import_in_batches(self):
+        data = b"title,description\nFirst item,one\nSecond item,\nno,too short\nThird item,three\n"
+        result = import_items(
+            iter_rows(io.BytesIO(data), "csv"), self.project, self.user, batch_size=2
+        )
+        self.assertEqual((result.created, result.skipped), (3, 1))
+        self.assertEqual(result.errors[0][0], 3)
+        self.assertIn("title", result.errors[0][1])
+        self.assertEqual(
+            set(Items.objects.values_list("added_by_username", flat=True)), {"owner"}
+        )
+
+    @override_settings(STORAGES=TEST_STORAGES)
+    def test_latin1_csv_is_reported_on_the_form(self):
+        self.client.force_login(self.user)
+        session = self.client.session
+        store_active_project(session, self.project)
+        session.save()
+        upload = SimpleUploadedFile(
+            "items.csv", "title,description\nCafé crème,latin-1\n".encode("latin-1")
+        )
+
+        response = self.client.post("/items/import/", {"file": upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("isn't valid UTF-8", response.context["form"].errors["file"][0])
+        self.assertFalse(Items.objects.exists())
+
+    def test_unreadable_file_stops_after_the_batches_already_imported(self):
+        rows = "".join(f"Item number {i},ok\n" for i in range(600))
+        data = f"title,description\n{rows}Café,x\n".encode("latin-1")
+        result = import_items(
+            iter_rows(io.BytesIO(data), "csv"), self.project, self.user, batch_size=100
+        )
+        self.assertIn("isn't valid UTF-8", result.file_error)
+        self.assertGreater(result.created, 0)
+        self.assertEqual(Items.objects.count(), result.created)
+        self.assertIn(f"{result.created} items were imported", result.file_error)
+
+    def test_ndjson_import_reports_bad_lines(self):
+        data = b'{"title": "From json", "description": "x"}\nnot json\n\n{"title": "Again json"}\n'
+        result = import_items(iter_rows(io.BytesIO(data), "ndjson"), self.project, self.user)
+        self.assertEqual((result.created, result.skipped), (2, 1))
+        self.assertEqual(result.errors[0][0], 2)
+
+    def test_management_command_reports_throughput(self):
+        with tempfile.NamedTemporaryFile(suffix=".ndjson", delete=False) as handle:
+            handle.write(b'{"title": "Command item"}\n')
+        self.addCleanup(os.unlink, handle.name)
+
+        out = io.StringIO()
+        call_command(
+            "import_items", handle.name, project=self.project.handle, user="owner", stdout=out
+        )
+        self.assertIn("Imported 1 items", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+
+
+class ItemExportTests(ItemsTestCase):
+    def setUp(self):
+        super().setUp()
+        Items.objects.create(project=self.project, title="Exported, with comma")
+        Items.objects.create(project=self.project, title="Second export", description="d")
+
+    def test_csv_export_round_trips_through_import(self):
+        data = "".join(iter_export(self.project, "csv")).encode()
+        other = Project.objects.create(owner=self.user, title="Copy")
+        result = import_items(iter_rows(io.BytesIO(data), "csv"), other, self.user)
+        self.assertEqual(result.created, 2)
+        self.assertEqual(
+            set(Items.objects.filter(project=other).values_list("title", flat=True)),
+            {"Exported, with comma", "Second export"},
+        )
+
+    def test_ndjson_export_streams_from_view(self):
+        self.client.force_login(self.user)
+        self.client.get(f"/projects/activate/{self.project.handle}/")
+        response = self.client.get("/items/export/?format=ndjson")
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            {json.loads(line)["title"] for line in lines},
+            {"Exported, with comma", "Second export"},
+        )
+
+
+class ItemSearchTests(ItemsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.match_title = Items.objects.create(project=self.project, title="Drone footage")
+        self.match_desc = Items.objects.create(
+            project=self.project, title="B-roll", description="drone shots over the bay"
+        )
+        Items.objects.create(project=self.project, title="Interview")
+        self.qs = Items.objects.filter(project=self.project)
+
+    def test_ranks_title_matches_first(self):
+        results = list(search_items(self.qs, "drone"))
+        self.assertEqual(results, [self.match_title, self.match_desc])
+
+    def test_index_follows_updates_deletes_and_bulk_loads(self):
+        self.match_title.title = "Aerial footage"
+        self.match_title.save()
+        self.assertEqual(list(search_items(self.qs, "drone")), [self.match_desc])
+
+        self.match_desc.delete()
+        self.assertEqual(list(search_items(self.qs, "drone")), [])
+
+        Items.objects.bulk_create([Items(project=self.project, title="Drone b-roll")])
+        self.assertEqual(search_items(self.qs, "drone").count(), 1)
+
+    @override_settings(STORAGES=TEST_STORAGES)
+    def test_search_page_counts_matches_not_the_project(self):
+        self.client.force_login(self.user)
+        session = self.client.session
+        store_active_project(session, self.project)
+        session.save()
+
+        response = self.client.get("/items/", {"q": "drone"})
+
+        self.assertEqual(response.context["match_count"], 2)
+        self.assertContains(response, '2 matches for "drone"')
+        self.assertNotContains(response, "3 items in")
+
+    def test_scoped_to_queryset_and_safe_with_operators(self):
+        other = Project.objects.create(owner=self.user, title="Other")
+        Items.objects.create(project=other, title="Drone spare")
+        self.assertEqual(search_items(self.qs, "drone").count(), 2)
+        self.assertEqual(list(search_items(self.qs, 'drone" OR *')), [])
+
+
+class ItemCardCacheTests(ItemsTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        for i in range(3):
+            Items.objects.create(project=self.project, title=f"Card {i}")
+
+    def attach(self):
+        items = list(Items.objects.filter(project=self.project))
+        attach_cached_fragments(items, "items/card.html", "last_modified_at", "item")
+        return items
+
+    def test_page_of_cards_is_one_cache_round_trip(self):
+        self.attach()
+        with mock.patch("main.utils.fragments.render_to_string") as render, mock.patch(
+            "main.utils.fragments.cache.get_many", wraps=cache.get_many
+        ) as get_many:
+            items = self.attach()
+        render.assert_not_called()
+        self.assertEqual(get_many.call_count, 1)
+        self.assertIn("Card 0", "".join(item.card_html for item in items))
+
+    def test_edit_changes_the_key(self):
+        self.attach()
+        item = Items.objects.get(title="Card 1")
+        item.title = "Card renamed"
+        item.save()
+        html = "".join(item.card_html for item in self.attach())
+        self.assertIn("Card renamed", html)
+        self.assertNotIn("Card 1", html)
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class ItemConditionalGetTests(ItemsTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.item = Items.objects.create(project=self.project, title="Cached page")
+        self.client.force_login(self.user)
+        self.activate(self.project)
+
+    def activate(self, project):
+        session = self.client.session
+        store_active_project(session, project)
+        session.save()
+
+    def test_list_answers_304_until_items_change(self):
+        response = self.client.get("/items/")
+        etag = response["ETag"]
+        self.assertIn("private", response["Cache-Control"])
+
+        response = self.client.get("/items/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Items.objects.create(project=self.project, title="New arrival")
+        response = self.client.get("/items/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_etag_changes_when_an_item_is_edited(self):
+        etag = self.client.get("/items/")["ETag"]
+        self.item.title = "Edited page"
+        self.item.save()
+        response = self.client.get("/items/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Edited page")
+
+    def test_list_counts_come_from_the_counters(self):
+        Items.objects.create(project=self.project, title="Second", status=Items.Status.FILMING)
+        for url, count in (("/items/", "2 items"), ("/items/?status=filming", "1 item")):
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url)
+            self.assertContains(response, count)
+            counts = [q["sql"] for q in captured if "COUNT(" in q["sql"].upper()]
+            self.assertEqual(counts, [])
+
+    def test_detail_answers_304_until_item_changes(self):
+        url = f"/items/{self.item.id}/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.item.title = "Edited page"
+        self.item.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_is_per_user(self):
+        etag = self.client.get("/items/")["ETag"]
+        other = User.objects.create_user(username="other", password="pass")
+        self.project.owner = other
+        self.project.save()
+        self.client.force_login(other)
+        self.activate(self.project)
+        response = self.client.get("/items/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_pending_messages_skip_validation(self):
+        etag = self.client.get("/items/")["ETag"]
+        self.client.get(f"/projects/activate/{self.project.handle}/")
+        response = self.client.get("/items/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+        self.assertContains(response, "Project activated successfully")
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class AsyncViewTests(ItemsTestCase):
+    """The CRUD views run natively under ASGI, middleware included."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.item = Items.objects.create(project=self.project, title="Async item")
+        self.async_client.force_login(self.user)
+        session = self.async_client.session
+        store_active_project(session, self.project)
+        session.save()
+
+    async def test_item_pages(self):
+        response = await self.async_client.get("/items/")
+        self.assertContains(response, "Async item")
+        self.assertEqual(response["X-Active-Project"], self.project.handle)
+
+        response = await self.async_client.get(f"/items/{self.item.pk}/")
+        self.assertContains(response, "Launch")
+
+        response = await self.async_client.post(
+            f"/items/{self.item.pk}/update", {"title": "Renamed", "description": ""}
+        )
+        self.assertEqual(response.status_code, 302)
+        response = await self.async_client.post(
+            f"/items/{self.item.pk}/delete/",
+            {"confirm_title": "Renamed", "confirm_understand": "on"},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(await Items.objects.filter(pk=self.item.pk).aexists())
+
+    async def test_project_pages(self):
+        response = await self.async_client.post(
+            "/projects/create/", {"title": "Async project", "active": "on"}
+        )
+        self.assertEqual(response.status_code, 302)
+        response = await self.async_client.get("/projects/")
+        self.assertContains(response, "Async project")
+        response = await self.async_client.get(f"/projects/{self.project.handle}/")
+        self.assertContains(response, "Launch")
+
+    async def test_anonymous_requests_are_redirected_to_login(self):
+        self.async_client.cookies.clear()
+        response = await self.async_client.get("/items/")
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("/login", response["Location"])
+
+
+@override_settings(STORAGES=TEST_STORAGES, SESSION_ENGINE=CACHE_SESSIONS)
+class LargeTableAdminTests(ItemsTestCase):
+    def setUp(self):
+        super().setUp()
+        admin_user = User.objects.create_superuser(username="admin", password="pass")
+        self.client.force_login(admin_user)
+        other = Project.objects.create(owner=admin_user, title="Other")
+        for i in range(5):
+            Items.objects.create(project=self.project, title=f"Launch item {i}")
+            Items.objects.create(project=other, title=f"Other item {i}")
+
+    def titles(self, response):
+        return [item.title for item in response.context["cl"].result_list]
+
+    def test_cursor_pages_cover_every_item_once(self):
+        seen = []
+        url = "/admin/items/items/"
+        with mock.patch("items.admin.ItemsAdmin.list_per_page", 4):
+            while url:
+                with self.assertNumQueries(3):
+                    response = self.client.get(url)
+                seen += self.titles(response)
+                url = response.context["cl"].next_url
+                url = url and "/admin/items/items/" + url
+        self.assertEqual(sorted(seen), sorted(Items.objects.values_list("title", flat=True)))
+        self.assertEqual(len(seen), 10)
+
+    def test_project_handle_filter(self):
+        response = self.client.get(f"/admin/items/items/?project={self.project.handle}")
+        self.assertEqual(len(self.titles(response)), 5)
+        self.assertTrue(all(title.startswith("Launch") for title in self.titles(response)))
+        self.assertEqual(response.context["cl"].result_count, 5)
+
+    def test_count_is_capped_on_large_tables(self):
+        with mock.patch.object(admin_utils, "EXACT_COUNT_THRESHOLD", 3):
+            response = self.client.get("/admin/items/items/")
+        self.assertEqual(response.context["cl"].result_count, 3)
+        self.assertContains(response, "about 3")
+
+
+@override_settings(STORAGES=TEST_STORAGES, SESSION_ENGINE=CACHE_SESSIONS)
+class BulkItemTests(ItemsTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.other = Project.objects.create(owner=self.user, title="Other")
+        self.items = [
+            Items.objects.create(project=self.project, title=f"Item {i}") for i in range(5)
+        ]
+        self.client.force_login(self.user)
+        session = self.client.session
+        store_active_project(session, self.project)
+        session.save()
+
+    def post(self, **data):
+        return self.client.post("/items/bulk/", data)
+
+    def ids(self, *positions):
+        return [self.items[i].pk for i in positions]
+
+    def test_delete_needs_confirmation(self):
+        self.post(action="delete", items=self.ids(0, 1))
+        self.assertEqual(Items.objects.count(), 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post(action="delete", items=self.ids(0, 1), confirm="on")
+        self.assertRedirects(response, "/items/", fetch_redirect_response=False)
+        self.assertEqual(Items.objects.count(), 3)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.items_count, 3)
+
+    def test_move_is_set_based_and_updates_both_counters(self):
+        # Request setup (user, permission matrix, project, target), then
+        # SELECT, UPDATE items, one UPDATE per project and per board column
+        # inside a savepoint, whatever the number of items. The empty target's
+        # column row is created on first use (INSERT and a second UPDATE).
+        with self.assertNumQueries(14):
+            self.post(action="move", items=self.ids(0, 1, 2), target=self.other.pk)
+        moved = Items.objects.filter(project=self.other)
+        self.assertEqual(moved.count(), 3)
+        self.assertTrue(all(item.last_modified_by == self.user for item in moved))
+        self.project.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.project.items_count, self.other.items_count), (2, 3))
+        self.assertEqual(self.other.last_item_at, self.items[2].timestamp)
+
+    def test_cannot_touch_other_users_items_or_projects(self):
+        stranger = User.objects.create_user(username="stranger", password="pass")
+        theirs = Project.objects.create(owner=stranger, title="Theirs")
+        foreign = Items.objects.create(project=theirs, title="Not yours")
+
+        self.post(action="move", items=self.ids(0), target=theirs.pk)
+        self.assertEqual(Items.objects.get(pk=self.items[0].pk).project, self.project)
+        self.post(action="delete", items=[foreign.pk], confirm="on")
+        self.assertTrue(Items.objects.filter(pk=foreign.pk).exists())
+
+    def test_update_all_bumps_modified_and_busts_card_cache(self):
+        before = Items.objects.get(pk=self.items[0].pk).last_modified_at
+        self.client.get("/items/")
+        self.post(action="update", select_all="on", description="Batch edited")
+        self.assertEqual(Items.objects.filter(description="Batch edited").count(), 5)
+        self.assertGreater(Items.objects.get(pk=self.items[0].pk).last_modified_at, before)
+        self.assertContains(self.client.get("/items/"), "Batch edited")
+
+
+    def test_select_all_on_a_filtered_list_keeps_to_the_filter(self):
+        self.post(action="status", items=self.ids(0, 1), status=Items.Status.FILMING)
+        response = self.client.get("/items/?status=filming")
+        self.assertContains(response, "All 2 items")
+        self.assertContains(response, 'name="filter_status" value="filming"')
+
+        self.post(action="delete", select_all="on", confirm="on", filter_status="filming", q="")
+        self.assertEqual(
+            sorted(Items.objects.values_list("pk", flat=True)), self.ids(2, 3, 4)
+        )
+
+        Items.objects.filter(pk=self.items[2].pk).update(title="Hero shot")
+        self.post(action="update", select_all="on", filter_status="", q="hero", description="Hero")
+        self.assertEqual(list(Items.objects.filter(description="Hero")), [self.items[2]])
+
+@override_settings(STORAGES=TEST_STORAGES, SESSION_ENGINE=CACHE_SESSIONS)
+class StatusWorkflowTests(ItemsTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.items = [
+            Items.objects.create(project=self.project, title=f"Shot {i}") for i in range(4)
+        ]
+        self.client.force_login(self.user)
+        session = self.client.session
+        store_active_project(session, self.project)
+        session.save()
+
+    def stored_counts(self, project=None):
+        rows = StatusCount.objects.filter(project=project or self.project).exclude(count=0)
+        return dict(rows.values_list("status", "count"))
+
+    def assert_counts_match(self, project=None):
+        actual = (
+            Items.objects.filter(project=project or self.project)
+            .order_by()
+            .values_list("status")
+            .annotate(count=Count("id"))
+        )
+        self.assertEqual(self.stored_counts(project), dict(actual))
+
+    def test_transitions_are_validated(self):
+        item = Items.objects.get(pk=self.items[0].pk)
+        item.status = Items.Status.DELIVERED
+        with self.assertRaises(ValidationError):
+            item.full_clean()
+
+        response = self.client.post(
+            f"/items/{item.pk}/update", {"title": item.title, "status": "delivered"}
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(
+            f"/items/{item.pk}/update", {"title": item.title, "status": "filming"}
+        )
+        self.assertEqual(response.status_code, 302)
+        item.refresh_from_db()
+        self.assertEqual(item.status, Items.Status.FILMING)
+        self.assert_counts_match()
+
+    def test_counters_follow_every_write_path(self):
+        self.assertEqual(self.stored_counts(), {"pre_filming": 4})
+        item = Items.objects.get(pk=self.items[0].pk)
+        item.status = Items.Status.FILMING
+        item.save()
+        self.assertEqual(self.stored_counts(), {"pre_filming": 3, "filming": 1})
+
+        item.delete()
+        Items.objects.bulk_create(
+            [Items(project=self.project, title="Late", status=Items.Status.FILMING)]
+        )
+        Items.objects.filter(pk=self.items[1].pk).delete()
+        self.assert_counts_match()
+
+        other = Project.objects.create(owner=self.user, title="Other")
+        bulk_move(self.project, [self.items[2].pk], other, self.user)
+        self.assert_counts_match()
+        self.assert_counts_match(other)
+
+    def test_bulk_move_locks_the_rows_it_counts(self):
+        other = Project.objects.create(owner=self.user, title="Other")
+        with mock.patch.object(
+            ItemsQuerySet,
+            "select_for_update",
+            autospec=True,
+            side_effect=QuerySet.select_for_update,
+        ) as lock:
+            self.assertEqual(bulk_move(self.project, None, other, self.user), 4)
+        lock.assert_called_once()
+        self.assert_counts_match()
+        self.assert_counts_match(other)
+
+    def test_bulk_status_skips_items_that_cant_move_there(self):
+        Items.objects.filter(pk=self.items[0].pk).update(status=Items.Status.REVIEW)
+        StatusCount.objects.rebuild([self.project.pk])
+
+        moved = bulk_set_status(self.project, None, self.user, Items.Status.FILMING)
+        self.assertEqual(moved, 3)
+        self.assertEqual(self.stored_counts(), {"filming": 3, "review": 1})
+
+        response = self.client.post(
+            "/items/bulk/",
+            {"action": "status", "items": [self.items[0].pk], "status": "delivered"},
+        )
+        self.assertRedirects(response, "/items/", fetch_redirect_response=False)
+        self.assertEqual(self.stored_counts(), {"filming": 3, "delivered": 1})
+
+    def test_board_costs_the_same_whatever_its_size(self):
+        def board_queries():
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get("/items/board/")
+            self.assertEqual(response.status_code, 200)
+            return len(captured), response
+
+        # Warm the session and permission caches first
+        board_queries()
+        small, _ = board_queries()
+        Items.objects.bulk_create(
+            Items(project=self.project, title=f"Take {i}", status=status)
+            for i in range(30)
+            for status in Items.Status.values
+        )
+        large, response = board_queries()
+        # User, the page's ETag stamp, the column counters, then the first page
+        # of every column in one windowed query
+        self.assertEqual((small, large), (4, 4))
+
+        columns = {column.status: column for column in response.context["columns"]}
+        self.assertEqual(columns["filming"].count, 30)
+        self.assertEqual(len(columns["filming"].items), 10)
+        self.assertContains(response, "View all 30")
+
+    def test_board_card_moves_one_step(self):
+        item = self.items[0]
+        response = self.client.post(f"/items/{item.pk}/status/", {"status": "delivered"})
+        self.assertRedirects(response, "/items/board/", fetch_redirect_response=False)
+        item.refresh_from_db()
+        self.assertEqual(item.status, Items.Status.PRE_FILMING)
+
+        self.client.post(f"/items/{item.pk}/status/", {"status": "filming"})
+        item.refresh_from_db()
+        self.assertEqual(item.status, Items.Status.FILMING)
+        self.assert_counts_match()
+
+    def test_reconcile_rebuilds_drifted_columns(self):
+        StatusCount.objects.filter(project=self.project).update(count=99)
+        reconcile_item_counters()
+        self.assertEqual(self.stored_counts(), {"pre_filming": 4})
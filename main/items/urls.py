@@ -3,8 +3,13 @@ from . import views
 
 urlpatterns = [
     path("create/", views.item_create_view, name="item_create"),
+    path("import/", views.item_import_view, name="item_import"),
+    path("export/", views.item_export_view, name="item_export"),
+    path("bulk/", views.item_bulk_view, name="item_bulk"),
+    path("board/", views.item_board_view, name="item_board"),
     path("", views.item_list_view, name="item_list"),
     path("<int:id>/", views.item_detail_view, name="item_detail"),
     path("<int:id>/delete/", views.item_detail_delete_view, name="item_delete"),
     path("<int:id>/update", views.item_detail_update_view, name="item_update"),
+    path("<int:id>/status/", views.item_status_view, name="item_status"),
 ]
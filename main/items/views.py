@@ -1,28 +1,43 @@
 from typing import Any
 
 
-from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.decorators import login_required
+from django.http import StreamingHttpResponse
+from django.shortcuts import render, redirect
 from django.contrib import messages
-from .forms import ItemsForm
-from .models import Items
+from .board import aload_board
+from .bulk import bulk_delete, bulk_move, bulk_set_status, bulk_update
+from .forms import ItemsBulkForm, ItemsForm, ItemsImportForm
+from .exporters import EXPORT_CONTENT_TYPES, iter_export
+from .importers import guess_format, import_items, iter_rows
+from .models import Items, StatusCount
+from .search import search_items
+from main.utils.asyncviews import aget_object_or_404, arender, login_required
+from main.utils.conditional import conditional_page
+from main.utils.fragments import aattach_cached_fragments
+from main.utils.pagination import apaginate_request, get_page_size
+from projects.models import Project
+from projects.permissions import CHANGE_ITEMS, check_active_project_permission, role_allows
+
+# Items shown per board column; the rest are a "view all" away
+BOARD_COLUMN_SIZE = 10
 
 # Create your views here.
 
 
 @login_required
-def item_create_view(request):
+async def item_create_view(request):
     # Check if user has an active project (based on your project memory)
     if not hasattr(request, "active_project") or request.active_project is None:
         messages.error(request, "Please activate a project first.")
-        return render(request, "projects/activate.html", {})
+        return await arender(request, "projects/activate.html", {})
+    check_active_project_permission(request, CHANGE_ITEMS)
 
     form = ItemsForm(request.POST or None)
     if form.is_valid():
         item_obj = form.save(commit=False)
         item_obj.project = request.active_project
         item_obj.added_by = request.user
-        item_obj.save()
+        await item_obj.asave()
         messages.success(request, f"Item '{item_obj.title}' created successfully!")
         return redirect("item_create")  # Redirect to clear form
 
@@ -31,43 +46,273 @@ def item_create_view(request):
         "active_project": request.active_project,
     }
 
-    return render(request, "items/create.html", context)
+    return await arender(request, "items/create.html", context)
 
 
 @login_required
-def item_list_view(request):
-    # Check if user has an active project
+def item_import_view(request):
     if not hasattr(request, "active_project") or request.active_project is None:
         messages.error(request, "Please activate a project first.")
         return render(request, "projects/activate.html", {})
+    check_active_project_permission(request, CHANGE_ITEMS)
 
-    object_list = Items.objects.filter(project=request.active_project)  # type: ignore
-    return render(request, "items/list.html", {"object_list": object_list})
+    form = ItemsImportForm(request.POST or None, request.FILES or None)
+    result = None
+    if form.is_valid():
+        upload = form.cleaned_data["file"]
+        fmt = form.cleaned_data["format"] or guess_format(upload.name)
+        # Large uploads are spooled to disk by Django; read them back in a stream
+        with upload.open("rb") as fileobj:
+            result = import_items(
+                iter_rows(fileobj, fmt), request.active_project, request.user
+            )
+        if result.file_error:
+            form.add_error("file", result.file_error)
+        else:
+            messages.success(
+                request,
+                f"Imported {result.created} item{'s' if result.created != 1 else ''}"
+                f" ({result.skipped} skipped).",
+            )
+
+    context = {
+        "form": form,
+        "result": result,
+        "active_project": request.active_project,
+    }
+    return render(request, "items/import.html", context)
 
 
 @login_required
-def item_detail_view(request, id=None):
-    # Check if user has an active project
+def item_bulk_view(request):
+    """Apply one action to many items; sync because it runs in a transaction."""
     if not hasattr(request, "active_project") or request.active_project is None:
         messages.error(request, "Please activate a project first.")
         return render(request, "projects/activate.html", {})
+    check_active_project_permission(request, CHANGE_ITEMS)
+    if request.method != "POST":
+        return redirect("item_list")
+
+    project = request.active_project
+    form = ItemsBulkForm(request.POST, roles=request.project_roles, project=project)
+    if not form.is_valid():
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(request, error)
+        return redirect("item_list")
 
-    instance: Items = get_object_or_404(Items, id=id, project=request.active_project)  # type: ignore
-    return render(request, "items/detail.html", {"object": instance})
+    action = form.cleaned_data["action"]
+    ids = form.selected_ids()
+    if action == "delete":
+        count = bulk_delete(project, ids, request.user)
+        done = "deleted"
+    elif action == "move":
+        target = form.cleaned_data["target"]
+        count = bulk_move(project, ids, target, request.user)
+        done = f"moved to '{target.title}'"
+    elif action == "status":
+        status = form.cleaned_data["status"]
+        count = bulk_set_status(project, ids, request.user, status)
+        done = f"set to {Items.Status(status).label.lower()}"
+    else:
+        count = bulk_update(
+            project, ids, request.user, description=form.cleaned_data["description"]
+        )
+        done = "updated"
+    messages.success(request, f"{count} item{'s' if count != 1 else ''} {done}.")
+    return redirect("item_list")
 
 
 @login_required
-def item_detail_update_view(request, id=None):
+def item_export_view(request):
     if not hasattr(request, "active_project") or request.active_project is None:
         messages.error(request, "Please activate a project first.")
         return render(request, "projects/activate.html", {})
 
-    instance: Items = get_object_or_404(Items, id=id, project=request.active_project)  # type: ignore
+    fmt = request.GET.get("format", "csv")
+    if fmt not in EXPORT_CONTENT_TYPES:
+        fmt = "csv"
+    response = StreamingHttpResponse(
+        iter_export(request.active_project, fmt),
+        content_type=EXPORT_CONTENT_TYPES[fmt],
+    )
+    filename = f"{request.active_project.handle}-items.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+async def item_list_stamp(request):
+    if getattr(request, "active_project", None) is None:
+        return None
+    # Every item write moves the project row's counters or `updated` (see
+    # projects.counters), so one primary key lookup stands in for the items
+    stats = await (
+        Project.all_objects.filter(pk=request.active_project.pk)  # type: ignore
+        .values("items_count", "updated")
+        .afirst()
+    )
+    if stats is None:
+        return None
+    # Reused by the view for the header count
+    request.items_stats = stats
+    return (stats["items_count"], stats["updated"]), stats["updated"]
+
+
+async def aitems_count(request, status=None):
+    """The active project's item count, or one status's, from the counters."""
+    if status:
+        count = await (
+            StatusCount.objects.filter(project=request.active_project, status=status)  # type: ignore
+            .values_list("count", flat=True)
+            .afirst()
+        )
+        return count or 0
+    stats = getattr(request, "items_stats", None)
+    if stats is None:
+        stats = await (
+            Project.all_objects.filter(pk=request.active_project.pk)  # type: ignore
+            .values("items_count")
+            .afirst()
+        )
+    return stats["items_count"] if stats else 0
+
+
+async def item_detail_stamp(request, id=None):
+    if getattr(request, "active_project", None) is None:
+        return None
+    last_modified_at = await (
+        Items.objects.filter(id=id, project=request.active_project)  # type: ignore
+        .values_list("last_modified_at", flat=True)
+        .afirst()
+    )
+    if last_modified_at is None:
+        return None
+    return (id, last_modified_at), last_modified_at
+
+
+@login_required
+@conditional_page(item_list_stamp)
+async def item_list_view(request):
+    # Check if user has an active project
+    if not hasattr(request, "active_project") or request.active_project is None:
+        messages.error(request, "Please activate a project first.")
+        return await arender(request, "projects/activate.html", {})
+
+    items_qs = Items.objects.filter(project=request.active_project)  # type: ignore
+    status = request.GET.get("status")
+    if status not in Items.Status.values:
+        status = None
+    if status:
+        # A board column's "view all"; served by the (project, status, timestamp) index
+        items_qs = items_qs.filter(status=status)
+    query = request.GET.get("q", "").strip()
+    match_count = None
+    if query:
+        # Ranked results aren't keyset-pageable; show the best matches only
+        matches = search_items(items_qs, query)
+        object_list = [item async for item in matches[: get_page_size(request)]]
+        match_count = await matches.acount()
+    else:
+        object_list = await apaginate_request(request, items_qs)
+    await aattach_cached_fragments(
+        object_list, "items/card.html", "last_modified_at", context_name="item"
+    )
+    items_count = await aitems_count(request, status)
+
+    context = {
+        "object_list": object_list,
+        "items_count": items_count,
+        "query": query,
+        "match_count": match_count,
+        "status": status,
+        "status_choices": Items.Status.choices,
+        "can_change_items": role_allows(request.project_role, CHANGE_ITEMS),
+        "active_project": request.active_project,
+    }
+    return await arender(request, "items/list.html", context)
+
+
+@login_required
+@conditional_page(item_list_stamp)
+async def item_board_view(request):
+    """The production board: one column per status, newest items first."""
+    if not hasattr(request, "active_project") or request.active_project is None:
+        messages.error(request, "Please activate a project first.")
+        return await arender(request, "projects/activate.html", {})
+
+    columns = await aload_board(request.active_project, BOARD_COLUMN_SIZE)
+    context = {
+        "columns": columns,
+        "can_change_items": role_allows(request.project_role, CHANGE_ITEMS),
+        "active_project": request.active_project,
+    }
+    return await arender(request, "items/board.html", context)
+
+
+@login_required
+async def item_status_view(request, id=None):
+    """Move one item to another status, e.g. from a board card."""
+    if not hasattr(request, "active_project") or request.active_project is None:
+        messages.error(request, "Please activate a project first.")
+        return await arender(request, "projects/activate.html", {})
+    check_active_project_permission(request, CHANGE_ITEMS)
+    if request.method != "POST":
+        return redirect("item_board")
+
+    instance = await aget_object_or_404(
+        Items.objects, id=id, project=request.active_project  # type: ignore
+    )
+    instance.project = request.active_project
+    status = request.POST.get("status")
+    if status not in Items.Status.values or not instance.can_move_to(status):
+        messages.error(request, f"'{instance.title}' can't move there from its current status.")
+        return redirect("item_board")
+
+    instance.status = status
+    instance.last_modified_by = request.user
+    await instance.asave()
+    messages.success(
+        request, f"'{instance.title}' moved to {instance.get_status_display().lower()}."
+    )
+    return redirect("item_board")
+
+
+@login_required
+@conditional_page(item_detail_stamp)
+async def item_detail_view(request, id=None):
+    # Check if user has an active project
+    if not hasattr(request, "active_project") or request.active_project is None:
+        messages.error(request, "Please activate a project first.")
+        return await arender(request, "projects/activate.html", {})
+
+    instance = await aget_object_or_404(
+        Items.objects, id=id, project=request.active_project  # type: ignore
+    )
+    # Already loaded; saves the template a lazy (and, in async code, illegal) query
+    instance.project = request.active_project
+    context = {
+        "object": instance,
+        "can_change_items": role_allows(request.project_role, CHANGE_ITEMS),
+    }
+    return await arender(request, "items/detail.html", context)
+
+
+@login_required
+async def item_detail_update_view(request, id=None):
+    if not hasattr(request, "active_project") or request.active_project is None:
+        messages.error(request, "Please activate a project first.")
+        return await arender(request, "projects/activate.html", {})
+    check_active_project_permission(request, CHANGE_ITEMS)
+
+    instance = await aget_object_or_404(
+        Items.objects, id=id, project=request.active_project  # type: ignore
+    )
+    instance.project = request.active_project
     form = ItemsForm(request.POST or None, instance=instance)
     if form.is_valid():
         item_obj = form.save(commit=False)
         item_obj.last_modified_by = request.user
-        item_obj.save()
+        await item_obj.asave()
         messages.success(request, f"Item '{item_obj.title}' updated successfully!")
         return redirect("item_detail", id=item_obj.id)
 
@@ -76,16 +321,20 @@ def item_detail_update_view(request, id=None):
         "object": instance,
         "active_project": request.active_project,
     }
-    return render(request, "items/update.html", context)
+    return await arender(request, "items/update.html", context)
 
 
 @login_required
-def item_detail_delete_view(request, id=None):
+async def item_detail_delete_view(request, id=None):
     if not hasattr(request, "active_project") or request.active_project is None:
         messages.error(request, "Please activate a project first.")
-        return render(request, "projects/activate.html", {})
+        return await arender(request, "projects/activate.html", {})
+    check_active_project_permission(request, CHANGE_ITEMS)
 
-    instance: Items = get_object_or_404(Items, id=id, project=request.active_project)
+    instance = await aget_object_or_404(
+        Items.objects, id=id, project=request.active_project  # type: ignore
+    )
+    instance.project = request.active_project
 
     if request.method == "POST":
         # Check confirmation
@@ -94,7 +343,7 @@ def item_detail_delete_view(request, id=None):
 
         if confirm_title == instance.title and confirm_understand:
             item_title = instance.title
-            instance.delete()
+            await instance.adelete()
             messages.success(request, f"Item '{item_title}' deleted successfully!")
             return redirect("item_list")
         else:
@@ -107,4 +356,4 @@ def item_detail_delete_view(request, id=None):
         "object": instance,
         "active_project": request.active_project,
     }
-    return render(request, "items/delete.html", context)
+    return await arender(request, "items/delete.html", context)
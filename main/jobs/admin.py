@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["task", "queue", "status", "priority", "attempts", "run_at", "timestamp"]
+    list_filter = ["status", "queue"]
+    search_fields = ["task"]
+    readonly_fields = ["locked_by", "locked_until", "last_error", "timestamp", "finished_at"]
@@ -0,0 +1,19 @@
+"""
+Set-up for the job worker's spawned processes.
+
+Kept free of model imports: a spawned child unpickles the initializer before
+it runs, so importing this module must not need the app registry.
+"""
+from importlib import import_module
+
+
+def init_process(databases, task_modules):
+    import django
+    from django.conf import settings
+
+    # The parent's resolved databases, e.g. the test database under a test run
+    settings.DATABASES = databases
+    django.setup()
+    # Tasks registered outside the tasks.py modules that setup() discovers
+    for module in task_modules:
+        import_module(module)
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the database queue until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queue",
+            action="append",
+            metavar="NAME[:CONCURRENCY]",
+            help="Queue to work and how many of its jobs may run at once "
+            "(repeatable; default: JOBS_QUEUES)",
+        )
+        parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--burst", action="store_true", help="Exit once the queues are empty"
+        )
+
+    def handle(self, *args, **options):
+        concurrency = dict(settings.JOBS_QUEUES)
+        if options["queue"]:
+            concurrency = {}
+            for spec in options["queue"]:
+                name, _, limit = spec.partition(":")
+                try:
+                    concurrency[name] = int(limit or 1)
+                except ValueError:
+                    raise CommandError(f"Invalid queue '{spec}'")
+
+        worker = Worker(
+            concurrency, pool=options["pool"], poll_interval=options["poll_interval"]
+        )
+        self.stdout.write(
+            f"Worker {worker.name} ({options['pool']} pool): "
+            + ", ".join(f"{q}×{n}" for q, n in concurrency.items())
+        )
+        worker.run(burst=options["burst"])
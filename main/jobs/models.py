@@ -0,0 +1,69 @@
+from django.db import models
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+class JobQuerySet(models.QuerySet):
+    def claimable(self, queue, now=None):
+        """
+        Due queued jobs, plus running jobs whose worker let the lease expire and
+        that have attempts left.
+        """
+        now = now or timezone.now()
+        return self.filter(queue=queue).filter(
+            Q(status=Job.Status.QUEUED, run_at__lte=now)
+            | Q(
+                status=Job.Status.RUNNING,
+                locked_until__lt=now,
+                attempts__lt=F("max_attempts"),
+            )
+        )
+
+    def abandoned(self, queue, now=None):
+        """Running jobs whose lease expired during their last attempt."""
+        now = now or timezone.now()
+        return self.filter(
+            queue=queue,
+            status=Job.Status.RUNNING,
+            locked_until__lt=now,
+            attempts__gte=F("max_attempts"),
+        )
+
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    queue = models.CharField(max_length=50, default="default")
+    task = models.CharField(max_length=200, help_text="Registered task name")
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    # Lease held by the worker running the job; it becomes claimable again after
+    # locked_until, so a crashed worker's jobs are retried
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    timestamp = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-timestamp"]
+        indexes = [
+            models.Index(
+                fields=["queue", "status", "-priority", "run_at"], name="jobs_claim_idx"
+            ),
+            models.Index(fields=["locked_by"], name="jobs_locked_by_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
@@ -0,0 +1,203 @@
+import logging
+import threading
+import traceback
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import DatabaseError, connections, router, transaction
+from django.utils import timezone
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# name -> Task
+registry = {}
+
+
+class Task:
+    def __init__(self, func, name, queue, priority, max_attempts):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.priority = priority
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, priority=None, delay=None, **kwargs):
+        """Queue a run; args and kwargs must be JSON-serializable."""
+        return enqueue(self.name, args, kwargs, priority=priority, delay=delay)
+
+
+def task(queue="default", priority=0, max_attempts=3, name=None):
+    """
+    Register a function as a background task.
+
+        @task(queue="imports")
+        def import_file(asset_id): ...
+
+        import_file.enqueue(asset.pk)
+    """
+
+    def decorator(func):
+        task_name = name or f"{func.__module__}.{func.__name__}"
+        registry[task_name] = Task(func, task_name, queue, priority, max_attempts)
+        return registry[task_name]
+
+    return decorator
+
+
+def enqueue(name, args=(), kwargs=None, priority=None, delay=None):
+    registered = registry[name]
+    job = Job.objects.create(  # type: ignore
+        queue=registered.queue,
+        task=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        priority=registered.priority if priority is None else priority,
+        max_attempts=registered.max_attempts,
+        run_at=timezone.now() + (delay or timedelta()),
+    )
+    return job
+
+
+def claim_jobs(queue, worker, limit, lease=None):
+    """
+    Lease up to `limit` due jobs from `queue` for `worker`.
+
+    Expired leases on a job's last attempt are marked failed rather than
+    leased again: a job that keeps killing its worker (out of memory, a
+    crashing library) would otherwise be retried forever.
+
+    On PostgreSQL candidates are picked with SELECT ... FOR UPDATE SKIP LOCKED,
+    so concurrent workers never block on or double-claim the same rows. SQLite
+    has no row locks; there the pick and the lease are one UPDATE statement,
+    which SQLite runs under its database-wide write lock.
+    """
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    lease = lease or timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+    Job.objects.abandoned(queue, now).update(  # type: ignore
+        status=Job.Status.FAILED,
+        finished_at=now,
+        locked_until=None,
+        last_error="The lease expired during the last attempt; the worker likely crashed.",
+    )
+    token = f"{worker}:{uuid.uuid4().hex[:12]}"
+    candidates = Job.objects.claimable(queue, now).order_by(  # type: ignore
+        "-priority", "run_at", "id"
+    )
+    lease_fields = {
+        "status": Job.Status.RUNNING,
+        "locked_by": token,
+        "locked_until": now + lease,
+    }
+
+    connection = connections[router.db_for_write(Job)]
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=connection.alias):
+            ids = list(
+                candidates.select_for_update(skip_locked=True).values_list("pk", flat=True)[
+                    :limit
+                ]
+            )
+            Job.objects.filter(pk__in=ids).update(**lease_fields)  # type: ignore
+    else:
+        # Re-check claimability in the UPDATE itself so a racing worker's
+        # lease is never overwritten
+        Job.objects.claimable(queue, now).filter(  # type: ignore
+            pk__in=list(candidates.values_list("pk", flat=True)[:limit])
+        ).update(**lease_fields)
+
+    return list(Job.objects.filter(locked_by=token, status=Job.Status.RUNNING))  # type: ignore
+
+
+def retry_delay(attempts):
+    """Exponential backoff: 10s, 20s, 40s, ... capped at an hour."""
+    seconds = settings.JOBS_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, 3600))
+
+
+class Heartbeat(threading.Thread):
+    """
+    Extend a running job's lease every third of JOBS_LEASE_SECONDS, so a job
+    that runs longer than the lease isn't taken over and run twice.
+    """
+
+    def __init__(self, job_id, token):
+        super().__init__(name=f"job-{job_id}-heartbeat", daemon=True)
+        self.job_id = job_id
+        self.token = token
+        self.lease = timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.lease.total_seconds() / 3):
+                renewed = Job.objects.filter(  # type: ignore
+                    pk=self.job_id, locked_by=self.token, status=Job.Status.RUNNING
+                ).update(locked_until=timezone.now() + self.lease)
+                if not renewed:
+                    # Lease lost; run_job's conditional writes handle the rest
+                    return
+        except DatabaseError:
+            logger.exception("Could not renew the lease of job %s", self.job_id)
+        finally:
+            # Connections are per thread
+            connections.close_all()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.join()
+
+
+def run_job(job_id, token):
+    """
+    Execute a leased job and record the outcome.
+
+    A heartbeat keeps the lease alive while the task runs. Every write is
+    conditional on still holding the lease, so a worker that lost it anyway
+    (e.g. stalled past `locked_until`) can't clobber the one that took over.
+    Returns the job's new status, or None if the lease was lost.
+    """
+    try:
+        job = Job.objects.get(pk=job_id, locked_by=token)  # type: ignore
+    except Job.DoesNotExist:  # type: ignore
+        # Lease expired and another worker took the job over
+        return None
+    leased = Job.objects.filter(pk=job_id, locked_by=token)  # type: ignore
+    attempts = job.attempts + 1
+    leased.update(attempts=attempts)
+
+    try:
+        registered = registry[job.task]
+        with Heartbeat(job_id, token):
+            registered.func(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Job %s (%s) failed on attempt %s", job.pk, job.task, attempts)
+        if attempts < job.max_attempts:
+            leased.update(
+                status=Job.Status.QUEUED,
+                run_at=timezone.now() + retry_delay(attempts),
+                locked_by="",
+                locked_until=None,
+                last_error=error,
+            )
+            return Job.Status.QUEUED
+        leased.update(
+            status=Job.Status.FAILED,
+            finished_at=timezone.now(),
+            locked_until=None,
+            last_error=error,
+        )
+        return Job.Status.FAILED
+
+    leased.update(status=Job.Status.DONE, finished_at=timezone.now(), locked_until=None)
+    return Job.Status.DONE
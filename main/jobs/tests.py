@@ -0,0 +1,116 @@
+import time
+from datetime import timedelta
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from .models import Job
+from .queue import claim_jobs, run_job, task
+from .worker import Worker
+
+calls = []
+
+
+@task(queue="test", priority=0, max_attempts=2)
+def record(value):
+    calls.append(value)
+
+
+@task(queue="test", max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+@task(queue="test", max_attempts=2)
+def outlast_lease(seconds):
+    time.sleep(seconds)
+    # Another worker polling now must not be able to take the job over
+    calls.append(len(claim_jobs("test", "w2", 1)))
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claims_by_priority_and_skips_leased_jobs(self):
+        low = record.enqueue("low")
+        high = record.enqueue("high", priority=5)
+        record.enqueue("later", delay=timedelta(hours=1))
+
+        first = claim_jobs("test", "w1", 1)
+        self.assertEqual([job.pk for job in first], [high.pk])
+        second = claim_jobs("test", "w2", 5)
+        self.assertEqual([job.pk for job in second], [low.pk])
+        # Nothing due is left for a third worker
+        self.assertEqual(claim_jobs("test", "w3", 5), [])
+
+    def test_expired_lease_is_reclaimed(self):
+        job = record.enqueue("x")
+        (leased,) = claim_jobs("test", "w1", 1)
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        (reclaimed,) = claim_jobs("test", "w2", 1)
+        self.assertEqual(reclaimed.pk, job.pk)
+        # The original worker lost its lease and must not record a result
+        self.assertIsNone(run_job(job.pk, leased.locked_by))
+        self.assertEqual(run_job(job.pk, reclaimed.locked_by), Job.Status.DONE)
+        self.assertEqual(calls, ["x"])
+
+    def test_failures_are_retried_then_marked_failed(self):
+        job = explode.enqueue()
+        (leased,) = claim_jobs("test", "w1", 1)
+        self.assertEqual(run_job(job.pk, leased.locked_by), Job.Status.QUEUED)
+        job.refresh_from_db()
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("boom", job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        (leased,) = claim_jobs("test", "w1", 1)
+        self.assertEqual(run_job(job.pk, leased.locked_by), Job.Status.FAILED)
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+
+
+    def test_expired_lease_on_the_last_attempt_fails_the_job(self):
+        job = explode.enqueue()
+        (leased,) = claim_jobs("test", "w1", 1)
+        # The worker died mid-run on its last attempt
+        Job.objects.filter(pk=job.pk).update(
+            attempts=2, locked_until=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(claim_jobs("test", "w2", 1), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIn("lease expired", job.last_error)
+
+
+class WorkerTests(TransactionTestCase):
+    def test_burst_worker_drains_queue_on_thread_pool(self):
+        calls.clear()
+        for value in range(5):
+            record.enqueue(value)
+
+        Worker({"test": 2}, poll_interval=0.05).run(burst=True)
+
+        self.assertEqual(sorted(calls), list(range(5)))
+        self.assertFalse(Job.objects.exclude(status=Job.Status.DONE).exists())
+
+    def test_burst_worker_runs_jobs_on_process_pool(self):
+        jobs = [record.enqueue(value) for value in range(3)]
+
+        Worker({"test": 2}, pool="process", poll_interval=0.05).run(burst=True)
+
+        self.assertEqual(
+            {job.status for job in Job.objects.filter(pk__in=[job.pk for job in jobs])},
+            {Job.Status.DONE},
+        )
+        # This process's connection still works after the children closed theirs
+        self.assertEqual(Job.objects.count(), 3)
+
+    @override_settings(JOBS_LEASE_SECONDS=0.3)
+    def test_heartbeat_keeps_long_jobs_leased(self):
+        calls.clear()
+        job = outlast_lease.enqueue(0.6)
+        (leased,) = claim_jobs("test", "w1", 1)
+
+        self.assertEqual(run_job(job.pk, leased.locked_by), Job.Status.DONE)
+        self.assertEqual(calls, [0])
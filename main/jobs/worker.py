@@ -0,0 +1,104 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from django.conf import settings
+from django.db import connections
+from .bootstrap import init_process
+from .queue import claim_jobs, registry, run_job
+
+logger = logging.getLogger(__name__)
+
+
+def execute(job_id, token):
+    """Pool entry point: run one job, then release this thread's/process's connections."""
+    try:
+        return run_job(job_id, token)
+    finally:
+        connections.close_all()
+
+
+class Worker:
+    """
+    Poll queues and run their jobs on a thread or process pool.
+
+    `concurrency` maps queue name -> max jobs of that queue running at once in
+    this worker. Scale out by running more worker processes or pods; they
+    coordinate only through the job table.
+    """
+
+    def __init__(self, concurrency, pool="thread", poll_interval=1.0, name=None):
+        self.concurrency = concurrency
+        self.pool_kind = pool
+        self.poll_interval = poll_interval
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.in_flight = {}  # future -> queue
+        self.stopping = False
+
+    def make_pool(self):
+        workers = sum(self.concurrency.values())
+        if self.pool_kind == "process":
+            # Spawned, not forked: forked children would share the database
+            # sockets claim_jobs() keeps open in this process
+            return ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_process,
+                initargs=(
+                    settings.DATABASES,
+                    sorted({registered.func.__module__ for registered in registry.values()}),
+                ),
+            )
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+
+    def running(self, queue):
+        return sum(1 for q in self.in_flight.values() if q == queue)
+
+    def fill(self, pool):
+        """Claim up to each queue's free slots; returns the number of jobs started."""
+        started = 0
+        for queue, limit in self.concurrency.items():
+            for job in claim_jobs(queue, self.name, limit - self.running(queue)):
+                self.in_flight[pool.submit(execute, job.pk, job.locked_by)] = queue
+                started += 1
+        return started
+
+    def reap(self, timeout):
+        if not self.in_flight:
+            time.sleep(timeout)
+            return
+        done, _ = wait(self.in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            self.in_flight.pop(future)
+            exc = future.exception()
+            if exc is not None:
+                logger.error("Worker pool error: %r", exc)
+
+    def stop(self, *args):
+        logger.info("Worker %s stopping after running jobs finish", self.name)
+        self.stopping = True
+
+    def run(self, burst=False):
+        """
+        Work until stopped (SIGTERM/SIGINT), or with `burst` until the queues are
+        empty. In-flight jobs always finish before returning.
+        """
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                signal.signal(sig, self.stop)
+            except ValueError:
+                # Not the main thread (e.g. under a test runner)
+                pass
+
+        with self.make_pool() as pool:
+            while not self.stopping:
+                started = self.fill(pool)
+                if burst and not started and not self.in_flight:
+                    break
+                # Returns as soon as a job finishes, so freed slots refill promptly
+                self.reap(self.poll_interval)
+            while self.in_flight:
+                self.reap(self.poll_interval)
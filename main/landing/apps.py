@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class LandingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'landing'
+
+    def ready(self):
+        # The site-wide checks live with the project settings
+        from main import checks  # noqa: F401
@@ -0,0 +1,51 @@
+import statistics
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what request instrumentation (Server-Timing, /metrics) costs by "
+        "timing the same page with METRICS_ENABLED on and off."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="/")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--user", help="Username to log in as for the requests")
+
+    def timed_get(self, client, path):
+        start = time.perf_counter()
+        response = client.get(path)
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise CommandError(f"GET {path} returned {response.status_code}")
+        return elapsed
+
+    def handle(self, *args, **options):
+        client = Client()
+        if options["user"]:
+            user = get_user_model().objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"User '{options['user']}' does not exist")
+            client.force_login(user)
+
+        samples = {True: [], False: []}
+        # Warm caches and URL/template loaders first, then interleave the two
+        # modes so drift (GC, CPU frequency) hits both equally
+        for enabled in (True, False):
+            with override_settings(METRICS_ENABLED=enabled):
+                self.timed_get(client, options["path"])
+        for _ in range(options["requests"]):
+            for enabled in (True, False):
+                with override_settings(METRICS_ENABLED=enabled):
+                    samples[enabled].append(self.timed_get(client, options["path"]))
+
+        on = statistics.median(samples[True]) * 1e6
+        off = statistics.median(samples[False]) * 1e6
+        self.stdout.write(
+            f"{options['path']}: median {off:.0f}µs without metrics, {on:.0f}µs with "
+            f"({on - off:+.0f}µs, {(on - off) / off:+.1%}) over {options['requests']} requests"
+        )
@@ -0,0 +1,34 @@
+import sqlite3
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from main.utils.replicas import PRIMARY_ALIAS, REPLICA_ALIAS, replica_configured
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database over the replica SQLite database. Stands in "
+        "for replication when trying read replicas locally: run it after migrate, then "
+        "again whenever the replica should catch up."
+    )
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError("Set DATABASE_REPLICA_URL to configure a replica first")
+        names = {}
+        for alias in (PRIMARY_ALIAS, REPLICA_ALIAS):
+            settings_dict = connections[alias].settings_dict
+            if settings_dict["ENGINE"] != "django.db.backends.sqlite3":
+                raise CommandError(f"'{alias}' is not an SQLite database")
+            names[alias] = str(settings_dict["NAME"])
+        if names[PRIMARY_ALIAS] == names[REPLICA_ALIAS]:
+            raise CommandError("The primary and the replica are the same file")
+
+        source = sqlite3.connect(names[PRIMARY_ALIAS])
+        target = sqlite3.connect(names[REPLICA_ALIAS])
+        try:
+            # The backup API copies a consistent snapshot even mid-write
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+        self.stdout.write(f"Copied {names[PRIMARY_ALIAS]} to {names[REPLICA_ALIAS]}")
@@ -1,3 +1,304 @@
-from django.test import TestCase
+from types import SimpleNamespace
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from main.checks import check_shared_caches
+from main.middleware import ReplicaRoutingMiddleware
+from main.utils import throttling
+from main.utils.metrics import registry
+from main.utils.replicas import ReplicaRouter
+from main.utils.sessions import SessionStore
+from main.utils.throttling import Rate, parse_rate, retry_after
+from projects.models import Project
 
-# Create your tests here.
+User = get_user_model()
+
+TEST_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+
+    def test_server_timing_reports_queries_templates_and_cache(self):
+        user = User.objects.create_user(username="owner", password="pass")
+        Project.objects.create(owner=user, title="Launch")
+        self.client.force_login(user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/projects/")
+        timing = response["Server-Timing"]
+
+        self.assertIn(f'db;desc="{len(queries)} queries"', timing)
+        self.assertRegex(timing, r"tpl;dur=\d+\.\d")
+        # Cold cache: the permission matrix misses, the switcher misses once
+        # (then hits), the project card misses
+        self.assertIn('cache;desc="1 hit 3 miss"', timing)
+        self.assertRegex(timing, r"total;dur=\d+\.\d")
+
+    def test_metrics_endpoint_exposes_histograms_per_view(self):
+        self.client.get("/about/")
+        self.client.get("/about/")
+        self.client.force_login(User.objects.create_user(username="ops", is_staff=True))
+        body = self.client.get("/metrics").content.decode()
+
+        self.assertIn('contentengine_request_duration_seconds_count{view="about"} 2', body)
+        self.assertIn('contentengine_requests_total{view="about",status="2xx"} 2', body)
+        self.assertIn('contentengine_db_queries_bucket{view="about",le="0"} 2', body)
+        self.assertNotIn('view="metrics"', body)
+
+    def test_metrics_are_staff_only_without_a_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        self.client.force_login(User.objects.create_user(username="member"))
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_metrics_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled_metrics_add_no_header(self):
+        self.assertNotIn("Server-Timing", self.client.get("/about/"))
+
+
+class WriteBehindSessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = SessionStore()
+        self.session["step"] = 1
+        self.session.create()
+
+    def stored(self):
+        return Session.objects.get(pk=self.session.session_key).get_decoded()
+
+    def test_creation_is_written_through(self):
+        self.assertEqual(self.stored(), {"step": 1})
+
+    def test_changes_reach_the_database_once_per_window(self):
+        self.session["step"] = 2
+        with self.assertNumQueries(0):
+            self.session.save()
+        self.assertEqual(SessionStore(self.session.session_key)["step"], 2)
+        self.assertEqual(self.stored(), {"step": 1})
+
+        # Window elapsed: the next save writes the database copy
+        cache.delete(self.session.flushed_key)
+        self.session["step"] = 3
+        self.session.save()
+        self.assertEqual(self.stored(), {"step": 3})
+
+    def test_login_is_written_through(self):
+        self.session[SESSION_KEY] = "42"
+        self.session.save()
+        self.assertEqual(self.stored()[SESSION_KEY], "42")
+
+        # Other changes still wait for the window
+        self.session["step"] = 2
+        with self.assertNumQueries(0):
+            self.session.save()
+
+    @override_settings(STORAGES=TEST_STORAGES, SESSION_ENGINE="main.utils.sessions")
+    def test_login_through_the_site_survives_losing_the_cache(self):
+        user = User.objects.create_superuser(username="admin", password="pass")
+        self.client.post("/admin/login/", {"username": "admin", "password": "pass"})
+        key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.assertEqual(
+            Session.objects.get(pk=key).get_decoded()[SESSION_KEY], str(user.pk)
+        )
+
+        cache.clear()
+        self.assertEqual(self.client.get("/admin/").status_code, 200)
+
+    def test_cache_loss_falls_back_to_the_database_copy(self):
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(SessionStore(self.session.session_key)["step"], 1)
+
+    def test_delete_removes_both_copies(self):
+        key = self.session.session_key
+        self.session.delete()
+        self.assertFalse(Session.objects.filter(pk=key).exists())
+        self.assertFalse(SessionStore(key).exists(key))
+
+
+@mock.patch("main.utils.replicas.replica_configured", lambda: True)
+@mock.patch("main.middleware.replica_configured", lambda: True)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.reads = []
+
+    def view(self, write=False):
+        def view(request):
+            self.reads.append(self.router.db_for_read(Project))
+            if write:
+                self.router.db_for_write(Project)
+                self.reads.append(self.router.db_for_read(Project))
+            return HttpResponse()
+
+        return ReplicaRoutingMiddleware(view)
+
+    def test_outside_requests_everything_uses_the_primary(self):
+        self.assertEqual(self.router.db_for_read(Project), "default")
+        self.assertEqual(self.router.db_for_write(Project), "default")
+
+    def test_safe_requests_read_from_the_replica(self):
+        response = self.view()(RequestFactory().get("/items/"))
+        self.assertEqual(self.reads, ["replica"])
+        self.assertNotIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_writes_pin_the_user_to_the_primary(self):
+        response = self.view(write=True)(RequestFactory().post("/items/create/"))
+        self.assertEqual(self.reads, ["default", "default"])
+        cookie = response.cookies[settings.REPLICA_PIN_COOKIE]
+        self.assertEqual(cookie["max-age"], settings.REPLICA_PIN_SECONDS)
+
+        request = RequestFactory().get("/items/")
+        request.COOKIES[settings.REPLICA_PIN_COOKIE] = cookie.value
+        self.view()(request)
+        self.assertEqual(self.reads[-1], "default")
+
+    def test_reads_after_a_write_in_a_safe_request_use_the_primary(self):
+        response = self.view(write=True)(RequestFactory().get("/"))
+        self.assertEqual(self.reads, ["replica", "default"])
+        self.assertIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+
+
+@override_settings(
+    STORAGES=TEST_STORAGES,
+    THROTTLE_RATES={"about": "2/minute"},
+    THROTTLE_DEFAULT_RATE="1/minute",
+)
+class ThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        throttling.local_buckets.clear()
+        throttling._fallback_until = 0.0
+        # Five seconds into a period
+        self.now = 1_000_000 * 60 + 5
+        clock = SimpleNamespace(time=lambda: self.now, monotonic=lambda: self.now)
+        patcher = mock.patch.object(throttling, "time", clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_requests_over_the_rate_get_429_with_retry_after(self):
+        self.assertEqual(self.client.get("/about/").status_code, 200)
+        self.assertEqual(self.client.get("/about/").status_code, 200)
+
+        response = self.client.get("/about/")
+
+        self.assertEqual(response.status_code, 429)
+        # The rest of this period, then half the next for its 2 to decay to 1
+        self.assertEqual(response["Retry-After"], "85")
+        self.assertIn("throttle", response["Server-Timing"])
+        # Unlisted safe requests aren't throttled
+        self.assertEqual(self.client.get("/").status_code, 200)
+
+    def test_clients_honouring_retry_after_get_in(self):
+        self.client.get("/about/")
+        self.client.get("/about/")
+        wait = int(self.client.get("/about/")["Retry-After"])
+        # Refused requests don't take tokens
+        self.assertEqual(self.client.get("/about/").status_code, 429)
+
+        self.now += wait
+
+        self.assertEqual(self.client.get("/about/").status_code, 200)
+        self.assertEqual(self.client.get("/about/").status_code, 429)
+
+    def test_buckets_are_per_user_or_per_ip(self):
+        self.client.get("/about/")
+        self.client.get("/about/")
+        self.assertEqual(self.client.get("/about/").status_code, 429)
+
+        self.assertEqual(self.client.get("/about/", REMOTE_ADDR="10.0.0.2").status_code, 200)
+        self.client.force_login(User.objects.create_user(username="owner", password="pass"))
+        self.assertEqual(self.client.get("/about/").status_code, 200)
+
+    @override_settings(THROTTLE_PROXY_COUNT=1)
+    def test_client_ip_comes_from_the_trusted_proxy(self):
+        forwarded = {"HTTP_X_FORWARDED_FOR": "spoofed, 10.0.0.9"}
+        self.client.get("/about/", **forwarded)
+        self.client.get("/about/", **forwarded)
+        self.assertEqual(self.client.get("/about/", **forwarded).status_code, 429)
+
+        other = {"HTTP_X_FORWARDED_FOR": "spoofed, 10.0.0.10"}
+        self.assertEqual(self.client.get("/about/", **other).status_code, 200)
+
+    def test_default_rate_covers_unsafe_requests(self):
+        self.assertEqual(self.client.post("/").status_code, 200)
+        self.assertEqual(self.client.post("/").status_code, 429)
+
+    def test_falls_back_to_local_memory_when_the_cache_fails(self):
+        broken = mock.Mock()
+        broken.incr.side_effect = ConnectionError
+        with mock.patch.object(throttling, "caches", {"default": broken}):
+            with self.assertLogs("main.utils.throttling", "WARNING"):
+                response = self.client.get("/about/")
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("throttle_local", response["Server-Timing"])
+            self.assertEqual(self.client.get("/about/").status_code, 200)
+            self.assertEqual(self.client.get("/about/").status_code, 429)
+        # Not retried until the fallback period is over
+        self.assertEqual(broken.incr.call_count, 1)
+
+    async def test_async_requests_are_throttled(self):
+        await self.async_client.get("/about/")
+        await self.async_client.get("/about/")
+        response = await self.async_client.get("/about/")
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(THROTTLE_ENABLED=False)
+    def test_disabled_throttling_lets_everything_through(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get("/about/").status_code, 200)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_per_process_caches_are_reported(self):
+        ids = [warning.id for warning in check_shared_caches(None)]
+        self.assertEqual(ids, ["main.W001", "main.W002"])
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://cache:6379/0",
+            }
+        }
+    )
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_caches(None), [])
+
+
+class ThrottleRateTests(SimpleTestCase):
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("30/minute"), Rate(30, 60))
+        self.assertEqual(parse_rate("5/s"), Rate(5, 1))
+        for invalid in ("0/minute", "ten/minute", "5/fortnight", "5"):
+            with self.assertRaises(ValueError):
+                parse_rate(invalid)
+
+    def test_retry_after_waits_for_the_previous_period_to_decay(self):
+        # 10/minute, 6 taken last period, 8 this one, 30s in: 3 + 8 = 11 in use
+        rate = Rate(10, 60)
+        wait = retry_after(rate, previous=6, count=8, elapsed=30)
+        # At 40s: 6 * (1 - 40/60) + 8 + 1 = 11 -> at 50s exactly 10 fit
+        self.assertEqual(wait, 20)
+
+    def test_retry_after_spills_into_the_next_period(self):
+        # This period is full: next period its 10 decay until 9 + 1 fit
+        self.assertEqual(retry_after(Rate(10, 60), previous=0, count=10, elapsed=54), 12)
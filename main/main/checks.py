@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Backends whose entries live in one process: every pod would see its own
+PER_PROCESS_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def per_process(alias):
+    return settings.CACHES[alias]["BACKEND"] in PER_PROCESS_BACKENDS
+
+
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Throttling buckets and permission-matrix versions only hold if every
+    process reads the same cache; say so rather than quietly going per-pod.
+    """
+    errors = []
+    if settings.THROTTLE_ENABLED and per_process(settings.THROTTLE_CACHE):
+        errors.append(
+            Warning(
+                f"THROTTLE_CACHE ({settings.THROTTLE_CACHE!r}) is a per-process cache.",
+                hint=(
+                    "Each process keeps its own buckets, so the effective limit is "
+                    "the rate times the number of processes. Set CACHE_URL."
+                ),
+                id="main.W001",
+            )
+        )
+    if per_process("default"):
+        errors.append(
+            Warning(
+                "The default cache is a per-process cache.",
+                hint=(
+                    "Permission changes made on one process don't reach the cached "
+                    "permissions of the others. Set CACHE_URL."
+                ),
+                id="main.W002",
+            )
+        )
+    return errors
@@ -1,9 +1,11 @@
 from django.core.cache import cache
 from django.urls import reverse
+from main.utils.metrics import timed
 
 
+@timed("ctx")
 def site_urls(request):
-    project_create_url = reverse("projects:create")
+    project_create_url = reverse("projects:project_create")
     return {
         "home_url": reverse("home"),
         "aobut_url": reverse("about"),
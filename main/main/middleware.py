@@ -0,0 +1,156 @@
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from main.utils.metrics import collect, registry, server_timing, span
+from main.utils.replicas import replica_configured, routing
+from main.utils.throttling import athrottle, throttle
+
+
+class MetricsMiddleware:
+    """
+    Time every request and report it in a `Server-Timing` header and in the
+    per-view histograms served at /metrics.
+
+    Put it first so the total covers the rest of the middleware stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with collect() as metrics:
+            response = self.get_response(request)
+        return self.finish(request, response, time.perf_counter() - start, metrics)
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        start = time.perf_counter()
+        with collect() as metrics:
+            response = await self.get_response(request)
+        return self.finish(request, response, time.perf_counter() - start, metrics)
+
+    def finish(self, request, response, duration, metrics):
+        match = request.resolver_match
+        # Unmatched paths share one label so scanners can't blow up cardinality
+        view = match.view_name if match else "<unmatched>"
+        if view != "metrics":
+            registry.observe(view, duration, metrics, response.status_code)
+        response["Server-Timing"] = server_timing(duration, metrics)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let safe requests read from the database replica, with read-your-writes.
+
+    A request that writes sets a short-lived cookie; until it expires the
+    user's requests read from the primary, so they see their own changes
+    even while the replica lags behind.
+
+    Put it before anything that reads the database (sessions, auth).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with routing(self.reads_from_replica(request)) as state:
+            response = self.get_response(request)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        with routing(self.reads_from_replica(request)) as state:
+            response = await self.get_response(request)
+        return self.finish(response, state)
+
+    def reads_from_replica(self, request):
+        return (
+            request.method in ("GET", "HEAD")
+            and settings.REPLICA_PIN_COOKIE not in request.COOKIES
+        )
+
+    def finish(self, response, state):
+        if state.wrote and replica_configured():
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+def too_many_requests(wait):
+    response = HttpResponse(
+        f"Too many requests, try again in {wait} seconds.\n",
+        status=429,
+        content_type="text/plain",
+    )
+    response["Retry-After"] = str(wait)
+    return response
+
+
+class ThrottleMiddleware:
+    """
+    Answer requests beyond their view's rate with 429 Too Many Requests and a
+    `Retry-After` header, before the view runs.
+
+    Rates are set per URL name in THROTTLE_RATES, and THROTTLE_DEFAULT_RATE
+    covers every other unsafe request (see main.utils.throttling). Signed-in
+    users are limited per user, everyone else per IP. Put it after
+    SessionMiddleware and before CsrfViewMiddleware, so scripts failing the
+    CSRF check are throttled too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+            # The handler runs process_view in its own mode; an async one
+            # avoids a thread hop per request
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not settings.THROTTLE_ENABLED:
+            return None
+        with span("throttle"):
+            wait = throttle(request)
+        return too_many_requests(wait) if wait is not None else None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if not settings.THROTTLE_ENABLED:
+            return None
+        with span("throttle"):
+            wait = await athrottle(request)
+        return too_many_requests(wait) if wait is not None else None
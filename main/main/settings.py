@@ -44,25 +44,33 @@ INSTALLED_APPS = [
     "landing",
     "projects",
     "items",
+    "assets",
+    "jobs",
+    "activity",
+    "benchmarks",
 ]
 
 MIDDLEWARE = [
+    "main.middleware.MetricsMiddleware",
+    "main.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "main.middleware.ThrottleMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "activity.middleware.ActivityMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "proejcts.middleware.ProjectMiddleware",
+    "projects.middleware.ProjectMiddleware",
 ]
 
 ROOT_URLCONF = "main.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "main.utils.metrics.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -92,6 +100,47 @@ if DATABASE_URL is not None:
         default=DATABASE_URL, conn_max_age=60, conn_health_checks=True
     )
     DATABASES = {"default": dj_database_url_config}
+    if dj_database_url_config["ENGINE"] == "django.db.backends.sqlite3":
+        # A file rather than SQLite's in-memory test database, so the job
+        # worker's spawned processes can open it in tests too
+        dj_database_url_config["TEST"] = {"NAME": str(BASE_DIR / "test_db.sqlite3")}
+
+# Optional read replica: safe requests read from it, writes go to the primary
+DATABASE_REPLICA_URL: Any = config("DATABASE_REPLICA_URL", default=None)
+if DATABASE_REPLICA_URL:
+    import dj_database_url
+
+    # parse(), not config(): config() would prefer DATABASE_URL over the default
+    DATABASES["replica"] = dj_database_url.parse(
+        DATABASE_REPLICA_URL, conn_max_age=60, conn_health_checks=True
+    )
+    # Tests run against the primary's test database through the replica alias
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["main.utils.replicas.ReplicaRouter"]
+# After writing, a user reads from the primary for this long, so they see
+# their own changes however far the replica lags
+REPLICA_PIN_SECONDS = 5
+REPLICA_PIN_COOKIE = "pin_primary"
+
+# Cache shared by every pod: sessions, permission matrices and throttling
+# buckets must be the same everywhere. E.g. redis://cache:6379/0 or
+# memcached://cache:11211. Unset, each process gets its own in-memory cache,
+# which is only right for a single process (development, tests).
+CACHE_URL: Any = config("CACHE_URL", default="")
+CACHE_BACKENDS = {
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "rediss": "django.core.cache.backends.redis.RedisCache",
+    "memcached": "django.core.cache.backends.memcached.PyMemcacheCache",
+}
+if CACHE_URL:
+    scheme, _, address = CACHE_URL.partition("://")
+    CACHES = {
+        "default": {
+            "BACKEND": CACHE_BACKENDS[scheme],
+            # Redis takes the whole URL; memcached just host:port
+            "LOCATION": CACHE_URL if scheme.startswith("redis") else address,
+        }
+    }
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -130,10 +179,13 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 STATIC_ROOT = BASE_DIR / "static-root"
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+MEDIA_URL = "media/"
+MEDIA_ROOT = BASE_DIR / "media"
 STORAGES = {
     "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
-    "staticfiles": {"BACKEND": STATICFILES_STORAGE},
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"
+    },
 }
 
 
@@ -147,3 +199,62 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 SESSION_COOKIE_AGE = 1209600
 SESSION_SAVE_EVERY_REQUEST = False
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
+# "cache": cache-first with a write-behind database copy (main.utils.sessions);
+# "cookie": signed cookies, no server-side storage; "db": Django's default
+SESSION_ENGINES = {
+    "cache": "main.utils.sessions",
+    "cookie": "django.contrib.sessions.backends.signed_cookies",
+    "db": "django.contrib.sessions.backends.db",
+}
+# Cache-first sessions need a cache every pod shares
+SESSION_ENGINE = SESSION_ENGINES[
+    config("SESSION_BACKEND", default="cache" if CACHE_URL else "db")
+]
+# Longest a cache-first session's changes may go unsaved in the database
+SESSION_WRITE_BEHIND_SECONDS = 5 * 60
+
+# Keyset pagination for item and project lists
+LIST_PAGE_SIZE = 24
+LIST_MAX_PAGE_SIZE = 100
+
+# Chunked asset uploads: each chunk is streamed straight to STORAGES["default"]
+ASSET_CHUNK_SIZE = 8 * 1024 * 1024
+ASSET_MAX_SIZE = 50 * 1024 * 1024 * 1024
+# Thumbnail/preview processes; None means one per CPU core (never more)
+ASSET_DERIVATIVE_WORKERS = config("ASSET_DERIVATIVE_WORKERS", default=0, cast=int) or None
+
+# Database-backed job queue (manage.py run_jobs): queue -> concurrent jobs per worker
+JOBS_QUEUES = {"default": 4}
+# A running job is handed to another worker if its lease isn't released in time
+JOBS_LEASE_SECONDS = 15 * 60
+JOBS_RETRY_BASE_SECONDS = 10
+# Items removed per DELETE statement when purging a deleted project
+PROJECT_DELETE_BATCH_SIZE = 1000
+
+# Server-Timing header and per-pod Prometheus metrics at /metrics
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+# When set, /metrics requires "Authorization: Bearer <token>"; unset, staff only
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# Request throttling (main.middleware.ThrottleMiddleware). Buckets live in this
+# cache so limits hold across pods: it must be shared (CACHE_URL), which the
+# main.W001 system check enforces.
+THROTTLE_ENABLED = config("THROTTLE_ENABLED", default=True, cast=bool)
+THROTTLE_CACHE = "default"
+# "<requests>/<second|minute|hour|day>" for unsafe requests to views not listed below
+THROTTLE_DEFAULT_RATE = "120/minute"
+# By URL name, for every method; None leaves the view unthrottled
+THROTTLE_RATES = {
+    "item_create": "30/minute",
+    "item_import": "10/minute",
+    "item_bulk": "30/minute",
+    "projects:project_create": "10/minute",
+    "projects:project_activate": "30/minute",
+    "projects:project_deactivate": "30/minute",
+    "project_activate": "30/minute",
+    "project_deactivate": "30/minute",
+    # A large upload sends thousands of chunks
+    "assets:upload_chunk": "600/minute",
+}
+# Proxies in front of the app that append to X-Forwarded-For (0: use REMOTE_ADDR)
+THROTTLE_PROXY_COUNT = config("THROTTLE_PROXY_COUNT", default=0, cast=int)
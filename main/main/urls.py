@@ -20,13 +20,24 @@ from django.urls import path, include
 from landing import views as landing_views
 from projects import views as projects_views
 from items import views as items_views
+from main import views as main_views
 
 urlpatterns = [
     path("", landing_views.home_page_view, name="home"),
     path("about/", landing_views.about_page_view, name="about"),
-    path("activate/project/<slug:handle>/", projects_views.activate_prject_views),
-    path("deactivate/project/<slug:handle>/", projects_views.deactivate_prject_views),
+    path(
+        "activate/project/<slug:handle>/",
+        projects_views.activate_prject_views,
+        name="project_activate",
+    ),
+    path(
+        "deactivate/project/<slug:handle>/",
+        projects_views.deactivate_prject_views,
+        name="project_deactivate",
+    ),
     path("projects/", include("projects.urls"), name="projects"),
     path("items/", include("items.urls")),
+    path("assets/", include("assets.urls")),
     path("admin/", admin.site.urls),
+    path("metrics", main_views.metrics_view, name="metrics"),
 ]
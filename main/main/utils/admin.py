@@ -0,0 +1,166 @@
+import json
+from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from .pagination import build_page, decode_cursor, keyset_query
+
+CURSOR_VAR = "cursor"
+# Below this many rows an exact COUNT(*) is cheap enough to be worth it
+EXACT_COUNT_THRESHOLD = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A paginator whose `count` never scans a large table.
+
+    On PostgreSQL the planner's row estimate is used (pg_class statistics for
+    the whole table, EXPLAIN for a filtered changelist) and only small results
+    are counted exactly. Elsewhere the count stops at EXACT_COUNT_THRESHOLD;
+    `is_estimate` says whether the number shown is approximate.
+    """
+
+    is_estimate = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            estimate = self.planner_estimate(queryset, connection)
+            if estimate >= EXACT_COUNT_THRESHOLD:
+                self.is_estimate = True
+                return estimate
+            return queryset.count()
+        # SELECT COUNT(*) FROM (... LIMIT n): bounded however big the table is
+        count = queryset[: EXACT_COUNT_THRESHOLD + 1].count()
+        if count > EXACT_COUNT_THRESHOLD:
+            self.is_estimate = True
+            return EXACT_COUNT_THRESHOLD
+        return count
+
+    def planner_estimate(self, queryset, connection):
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+                # -1 until the table's first VACUUM/ANALYZE
+                if row and row[0] >= 0:
+                    return row[0]
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetChangeList(ChangeList):
+    """
+    A changelist paged by (-timestamp, id) cursor instead of OFFSET, so the
+    millionth row is as cheap to reach as the first.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR)
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Filter, search and page links always start again from the first page
+        new_params = {CURSOR_VAR: None, **(new_params or {})}
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        position = decode_cursor(self.cursor)
+        rows = list(keyset_query(self.queryset, position, self.list_per_page))
+        self.page = build_page(rows, position, self.list_per_page)
+
+        self.result_count = paginator.count
+        self.result_count_is_estimate = paginator.is_estimate
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.result_list = self.page.object_list
+        self.can_show_all = False
+        self.multi_page = self.page.has_next or self.page.has_previous
+        self.paginator = paginator
+
+    def page_url(self, cursor):
+        return self.get_query_string({CURSOR_VAR: cursor})
+
+    @property
+    def next_url(self):
+        return self.page_url(self.page.next_cursor) if self.page.has_next else None
+
+    @property
+    def previous_url(self):
+        return self.page_url(self.page.prev_cursor) if self.page.has_previous else None
+
+
+class InputFilter(admin.SimpleListFilter):
+    """
+    A sidebar filter with a text box instead of a list of every choice.
+
+    Subclasses set `title`, `parameter_name` and the `lookup` to filter on,
+    e.g. "project__handle".
+    """
+
+    template = "admin/input_filter.html"
+    lookup = None
+
+    def lookups(self, request, model_admin):
+        # Never rendered; SimpleListFilter insists on having choices
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.lookup: self.value().strip()})
+        return queryset
+
+    def choices(self, changelist):
+        # The template needs the current value and the other active parameters
+        # (search, other filters) so submitting the box keeps them
+        yield {
+            "value": self.value() or "",
+            "parameter_name": self.parameter_name,
+            "clear_query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "hidden_params": [
+                (key, value)
+                for key, value in changelist.params.items()
+                if key not in (self.parameter_name, CURSOR_VAR)
+            ],
+        }
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist settings for tables with millions of rows: estimated counts,
+    keyset paging, no per-column sorting (only the indexed order pages well)
+    and no second COUNT(*) for the unfiltered total.
+
+    The model needs `timestamp` and an index on (-timestamp, id).
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    sortable_by = ()
+    list_per_page = 50
+    change_list_template = "admin/large_table_change_list.html"
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
@@ -0,0 +1,81 @@
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth import REDIRECT_FIELD_NAME
+from django.contrib.auth.decorators import login_required as sync_login_required
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.shortcuts import render
+from django.utils.functional import empty
+
+
+def _load_request_state(request):
+    # Evaluate the lazy user and load the session while we're allowed to block
+    request.user.is_authenticated
+    request.session.get("project_handle")
+
+
+async def aload_request(request):
+    """
+    Resolve `request.user` and `request.session` without blocking the event loop.
+
+    Both are lazy and hit the database on first access, which is forbidden in
+    async code; this does it in one thread hop, and only when still needed.
+    """
+    user_pending = getattr(request.user, "_wrapped", None) is empty
+    session_pending = hasattr(request, "session") and not hasattr(
+        request.session, "_session_cache"
+    )
+    if user_pending or session_pending:
+        await sync_to_async(_load_request_state)(request)
+    return request.user
+
+
+async def aload_session(request):
+    """Load `request.session` off the event loop, leaving the user lazy."""
+    session = getattr(request, "session", None)
+    if session is not None and not hasattr(session, "_session_cache"):
+        await sync_to_async(session._get_session)()
+    return session
+
+
+def login_required(view_func):
+    """`django.contrib.auth`'s login_required, also accepting async views."""
+    if not iscoroutinefunction(view_func):
+        return sync_login_required(view_func)
+
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        user = await aload_request(request)
+        if user.is_authenticated:
+            return await view_func(request, *args, **kwargs)
+        return redirect_to_login(
+            request.get_full_path(), redirect_field_name=REDIRECT_FIELD_NAME
+        )
+
+    return _wrapped_view
+
+
+async def aget_object_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+
+
+async def arender(request, template_name, context=None):
+    """
+    Render a page from an async view.
+
+    The navbar's project switcher is fetched here with the async ORM, so the
+    template itself never needs the database and can render on the event loop.
+    """
+    from projects.cache import aget_user_project_summaries
+
+    context = dict(context or {})
+    user = await aload_request(request)
+    if user.is_authenticated and "projects_list" not in context:
+        # Takes precedence over the lazy value from the context processor
+        context["projects_list"] = await aget_user_project_summaries(
+            user.pk, getattr(request, "project_roles", None)
+        )
+    return render(request, template_name, context)
@@ -0,0 +1,122 @@
+import hashlib
+import time
+from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+# Bump when page templates change so browsers don't keep revalidating old markup
+CONDITIONAL_VERSION = 3
+# Pages show relative times (|timesince); let those drift by at most this much
+ETAG_TIME_BUCKET = 60
+
+
+def etag_for(request, parts, summaries):
+    active_project = getattr(request, "active_project", None)
+    active_stamp = (
+        (active_project.pk, active_project.updated.isoformat()) if active_project else None
+    )
+    raw = repr(
+        (
+            CONDITIONAL_VERSION,
+            int(time.time() // ETAG_TIME_BUCKET),
+            request.user.pk,
+            active_stamp,
+            summaries,
+            parts,
+        )
+    )
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def user_etag(request, *parts):
+    """
+    Build an ETag from `parts` plus everything per-user that the page shows.
+
+    Returns None when the response must be rendered anyway (pending flash
+    messages are consumed by rendering, so a 304 would swallow them).
+    """
+    if len(get_messages(request)):
+        return None
+
+    from projects.cache import get_user_project_summaries
+
+    # Served from cache, and the navbar needs it anyway
+    summaries = get_user_project_summaries(
+        request.user.pk, getattr(request, "project_roles", None)
+    )
+    return etag_for(request, parts, summaries)
+
+
+async def auser_etag(request, *parts):
+    if len(get_messages(request)):
+        return None
+
+    from projects.cache import aget_user_project_summaries
+
+    summaries = await aget_user_project_summaries(
+        request.user.pk, getattr(request, "project_roles", None)
+    )
+    return etag_for(request, parts, summaries)
+
+
+def finish_response(request, response, etag, last_modified):
+    if response.status_code in (200, 304):
+        response.headers.setdefault("ETag", etag)
+        if last_modified is not None:
+            response.headers.setdefault("Last-Modified", http_date(last_modified.timestamp()))
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_page(stamp_func):
+    """
+    Answer GET/HEAD with 304 Not Modified when the page would be unchanged.
+
+    `stamp_func(request, *args, **kwargs)` returns `(parts, last_modified)` from
+    one cheap query, or None to skip. Only the ETag is used for validation:
+    Last-Modified can't see per-user changes, so it is sent for information only.
+    Async views take an async `stamp_func`.
+    """
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def _async_view(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view_func(request, *args, **kwargs)
+
+                stamp = await stamp_func(request, *args, **kwargs)
+                etag = await auser_etag(request, *stamp[0]) if stamp is not None else None
+                if etag is None:
+                    return await view_func(request, *args, **kwargs)
+
+                etag = quote_etag(etag)
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return finish_response(request, response, etag, stamp[1])
+
+            return _async_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view_func(request, *args, **kwargs)
+
+            stamp = stamp_func(request, *args, **kwargs)
+            etag = user_etag(request, *stamp[0]) if stamp is not None else None
+            if etag is None:
+                return view_func(request, *args, **kwargs)
+
+            etag = quote_etag(etag)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return finish_response(request, response, etag, stamp[1])
+
+        return _wrapped_view
+
+    return decorator
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from main.utils.metrics import record_cache
+
+# Bump when a cached fragment template changes so old markup isn't served
+FRAGMENT_VERSION = 4
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def fragment_cache_key(template_name, obj, version_field):
+    stamp = getattr(obj, version_field)
+    return make_template_fragment_key(
+        template_name, [FRAGMENT_VERSION, obj.pk, stamp.isoformat() if stamp else ""]
+    )
+
+
+def render_missing(objects, keys, cached, template_name, context_name, attr):
+    missing = {}
+    for obj, key in zip(objects, keys):
+        html = cached.get(key)
+        if html is None:
+            html = render_to_string(template_name, {context_name: obj})
+            missing[key] = html
+        setattr(obj, attr, mark_safe(html))
+    record_cache(len(objects) - len(missing), len(missing))
+    return missing
+
+
+def attach_cached_fragments(
+    objects, template_name, version_field, context_name, attr="card_html"
+):
+    """
+    Render `template_name` once per object and set it as `obj.<attr>`.
+
+    Keys include the object's pk and its `version_field` timestamp, so a changed
+    row simply stops matching its old entry. The whole page is fetched with one
+    `get_many` and the misses are stored with one `set_many`.
+    """
+    objects = list(objects)
+    keys = [fragment_cache_key(template_name, obj, version_field) for obj in objects]
+    cached = cache.get_many(keys)
+    missing = render_missing(objects, keys, cached, template_name, context_name, attr)
+    if missing:
+        cache.set_many(missing, timeout=FRAGMENT_CACHE_TIMEOUT)
+    return objects
+
+
+async def aattach_cached_fragments(
+    objects, template_name, version_field, context_name, attr="card_html"
+):
+    objects = list(objects)
+    keys = [fragment_cache_key(template_name, obj, version_field) for obj in objects]
+    cached = await cache.aget_many(keys)
+    missing = render_missing(objects, keys, cached, template_name, context_name, attr)
+    if missing:
+        await cache.aset_many(missing, timeout=FRAGMENT_CACHE_TIMEOUT)
+    return objects
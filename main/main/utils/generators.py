@@ -9,55 +9,137 @@ def generate_random_string(size=10):
     return "".join(random_chars)
 
 
-def unique_slug_generator(
-    instance, new_slug=None, size=5, slug_field="slug", title_field="titile"
+def slug_candidates(slug, size=5, batch_size=10, max_length=50):
+    """
+    Return the preferred slug followed by `batch_size` random-suffixed variants.
+    """
+    prefix = slug[: max_length - size - 1].rstrip("-")
+    candidates = [slug[:max_length]] if slug else []
+    for _ in range(batch_size):
+        random_str = generate_random_string(size=size)
+        candidates.append(f"{prefix}-{random_str}" if prefix else random_str)
+    return candidates
+
+
+def allocate_unique_slugs(
+    ModelClass, requests, size=5, slug_field="slug", batch_size=10, reserved=()
 ):
     """
-    Made it a celery task
+    Pick a free slug for each (pk, preferred_slug) pair in `requests`.
+
+    Slugs in `reserved` (e.g. literal URL segments the slug would be shadowed
+    by) are never picked; a title that slugifies to one gets a suffix.
+
+    Every candidate for every request is checked with a single exact-match
+    `IN` query, which the unique index on `slug_field` answers directly. Another
+    process can still take a slug between this check and the insert, so callers
+    should retry on IntegrityError (see `Project.save`).
     """
+    max_length = ModelClass._meta.get_field(slug_field).max_length or 50
+    candidate_lists = [
+        slug_candidates(slug, size=size, batch_size=batch_size, max_length=max_length)
+        for _, slug in requests
+    ]
+    lookup = {f"{slug_field}__in": {c for cl in candidate_lists for c in cl}}
+    # The base manager sees every row, including ones a default manager hides
+    taken = dict(
+        ModelClass._base_manager.filter(**lookup).values_list(slug_field, "pk")
+    )
+
+    slugs = []
+    for (pk, slug), candidates in zip(requests, candidate_lists):
+        free = [
+            c
+            for c in candidates
+            if c not in reserved and (c not in taken or (pk and taken[c] == pk))
+        ]
+        if free:
+            slug = free[0]
+        else:
+            # Every candidate collided; extremely unlikely, try a longer suffix
+            slug = allocate_unique_slugs(
+                ModelClass,
+                [(pk, slug)],
+                size=size + 1,
+                slug_field=slug_field,
+                reserved=reserved,
+            )[0]
+        taken[slug] = pk
+        slugs.append(slug)
+    return slugs
+
+
+def bulk_unique_slug_generator(
+    instances, size=5, slug_field="slug", title_field="title", batch_size=10, reserved=()
+):
     """
-    Generate a unique slug for the given instance.
+    Generate unique slugs for several instances of the same model in one query.
 
     Args:
-        instance: Model instance
-        new_slug: Pre-computed slug (optional)
+        instances: Model instances (may be unsaved)
         size: Length of random string to append if needed
         slug_field: Field name that stores the slug
         title_field: Field name that contains the title to slugify
+        batch_size: Random candidates generated per instance
+        reserved: Slugs that must never be used
 
     Returns:
-        str: Unique slug
+        list[str]: One slug per instance, in order
     """
-    # Get the title value from the instance
-    title_value = getattr(instance, title_field, None)
+    if not instances:
+        return []
+    requests = []
+    for instance in instances:
+        title_value = getattr(instance, title_field, None)
+        requests.append((instance.pk, slugify(title_value) if title_value else ""))
+    return allocate_unique_slugs(
+        instances[0].__class__,
+        requests,
+        size=size,
+        slug_field=slug_field,
+        batch_size=batch_size,
+        reserved=reserved,
+    )
 
-    if new_slug is not None:
-        slug = new_slug
-    elif title_value:
-        slug = slugify(title_value)
-    else:
-        # Fallback if no title is available
-        slug = generate_random_string(size=size)
 
-    # Build lookup dictionary for checking uniqueness
-    lookup = {f"{slug_field}__iexact": slug}
-    ModelClass = instance.__class__
+def unique_slug_generator(
+    instance,
+    new_slug=None,
+    size=5,
+    slug_field="slug",
+    title_field="title",
+    batch_size=10,
+    reserved=(),
+):
+    """
+    Generate a unique slug for the given instance.
 
-    # Check if slug already exists (exclude current instance if updating)
-    queryset = ModelClass.objects.filter(**lookup)
-    if instance.pk:
-        queryset = queryset.exclude(pk=instance.pk)
+    Args:
+        instance: Model instance
+        new_slug: Pre-computed slug (optional)
+        size: Length of random string to append if needed
+        slug_field: Field name that stores the slug
+        title_field: Field name that contains the title to slugify
+        batch_size: Random candidates checked alongside the preferred slug
+        reserved: Slugs that must never be used
 
-    if queryset.exists():
-        # Generate new slug with random suffix
-        random_str = generate_random_string(size=size)
-        new_slug = f"{slug}-{random_str}"
-        return unique_slug_generator(
-            instance,
-            new_slug=new_slug,
+    Returns:
+        str: Unique slug
+    """
+    if new_slug is None:
+        return bulk_unique_slug_generator(
+            [instance],
             size=size,
             slug_field=slug_field,
             title_field=title_field,
-        )
-
-    return slug
+            batch_size=batch_size,
+            reserved=reserved,
+        )[0]
+    return allocate_unique_slugs(
+        instance.__class__,
+        [(instance.pk, new_slug)],
+        size=size,
+        slug_field=slug_field,
+        batch_size=batch_size,
+        reserved=reserved,
+    )[0]
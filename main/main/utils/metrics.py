@@ -0,0 +1,237 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates
+
+# Upper bounds (seconds) shared by the timing histograms
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+@dataclass
+class RequestMetrics:
+    db_queries: int = 0
+    db_time: float = 0.0
+    template_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    spans: dict = field(default_factory=dict)
+
+
+# Set by MetricsMiddleware for the duration of a request; None otherwise
+_current: ContextVar = ContextVar("request_metrics", default=None)
+
+
+def current():
+    return _current.get()
+
+
+def record_cache(hits, misses):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+@contextmanager
+def span(name):
+    """Time a block into the current request's `name` span (no-op outside requests)."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.spans[name] = metrics.spans.get(name, 0.0) + time.perf_counter() - start
+
+
+def timed(name):
+    """Decorator form of `span`, e.g. for context processors."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if metrics is not None:
+            metrics.db_queries += 1
+            metrics.db_time += time.perf_counter() - start
+
+
+def install_db_wrapper(connection, **kwargs):
+    """
+    Attach the query timer to a connection for good.
+
+    Installed per connection rather than per request because the async ORM
+    runs queries on other threads, which have their own connections; the
+    context variable still routes each query to the right request.
+    """
+    if _db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_db_wrapper)
+
+
+connection_created.connect(install_db_wrapper)
+
+
+@contextmanager
+def collect():
+    """Collect metrics for everything run inside the block; yields the collector."""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    # Connections opened before this module was imported missed the signal
+    for connection in connections.all(initialized_only=True):
+        install_db_wrapper(connection)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+class Template:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            # Includes context processors, which run while binding the context
+            return self.template.render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The standard Django template backend, timing each top-level render."""
+
+    def from_string(self, template_code):
+        return Template(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return Template(super().get_template(template_name))
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+
+class Registry:
+    """
+    Per-process histograms and counters keyed by URL name.
+
+    Every web process keeps its own numbers; Prometheus adds them up across
+    the pods it scrapes.
+    """
+
+    HISTOGRAMS = {
+        "request_duration_seconds": TIME_BUCKETS,
+        "db_duration_seconds": TIME_BUCKETS,
+        "template_duration_seconds": TIME_BUCKETS,
+        "db_queries": QUERY_BUCKETS,
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, view, duration, metrics, status):
+        values = {
+            "request_duration_seconds": duration,
+            "db_duration_seconds": metrics.db_time,
+            "template_duration_seconds": metrics.template_time,
+            "db_queries": metrics.db_queries,
+        }
+        with self.lock:
+            for name, value in values.items():
+                key = (name, view)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(self.HISTOGRAMS[name])
+                self.histograms[key].observe(value)
+            for name, labels, value in (
+                ("requests_total", (view, status // 100), 1),
+                ("cache_hits_total", (view,), metrics.cache_hits),
+                ("cache_misses_total", (view,), metrics.cache_misses),
+            ):
+                key = (name, labels)
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def render(self, prefix="contentengine"):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self.lock:
+            for name in self.HISTOGRAMS:
+                lines.append(f"# TYPE {prefix}_{name} histogram")
+                for (metric, view), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(
+                        (*histogram.buckets, "+Inf"), histogram.counts
+                    ):
+                        cumulative += count
+                        lines.append(
+                            f'{prefix}_{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}'
+                        )
+                    lines.append(f'{prefix}_{name}_sum{{view="{view}"}} {histogram.total}')
+                    lines.append(f'{prefix}_{name}_count{{view="{view}"}} {cumulative}')
+            for name in ("requests_total", "cache_hits_total", "cache_misses_total"):
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for (metric, labels), value in sorted(self.counters.items()):
+                    if metric != name:
+                        continue
+                    label_text = f'view="{labels[0]}"'
+                    if name == "requests_total":
+                        label_text += f',status="{labels[1]}xx"'
+                    lines.append(f"{prefix}_{name}{{{label_text}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def server_timing(duration, metrics):
+    """Format a Server-Timing header value (durations in milliseconds)."""
+    entries = [
+        f"db;desc=\"{metrics.db_queries} queries\";dur={metrics.db_time * 1000:.1f}",
+        f"tpl;dur={metrics.template_time * 1000:.1f}",
+        f"cache;desc=\"{metrics.cache_hits} hit {metrics.cache_misses} miss\"",
+    ]
+    entries += [f"{name};dur={value * 1000:.1f}" for name, value in metrics.spans.items()]
+    entries.append(f"total;dur={duration * 1000:.1f}")
+    return ", ".join(entries)
@@ -0,0 +1,138 @@
+from datetime import datetime
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.http import QueryDict
+
+CURSOR_SALT = "main.utils.pagination"
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, prev_cursor=None, page_size=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.page_size = page_size
+        # The request's query string, so page links keep its search and filters
+        self.query = QueryDict()
+
+    def query_for(self, cursor):
+        query = self.query.copy()
+        query["cursor"] = cursor
+        query["page_size"] = self.page_size
+        return query.urlencode()
+
+    @property
+    def next_query(self):
+        return self.query_for(self.next_cursor)
+
+    @property
+    def prev_query(self):
+        return self.query_for(self.prev_cursor)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+def encode_cursor(direction, obj):
+    return signing.dumps(
+        [direction, obj.timestamp.isoformat(), obj.pk], salt=CURSOR_SALT
+    )
+
+
+def decode_cursor(token):
+    """Return (direction, timestamp, pk), or None for a missing or tampered token."""
+    if not token:
+        return None
+    try:
+        direction, timestamp, pk = signing.loads(token, salt=CURSOR_SALT)
+        return direction, datetime.fromisoformat(timestamp), int(pk)
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+
+
+def get_page_size(request):
+    default_size = getattr(settings, "LIST_PAGE_SIZE", 24)
+    max_size = getattr(settings, "LIST_MAX_PAGE_SIZE", 100)
+    try:
+        page_size = int(request.GET.get("page_size", default_size))
+    except ValueError:
+        page_size = default_size
+    return max(1, min(page_size, max_size))
+
+
+def keyset_query(queryset, position, page_size):
+    """The one `LIMIT page_size + 1` query that fetches a page (see `keyset_paginate`)."""
+    if position is None:
+        return queryset.order_by("-timestamp", "id")[: page_size + 1]
+    direction, timestamp, pk = position
+    if direction == "prev":
+        before = Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__lt=pk)
+        return queryset.filter(before).order_by("timestamp", "-id")[: page_size + 1]
+    after = Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__gt=pk)
+    return queryset.filter(after).order_by("-timestamp", "id")[: page_size + 1]
+
+
+def build_page(rows, position, page_size):
+    has_more = len(rows) > page_size
+    if position is None:
+        rows = rows[:page_size]
+        has_next, has_previous = has_more, False
+    elif position[0] == "prev":
+        rows = rows[:page_size][::-1]
+        has_next, has_previous = True, has_more
+    else:
+        rows = rows[:page_size]
+        has_next, has_previous = has_more, True
+
+    next_cursor = encode_cursor("next", rows[-1]) if rows and has_next else None
+    prev_cursor = encode_cursor("prev", rows[0]) if rows and has_previous else None
+    return KeysetPage(rows, next_cursor, prev_cursor, page_size)
+
+
+def keyset_paginate(queryset, cursor=None, page_size=24):
+    """
+    Paginate `queryset` ordered by (-timestamp, id) using an opaque cursor.
+
+    Each page is a single `LIMIT page_size + 1` query that seeks past the cursor
+    row, so page 1000 costs the same as page 1 (unlike OFFSET).
+    """
+    position = decode_cursor(cursor)
+    rows = list(keyset_query(queryset, position, page_size))
+    return build_page(rows, position, page_size)
+
+
+async def akeyset_paginate(queryset, cursor=None, page_size=24):
+    position = decode_cursor(cursor)
+    rows = [row async for row in keyset_query(queryset, position, page_size)]
+    return build_page(rows, position, page_size)
+
+
+def paginate_request(request, queryset):
+    page = keyset_paginate(
+        queryset, cursor=request.GET.get("cursor"), page_size=get_page_size(request)
+    )
+    page.query = request.GET
+    return page
+
+
+async def apaginate_request(request, queryset):
+    page = await akeyset_paginate(
+        queryset, cursor=request.GET.get("cursor"), page_size=get_page_size(request)
+    )
+    page.query = request.GET
+    return page
@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from django.conf import settings
+
+REPLICA_ALIAS = "replica"
+PRIMARY_ALIAS = "default"
+
+
+@dataclass
+class RoutingState:
+    # Reads may go to the replica (safe request, not pinned by a recent write)
+    use_replica: bool = False
+    # Something was written during this request
+    wrote: bool = False
+
+
+# Set by ReplicaRoutingMiddleware for the duration of a request. Outside
+# requests (commands, jobs) it's None and everything uses the primary.
+# A mutable object rather than a plain flag so writes made on sync_to_async
+# threads are seen by the middleware.
+_state: ContextVar = ContextVar("replica_routing", default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def routing(use_replica):
+    """Route the block's reads to the replica if `use_replica`; yields the state."""
+    state = RoutingState(use_replica=use_replica and replica_configured())
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica and writes to the primary.
+
+    Only reads made while handling a safe (GET/HEAD) request that isn't pinned
+    go to the replica. As soon as the request writes, its remaining reads
+    switch to the primary so it never reads around its own write.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is not None and state.use_replica and not state.wrote:
+            return REPLICA_ALIAS
+        return PRIMARY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        return db == PRIMARY_ALIAS
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.db import DatabaseError
+
+
+class SessionStore(CachedDBStore):
+    """
+    Cache-first sessions with a write-behind copy in the database.
+
+    Reads come from the cache and fall back to the database only on a miss, as
+    with Django's cached_db engine. Writes always go to the cache but reach
+    `django_session` only when the session is created, its authentication
+    changes (login, logout, password change), or its database copy is older
+    than SESSION_WRITE_BEHIND_SECONDS. Losing the cache loses at most that
+    window of other changes, never who the session is logged in as.
+
+    Only use it with a cache every process shares (CACHE_URL): with per-process
+    caches a session would differ from pod to pod.
+    """
+
+    AUTH_KEYS = (SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY)
+
+    @property
+    def flushed_key(self):
+        return f"{self.cache_key}:flushed"
+
+    def save(self, must_create=False):
+        if must_create or self.session_key is None:
+            # New keys are checked for collisions against the database
+            super().save(must_create=True)
+            self.mark_flushed()
+            return
+
+        self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+        # The marker holds the authentication the database copy was written
+        # with, so a login within the window still writes through
+        if self._cache.get(self.flushed_key) == self.auth_state():
+            return
+        try:
+            DBStore.save(self)
+        except DatabaseError:
+            # The cache already holds the change; the next save retries
+            return
+        self.mark_flushed()
+
+    def auth_state(self):
+        return [self._session.get(key) for key in self.AUTH_KEYS]
+
+    def mark_flushed(self):
+        self._cache.set(
+            self.flushed_key, self.auth_state(), settings.SESSION_WRITE_BEHIND_SECONDS
+        )
+
+    def delete(self, session_key=None):
+        session_key = session_key or self.session_key
+        if session_key is not None:
+            self._cache.delete(f"{self.cache_key_prefix}{session_key}:flushed")
+        super().delete(session_key)
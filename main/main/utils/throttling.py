@@ -0,0 +1,209 @@
+"""
+Request throttling with token buckets kept in the shared cache.
+
+Every (view, client) pair gets a bucket holding `limit` tokens that refill at
+`limit` per `period`. The cache API only offers atomic increments, not
+compare-and-set, so a bucket is stored as the number of tokens taken in the
+current period plus the previous period's count, which is treated as refilling
+linearly. Taking a token is one INCR and one GET, and concurrent requests on
+different pods can't lose each other's updates.
+
+THROTTLE_CACHE must be shared by every pod (see CACHE_URL); a system check
+warns when it isn't. When the shared cache fails the buckets move to this
+process's memory for a while, logged and reported as a "throttle_local"
+Server-Timing span: limits then hold per pod rather than across pods, which
+beats both failing every request and not limiting at all.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from .asyncviews import aload_session
+from .metrics import span
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PERIODS = {"second": 1, "minute": 60, "hour": 60 * 60, "day": 24 * 60 * 60}
+# Bump when the key layout changes
+THROTTLE_CACHE_VERSION = 1
+# After the shared cache fails, how long to use local memory before retrying it
+FALLBACK_SECONDS = 30
+
+local_buckets = LocMemCache("throttling", {"OPTIONS": {"MAX_ENTRIES": 10000}})
+_fallback_until = 0.0
+
+
+@dataclass(frozen=True)
+class Rate:
+    limit: int
+    period: int
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'30/minute' (or '30/m') -> Rate(30, 60)."""
+    count, _, unit = rate.partition("/")
+    period = next(
+        (seconds for name, seconds in PERIODS.items() if unit and name.startswith(unit)),
+        None,
+    )
+    if not count.isdigit() or int(count) < 1 or period is None:
+        raise ValueError(f"Invalid throttle rate {rate!r}")
+    return Rate(int(count), period)
+
+
+def rate_for(view_name, method):
+    """The rate for a request to `view_name`, or None if it isn't throttled."""
+    rates = settings.THROTTLE_RATES
+    if view_name in rates:
+        rate = rates[view_name]
+    elif method not in SAFE_METHODS:
+        rate = settings.THROTTLE_DEFAULT_RATE
+    else:
+        return None
+    return parse_rate(rate) if rate else None
+
+
+def client_ip(request):
+    """The client's address, looking past THROTTLE_PROXY_COUNT trusted proxies."""
+    proxies = settings.THROTTLE_PROXY_COUNT
+    if proxies:
+        # Each proxy appends the address it got the request from
+        forwarded = [
+            address.strip()
+            for address in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")
+            if address.strip()
+        ]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def client_identity(request):
+    # The session already knows the user; loading the user would cost a query
+    user_id = request.session.get(SESSION_KEY) if hasattr(request, "session") else None
+    return f"user:{user_id}" if user_id is not None else f"ip:{client_ip(request)}"
+
+
+def request_rate(request):
+    match = request.resolver_match
+    return rate_for(match.view_name, request.method) if match is not None else None
+
+
+def bucket_for(request, rate):
+    """
+    The bucket `request` draws from: (key, previous key, rate, seconds into
+    the current period).
+    """
+    now = time.time()
+    window = int(now // rate.period)
+    view_name = request.resolver_match.view_name
+    base = f"throttle:{view_name}:{client_identity(request)}:{rate.period}"
+    return f"{base}:{window}", f"{base}:{window - 1}", rate, now - window * rate.period
+
+
+def used_tokens(rate, previous, count, elapsed):
+    return previous * (1 - elapsed / rate.period) + count
+
+
+def retry_after(rate, previous, count, elapsed):
+    """Whole seconds until a request would fit again, if nothing else arrives."""
+    room = rate.limit - 1 - count
+    if room >= 0:
+        # The previous period's share decays enough before this one ends
+        wait = rate.period * (1 - room / previous) - elapsed
+    else:
+        # This period's count has to start decaying too
+        wait = rate.period - elapsed + rate.period * (1 - (rate.limit - 1) / count)
+    return max(1, math.ceil(wait))
+
+
+def _take(cache, key, previous_key, rate, elapsed):
+    try:
+        count = cache.incr(key, version=THROTTLE_CACHE_VERSION)
+    except ValueError:
+        # First request this period; add() loses the race if another pod wins it
+        if cache.add(key, 1, timeout=2 * rate.period, version=THROTTLE_CACHE_VERSION):
+            count = 1
+        else:
+            count = cache.incr(key, version=THROTTLE_CACHE_VERSION)
+    previous = cache.get(previous_key, 0, version=THROTTLE_CACHE_VERSION)
+    if used_tokens(rate, previous, count, elapsed) <= rate.limit:
+        return None
+    # A refused request takes no token, so clients honouring Retry-After get in
+    cache.decr(key, version=THROTTLE_CACHE_VERSION)
+    return retry_after(rate, previous, count - 1, elapsed)
+
+
+async def _atake(cache, key, previous_key, rate, elapsed):
+    try:
+        count = await cache.aincr(key, version=THROTTLE_CACHE_VERSION)
+    except ValueError:
+        if await cache.aadd(key, 1, timeout=2 * rate.period, version=THROTTLE_CACHE_VERSION):
+            count = 1
+        else:
+            count = await cache.aincr(key, version=THROTTLE_CACHE_VERSION)
+    previous = await cache.aget(previous_key, 0, version=THROTTLE_CACHE_VERSION)
+    if used_tokens(rate, previous, count, elapsed) <= rate.limit:
+        return None
+    await cache.adecr(key, version=THROTTLE_CACHE_VERSION)
+    return retry_after(rate, previous, count - 1, elapsed)
+
+
+def shared_cache_usable():
+    return time.monotonic() >= _fallback_until
+
+
+def shared_cache_failed():
+    global _fallback_until
+    logger.warning(
+        "Throttle cache unavailable, limiting per process for %ss",
+        FALLBACK_SECONDS,
+        exc_info=True,
+    )
+    _fallback_until = time.monotonic() + FALLBACK_SECONDS
+
+
+def throttle(request):
+    """
+    Take a token from the request's bucket.
+
+    Returns None if the request may proceed, otherwise the seconds the client
+    should wait before retrying.
+    """
+    rate = request_rate(request)
+    if rate is None:
+        return None
+    bucket = bucket_for(request, rate)
+    if shared_cache_usable():
+        try:
+            return _take(caches[settings.THROTTLE_CACHE], *bucket)
+        except Exception:
+            shared_cache_failed()
+    # Its own span, so the fallback shows in Server-Timing
+    with span("throttle_local"):
+        return _take(local_buckets, *bucket)
+
+
+async def athrottle(request):
+    """Async `throttle`, for the async middleware path."""
+    rate = request_rate(request)
+    if rate is None:
+        return None
+    await aload_session(request)
+    bucket = bucket_for(request, rate)
+    if shared_cache_usable():
+        try:
+            return await _atake(caches[settings.THROTTLE_CACHE], *bucket)
+        except Exception:
+            shared_cache_failed()
+    # Local memory never blocks, so the sync calls are fine here
+    with span("throttle_local"):
+        return _take(local_buckets, *bucket)
@@ -0,0 +1,22 @@
+import hmac
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from main.utils.metrics import registry
+
+
+def metrics_view(request):
+    """
+    This process's request metrics in Prometheus text format.
+
+    Scrapers authenticate with METRICS_TOKEN; without one configured only
+    signed-in staff can read them.
+    """
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+            return HttpResponseForbidden()
+    elif not request.user.is_staff:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
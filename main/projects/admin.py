@@ -1,7 +1,22 @@
 from django.contrib import admin
+from main.utils.admin import LargeTableAdmin
+from .models import Membership, Project
 
-# Register your models here.
-from .models import Project
 
+class MembershipInline(admin.TabularInline):
+    model = Membership
+    extra = 0
+    autocomplete_fields = ["user"]
+    readonly_fields = ["timestamp"]
 
-admin.site.register(Project)
+
+@admin.register(Project)
+class ProjectAdmin(LargeTableAdmin):
+    list_display = ["title", "handle", "owner", "items_count", "last_item_at", "timestamp"]
+    list_select_related = ["owner"]
+    list_filter = ["active", "timestamp"]
+    # Also what the Items admin's project autocomplete searches
+    search_fields = ["title", "handle"]
+    autocomplete_fields = ["owner"]
+    readonly_fields = ["items_count", "last_item_at", "version"]
+    inlines = [MembershipInline]
@@ -0,0 +1,148 @@
+from typing import NamedTuple
+from django.core.cache import cache
+from main.utils.metrics import record_cache
+
+# Bump when the shape of cached project data changes so old pods' entries are ignored
+PROJECT_CACHE_VERSION = 4
+PROJECT_CACHE_TIMEOUT = 60 * 15
+
+
+class ProjectSummary(NamedTuple):
+    id: int
+    title: str
+    handle: str
+    active: bool
+    items_count: int
+    # The viewing user's role (see projects.permissions)
+    role: str
+
+
+# Cached per project, so a change never needs to know who the members are
+SUMMARY_FIELDS = ("id", "title", "handle", "active", "items_count", "updated")
+
+
+def active_project_cache_key(project_id):
+    return f"active_project_{project_id}"
+
+
+def project_summary_cache_key(project_id):
+    return f"project_summary_{project_id}"
+
+
+def build_summaries(roles, rows):
+    # Most recently updated first, like the project list
+    rows = sorted(rows, key=lambda row: row[-1], reverse=True)
+    return [ProjectSummary(*row[:-1], role=roles[row[0]]) for row in rows]
+
+
+def _split_hits(roles, found):
+    keys = {project_id: project_summary_cache_key(project_id) for project_id in roles}
+    rows = [found[key] for key in keys.values() if key in found]
+    missing = [project_id for project_id, key in keys.items() if key not in found]
+    record_cache(not missing, bool(missing))
+    return rows, missing
+
+
+def get_user_project_summaries(user_id, roles=None):
+    """
+    Return the user's projects as a list of `ProjectSummary` for the switcher.
+
+    Which projects comes from the cached permission matrix (`roles`, loaded if
+    not given); each project's row is cached on its own and fetched in one
+    `get_many`. Only plain tuples are cached, so a warm switcher never touches
+    the database; any misses are filled with one query.
+    """
+    from .models import Project
+    from .permissions import get_project_roles
+
+    if roles is None:
+        roles = get_project_roles(user_id)
+    found = cache.get_many(
+        [project_summary_cache_key(project_id) for project_id in roles],
+        version=PROJECT_CACHE_VERSION,
+    )
+    rows, missing = _split_hits(roles, found)
+    if missing:
+        fetched = list(
+            Project.objects.filter(pk__in=missing).order_by().values_list(*SUMMARY_FIELDS)  # type: ignore
+        )
+        cache.set_many(
+            {project_summary_cache_key(row[0]): row for row in fetched},
+            timeout=PROJECT_CACHE_TIMEOUT,
+            version=PROJECT_CACHE_VERSION,
+        )
+        rows += fetched
+    return build_summaries(roles, rows)
+
+
+async def aget_user_project_summaries(user_id, roles=None):
+    """Async `get_user_project_summaries`, for async views and middleware."""
+    from .models import Project
+    from .permissions import aget_project_roles
+
+    if roles is None:
+        roles = await aget_project_roles(user_id)
+    found = await cache.aget_many(
+        [project_summary_cache_key(project_id) for project_id in roles],
+        version=PROJECT_CACHE_VERSION,
+    )
+    rows, missing = _split_hits(roles, found)
+    if missing:
+        fetched = [
+            row
+            async for row in Project.objects.filter(pk__in=missing).order_by().values_list(  # type: ignore
+                *SUMMARY_FIELDS
+            )
+        ]
+        await cache.aset_many(
+            {project_summary_cache_key(row[0]): row for row in fetched},
+            timeout=PROJECT_CACHE_TIMEOUT,
+            version=PROJECT_CACHE_VERSION,
+        )
+        rows += fetched
+    return build_summaries(roles, rows)
+
+
+def get_cached_active_project(project_id):
+    project = cache.get(active_project_cache_key(project_id), version=PROJECT_CACHE_VERSION)
+    record_cache(project is not None, project is None)
+    return project
+
+
+async def aget_cached_active_project(project_id):
+    project = await cache.aget(
+        active_project_cache_key(project_id), version=PROJECT_CACHE_VERSION
+    )
+    record_cache(project is not None, project is None)
+    return project
+
+
+def set_cached_active_project(project):
+    cache.set(
+        active_project_cache_key(project.pk),
+        project,
+        timeout=PROJECT_CACHE_TIMEOUT,
+        version=PROJECT_CACHE_VERSION,
+    )
+
+
+async def aset_cached_active_project(project):
+    await cache.aset(
+        active_project_cache_key(project.pk),
+        project,
+        timeout=PROJECT_CACHE_TIMEOUT,
+        version=PROJECT_CACHE_VERSION,
+    )
+
+
+def invalidate_project_cache(project):
+    """Drop every cached entry derived from this project; members share them."""
+    cache.delete_many(
+        [active_project_cache_key(project.pk), project_summary_cache_key(project.pk)],
+        version=PROJECT_CACHE_VERSION,
+    )
+
+
+def invalidate_project_summaries(project):
+    """Drop the project's switcher row, e.g. after the item counters change."""
+    cache.delete(project_summary_cache_key(project.pk), version=PROJECT_CACHE_VERSION)
@@ -1,20 +1,21 @@
-from .models import Project
-from django.core.cache import cache
-from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from main.utils.metrics import timed
+from .cache import get_user_project_summaries
 
 
+@timed("ctx")
 def user_context_projects(request):
-    project_qs = Project.objects.none()
+    projects_list = []
 
     if request.user.is_authenticated:
-        cache_str = f"projects_list_{request.user.id}"
-        project_qs = cache.get(cache_str)
-
-        if project_qs is None:
-            project_qs = Project.objects.filter(owner=request.user)
-            session_timeout = settings.SESSION_COOKIE_AGE
-            cache.set(cache_str, project_qs, timeout=session_timeout)
+        user_id = request.user.id
+        # Only resolved when a template actually renders the switcher
+        projects_list = SimpleLazyObject(
+            lambda: get_user_project_summaries(
+                user_id, getattr(request, "project_roles", None)
+            )
+        )
 
     return {
-        "projects_list": project_qs,
+        "projects_list": projects_list,
     }
@@ -0,0 +1,99 @@
+import logging
+from django.db import transaction
+from django.db.models import Count, F, Max, Value
+from django.db.models.functions import Coalesce, Greatest, Now
+from .cache import invalidate_project_cache, invalidate_project_summaries
+from .models import Project
+
+logger = logging.getLogger(__name__)
+
+# Projects checked per reconciliation transaction
+RECONCILE_BATCH_SIZE = 500
+
+
+def adjust_item_counters(project, delta, added_at=None):
+    """
+    Add `delta` to the project's `items_count` in one UPDATE, and move
+    `last_item_at` forward to `added_at` when items were added.
+
+    The F() expressions make concurrent adjustments add up instead of
+    overwriting each other. `project` only needs `pk`.
+
+    Only the project's cached switcher row is dropped: the cached active
+    project is left alone, so adding items doesn't cost the next request a
+    project lookup. Its counters may lag, so pages showing counts read the row.
+    """
+    # Bumping `updated` also changes the project's ETags and card cache keys
+    changes = {"items_count": F("items_count") + delta, "updated": Now()}
+    if added_at is not None:
+        changes["last_item_at"] = Greatest(
+            Coalesce(F("last_item_at"), Value(added_at)), Value(added_at)
+        )
+    Project.all_objects.filter(pk=project.pk).update(**changes)  # type: ignore
+    transaction.on_commit(lambda: invalidate_project_summaries(project))
+
+
+def mark_items_changed(project):
+    """
+    Record that some of the project's items were edited without the count
+    changing, e.g. a new title or status.
+
+    Bumps `updated` as `adjust_item_counters` does, so the project row alone
+    tells whether any of its items changed (see items.views.item_list_stamp).
+    """
+    Project.all_objects.filter(pk=project.pk).update(updated=Now())  # type: ignore
+    transaction.on_commit(lambda: invalidate_project_summaries(project))
+
+
+def reconcile_item_counters(batch_size=RECONCILE_BATCH_SIZE):
+    """
+    Recount every project's items and repair counters that drifted. The
+    board's per-status counters are rebuilt along the way.
+
+    Projects are walked in primary key order, `batch_size` at a time. Each batch
+    locks its project rows (where the database supports it) while counting, so
+    items added concurrently can't slip between the count and the repair.
+    Returns the number of projects fixed.
+    """
+    from items.models import Items, StatusCount
+
+    fixed = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            projects = list(
+                Project.all_objects.select_for_update()  # type: ignore
+                .filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", "items_count", "last_item_at")[:batch_size]
+            )
+            if not projects:
+                break
+            last_pk = projects[-1][0]
+            StatusCount.objects.rebuild([pk for pk, *_ in projects])  # type: ignore
+            actual = {
+                row["project_id"]: (row["count"], row["latest"])
+                for row in Items.objects.filter(  # type: ignore
+                    project_id__in=[pk for pk, *_ in projects]
+                )
+                .values("project_id")
+                .annotate(count=Count("id"), latest=Max("timestamp"))
+                .order_by()
+            }
+            for pk, items_count, last_item_at in projects:
+                count, latest = actual.get(pk, (0, None))
+                if (count, latest) == (items_count, last_item_at):
+                    continue
+                logger.warning(
+                    "Project %s item counter drifted: %s stored, %s actual",
+                    pk,
+                    items_count,
+                    count,
+                )
+                Project.all_objects.filter(pk=pk).update(  # type: ignore
+                    items_count=count, last_item_at=latest, updated=Now()
+                )
+                project = Project(pk=pk)
+                transaction.on_commit(lambda project=project: invalidate_project_cache(project))
+                fixed += 1
+    return fixed
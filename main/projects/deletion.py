@@ -0,0 +1,93 @@
+import logging
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+from activity.log import record
+from activity.models import Activity
+from items.models import Items
+from .cache import invalidate_project_cache
+from .models import Project
+from .permissions import memberships_changed
+
+logger = logging.getLogger(__name__)
+
+
+def request_project_deletion(project):
+    """
+    Hide `project` immediately and queue the actual removal.
+
+    Costs a couple of small queries whatever the project holds, so the request
+    returns in constant time; `purge_project` does the heavy lifting in a worker.
+    """
+    from .tasks import purge_project_task
+
+    now = timezone.now()
+    Project.all_objects.filter(pk=project.pk).update(  # type: ignore
+        deletion_requested_at=now, updated=now, version=F("version") + 1
+    )
+    project.deletion_requested_at = now
+    invalidate_project_cache(project)
+    record(Activity.Verb.DELETED, project)
+    # Drop the project from every member's permission matrix and switcher
+    memberships_changed(project.memberships.values_list("user_id", flat=True))
+    transaction.on_commit(lambda: purge_project_task.enqueue(project.pk))
+
+
+def delete_items_batch(project_id, batch_size, using):
+    """Delete up to `batch_size` of the project's items with one raw DELETE."""
+    table = connections[using].ops.quote_name(Items._meta.db_table)
+    with connections[using].cursor() as cursor:
+        # Bypasses the ORM collector: nothing references items, so there is
+        # nothing to cascade and no reason to load rows into Python
+        cursor.execute(
+            f"DELETE FROM {table} WHERE id IN "
+            f"(SELECT id FROM {table} WHERE project_id = %s LIMIT %s)",
+            [project_id, batch_size],
+        )
+        return cursor.rowcount
+
+
+def delete_asset_files(project, storage=None):
+    storage = storage or default_storage
+    for asset in project.assets.prefetch_related("chunks", "derivatives"):
+        for stored in [*asset.chunks.all(), *asset.derivatives.all()]:
+            storage.delete(stored.name)
+
+
+def purge_project(project_id, batch_size=None):
+    """
+    Remove a project marked for deletion, its items in bounded batches first.
+
+    Each batch commits on its own with the progress counter, so if the worker
+    dies halfway the retried job simply carries on with what's left.
+    """
+    batch_size = batch_size or settings.PROJECT_DELETE_BATCH_SIZE
+    project = Project.all_objects.filter(  # type: ignore
+        pk=project_id, deletion_requested_at__isnull=False
+    ).first()
+    if project is None:
+        return
+
+    using = router.db_for_write(Items)
+    progress = Project.all_objects.filter(pk=project_id)  # type: ignore
+    if project.deletion_total is None:
+        # The maintained counter spares a COUNT(*) over a possibly huge project
+        remaining = max(project.items_count, 0)
+        progress.update(deletion_total=project.deletion_done + remaining)
+
+    while True:
+        with transaction.atomic(using=using):
+            deleted = delete_items_batch(project_id, batch_size, using)
+            if deleted:
+                progress.update(
+                    deletion_done=F("deletion_done") + deleted, updated=timezone.now()
+                )
+        if not deleted:
+            break
+
+    delete_asset_files(project)
+    # Only small relations are left for the ORM cascade now
+    project.delete()
+    logger.info("Project %s purged", project_id)
@@ -1,5 +1,6 @@
 from django import forms
-from .models import Project
+from django.contrib.auth import get_user_model
+from .models import Membership, Project
 
 
 class ProjectForm(forms.ModelForm):
@@ -66,7 +67,7 @@ class ProjectCreateForm(forms.ModelForm):
 class ProjectUpdateForm(forms.ModelForm):
     class Meta:
         model = Project
-        fields = ["title", "description", "handle"]
+        fields = ["title", "handle"]
 
     def clean_handle(self):
         handle = self.cleaned_data.get("handle")
@@ -77,3 +78,57 @@ class ProjectUpdateForm(forms.ModelForm):
                     "Handle must be at least 3 characters long."
                 )
         return handle
+
+
+class MembershipForm(forms.Form):
+    """Add someone to a project, or change their role if they're already in it."""
+
+    username = forms.CharField(
+        max_length=150,
+        widget=forms.TextInput(
+            attrs={
+                "class": "block w-full px-4 py-3 text-gray-900 border border-gray-300 rounded-lg bg-gray-50 focus:ring-2 focus:ring-violet-500 focus:border-violet-500 transition-colors",
+                "placeholder": "Username",
+            }
+        ),
+    )
+    # The owner role follows Project.owner and can't be handed out here
+    role = forms.ChoiceField(
+        choices=[
+            (Membership.Role.EDITOR, Membership.Role.EDITOR.label),
+            (Membership.Role.VIEWER, Membership.Role.VIEWER.label),
+        ],
+        widget=forms.Select(
+            attrs={
+                "class": "block w-full px-4 py-3 text-gray-900 border border-gray-300 rounded-lg bg-gray-50 focus:ring-2 focus:ring-violet-500 focus:border-violet-500 transition-colors",
+            }
+        ),
+    )
+
+    def __init__(self, *args, project=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.project = project
+        self.member = None
+
+    def clean_username(self):
+        username = self.cleaned_data["username"].strip()
+        try:
+            user = get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            raise forms.ValidationError("No user with that username.")
+        if user.pk == self.project.owner_id:
+            raise forms.ValidationError("The owner's role can't be changed.")
+        self.member = user
+        return username
+
+
+class MembershipRemoveForm(forms.Form):
+    """Which membership to remove: any of the project's except the owner's."""
+
+    remove = forms.ModelChoiceField(queryset=Membership.objects.none())  # type: ignore
+
+    def __init__(self, *args, project=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["remove"].queryset = project.memberships.exclude(  # type: ignore
+            user_id=project.owner_id
+        ).select_related("user")
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from projects.counters import RECONCILE_BATCH_SIZE, reconcile_item_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount every project's items in batches and repair items_count and "
+        "last_item_at wherever they drifted from the items table; the board's "
+        "per-status counters are rebuilt too."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        fixed = reconcile_item_counters(options["batch_size"])
+        self.stdout.write(f"Repaired {fixed} project counter{'s' if fixed != 1 else ''}")
@@ -1,70 +1,176 @@
-import time
 import logging
-from django.http import HttpResponse
-from django.shortcuts import redirect
-from django.contrib import messages
-from django.utils.deprecation import MiddlewareMixin
-from django.conf import settings
-from .models import Project, AnonymousProject
-from django.core.cache import cache
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.utils.functional import empty
+from main.utils.asyncviews import aload_session
+from main.utils.metrics import span
+from .models import Project
+from .cache import (
+    aget_cached_active_project,
+    aset_cached_active_project,
+    get_cached_active_project,
+    set_cached_active_project,
+)
+from .permissions import aget_project_roles, get_project_roles
 
 
 logger = logging.getLogger(__name__)
 
+# The active project lives in the session as [id, version]
+ACTIVE_PROJECT_SESSION_KEY = "active_project"
+# Sessions written before (id, version) pairs hold the handle; upgraded on read
+LEGACY_SESSION_KEY = "project_handle"
+
+
+def store_active_project(session, project):
+    session[ACTIVE_PROJECT_SESSION_KEY] = [project.pk, project.version]
+    session.pop(LEGACY_SESSION_KEY, None)
+
+
+def clear_active_project(session):
+    session.pop(ACTIVE_PROJECT_SESSION_KEY, None)
+    session.pop(LEGACY_SESSION_KEY, None)
+
+
+def request_user_id(request):
+    """
+    The id of the user the session is logged in as, without loading the user.
+
+    `request.user` is lazy and costs a query on first use; the session already
+    knows the id. Views still check the user properly through login_required.
+    """
+    user = request.user
+    if getattr(user, "_wrapped", None) is not empty:
+        return user.pk if user.is_authenticated else None
+    user_id = request.session.get(SESSION_KEY)
+    if user_id is None:
+        return None
+    return get_user_model()._meta.pk.to_python(user_id)
+
+
+def _lookup(request):
+    """
+    Split the session's active project reference into the user id, the stored
+    [id, version] pair and the ORM lookup to run on a cache miss.
+    """
+    user_id = request_user_id(request)
+    if user_id is None:
+        return None
+    pair = request.session.get(ACTIVE_PROJECT_SESSION_KEY)
+    if pair is not None:
+        return user_id, pair, {"pk": pair[0]}
+    handle = request.session.get(LEGACY_SESSION_KEY)
+    if handle:
+        return user_id, None, {"handle": handle}
+    return None
+
+
+def _found(request, pair, filters, project, roles):
+    if project is not None and project.pk not in roles:
+        # Membership revoked, or a legacy handle naming someone else's project
+        project = None
+    if project is None:
+        # Clean up invalid session data so we don't look it up again
+        clear_active_project(request.session)
+        logger.warning(f"Invalid active project removed from session: {filters}")
+        return None
+    if pair != [project.pk, project.version]:
+        store_active_project(request.session, project)
+    return project
+
+
+def resolve_active_project(request):
+    """
+    Return the active project stored in the session, or None.
+
+    Access comes from the user's cached permission matrix, which is also left
+    on `request.project_roles` for the views. A warm matrix plus a cache hit
+    whose version matches the session costs no queries; otherwise a single
+    primary key lookup.
+    """
+    lookup = _lookup(request)
+    if lookup is None:
+        return None
+    user_id, pair, filters = lookup
+    roles = request.project_roles = get_project_roles(user_id)
+
+    if pair is not None:
+        if pair[0] not in roles:
+            return _found(request, pair, filters, None, roles)
+        project = get_cached_active_project(pair[0])
+        if project is not None and project.version == pair[1]:
+            return project
+
+    project = Project.objects.filter(active=True, **filters).first()  # type: ignore
+    if project is not None:
+        set_cached_active_project(project)
+    return _found(request, pair, filters, project, roles)
+
+
+async def aresolve_active_project(request):
+    """`resolve_active_project` for the async middleware path."""
+    await aload_session(request)
+    lookup = _lookup(request)
+    if lookup is None:
+        return None
+    user_id, pair, filters = lookup
+    roles = request.project_roles = await aget_project_roles(user_id)
+
+    if pair is not None:
+        if pair[0] not in roles:
+            return _found(request, pair, filters, None, roles)
+        project = await aget_cached_active_project(pair[0])
+        if project is not None and project.version == pair[1]:
+            return project
+
+    project = await Project.objects.filter(active=True, **filters).afirst()  # type: ignore
+    if project is not None:
+        await aset_cached_active_project(project)
+    return _found(request, pair, filters, project, roles)
+
 
 class ProjectMiddleware:
     """
     Middleware to handle project activation context for the Content Engine.
-    Ensures that project-specific functionality works with session data.
+    Sets `request.active_project` from the session's (id, version) pair, and
+    `request.project_role`, the user's role in it.
+
+    Runs natively in both modes, so under ASGI the lookup uses the async cache
+    and ORM instead of a sync_to_async hop around the whole middleware.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with span("project"):
+            request.active_project = resolve_active_project(request)
+        self.set_role(request)
+        response = self.get_response(request)
+        return self.add_headers(request, response)
+
+    async def __acall__(self, request):
+        with span("project"):
+            request.active_project = await aresolve_active_project(request)
+        self.set_role(request)
+        response = await self.get_response(request)
+        return self.add_headers(request, response)
+
+    def set_role(self, request):
+        project = request.active_project
+        roles = getattr(request, "project_roles", None) or {}
+        request.project_role = roles.get(project.pk) if project is not None else None
 
-        if not hasattr(request, "project"):
-            request.project = AnonymousProject()
-            if request.user.is_authenticated:
-                project_handle = request.session.get("project_handle")
-                request.project = Project.objects.get("project_handle")  # type: ignore
-                project_obj = None
-                cache_str = None
-                if project_handle is not None:
-                    cache_str = f"project_{project_handle}"
-                    project_obj = cache.get(cache_str)
-                    if project_obj is None and project_handle is not None:
-                        try:
-                            project_obj = Project.objects.get(handle=project_handle)  # type: ignore
-                        except:
-                            project_obj = None
-
-                if project_obj is not None:
-                    cache.set(cache_str, project_obj)
-                    request.project = project_obj
-        return self.get_response(request)
-
-    def process_request(self, request):
-        """Add project context to request if user is authenticated and has active project."""
-        request.active_project = None
-
-        if request.user.is_authenticated:
-            project_handle = request.session.get("project_handle")
-            if project_handle:
-                try:
-                    project = Project.objects.get(  # type: ignore
-                        owner=request.user, handle=project_handle, active=True
-                    )  # type: ignore
-                    request.active_project = project
-                except Project.DoesNotExist:  # type: ignore  # type: ignore
-                    # Clean up invalid session data
-                    del request.session["project_handle"]
-                    logger.warning(
-                        f"Invalid project handle removed from session: {project_handle}"
-                    )
-
-    def process_response(self, request, response):
-        """Add project information to response headers for debugging."""
-        if hasattr(request, "active_project") and request.active_project:
+    def add_headers(self, request, response):
+        # Add project information to response headers for debugging
+        if request.active_project is not None:
             response["X-Active-Project"] = request.active_project.handle
         return response
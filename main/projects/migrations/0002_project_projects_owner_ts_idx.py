@@ -0,0 +1,17 @@
+# Generated by Django 4.2.24 on 2026-10-18 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['owner', '-timestamp', 'id'], name='projects_owner_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.24 on 2026-10-18 04:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_projects_owner_ts_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='deletion_done',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='deletion_requested_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='deletion_total',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.24 on 2026-10-18 05:06
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    Items = apps.get_model("items", "Items")
+    per_project = (
+        Items.objects.filter(project=OuterRef("pk")).order_by().values("project")
+    )
+    Project.objects.update(
+        # The subquery yields NULL for projects without items
+        items_count=Coalesce(Subquery(per_project.annotate(n=Count("id")).values("n")), 0),
+        last_item_at=Subquery(per_project.annotate(t=Max("timestamp")).values("t")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_project_version'),
+        ('items', '0003_items_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='items_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='last_item_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
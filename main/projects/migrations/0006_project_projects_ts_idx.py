@@ -0,0 +1,17 @@
+# Generated by Django 4.2.24 on 2026-10-18 05:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_project_item_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-timestamp', 'id'], name='projects_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.24 on 2026-10-18 05:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def backfill_owner_memberships(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    Membership = apps.get_model("projects", "Membership")
+    now = timezone.now()
+    owned = Project.objects.filter(owner__isnull=False).values_list("pk", "owner_id")
+    Membership.objects.bulk_create(
+        (
+            Membership(project_id=pk, user_id=owner_id, role="owner", timestamp=now)
+            for pk, owner_id in owned.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0006_project_projects_ts_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Membership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('owner', 'Owner'), ('editor', 'Editor'), ('viewer', 'Viewer')], default='viewer', max_length=10)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='projects.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'project'], name='projects_membership_user_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='membership',
+            constraint=models.UniqueConstraint(fields=('project', 'user'), name='projects_membership_unique'),
+        ),
+        migrations.RunPython(backfill_owner_memberships, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,50 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.utils.text import slugify
 from django.urls import reverse
-from main.utils.generators import unique_slug_generator
+from main.utils.generators import bulk_unique_slug_generator, unique_slug_generator
 
 User = settings.AUTH_USER_MODEL
 
+# Retries when another replica grabs the same handle between check and insert
+HANDLE_ALLOCATION_ATTEMPTS = 3
+# Literal path segments under /projects/ (see urls.py): a project with one of
+# these handles would get another view at its detail URL
+RESERVED_HANDLES = frozenset({"create", "activate", "deactivate"})
+
+
+class ProjectManager(models.Manager):
+    def get_queryset(self):
+        # Projects pending deletion are invisible everywhere; use all_objects to see them
+        return super().get_queryset().filter(deletion_requested_at__isnull=True)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Fill in missing handles for all projects with one lookup before inserting."""
+        from .permissions import memberships_changed
+
+        objs = list(objs)
+        missing = [obj for obj in objs if not obj.handle]
+        for attempt in range(HANDLE_ALLOCATION_ATTEMPTS):
+            handles = bulk_unique_slug_generator(
+                missing, slug_field="handle", reserved=RESERVED_HANDLES
+            )
+            for obj, handle in zip(missing, handles):
+                obj.handle = handle
+            try:
+                with transaction.atomic(using=self.db):
+                    created = super().bulk_create(objs, *args, **kwargs)
+                    # No post_save here, so give the owners their memberships directly
+                    memberships = Membership.objects.using(self.db).bulk_create(  # type: ignore
+                        Membership(project=obj, user_id=obj.owner_id, role=Membership.Role.OWNER)
+                        for obj in created
+                        if obj.owner_id is not None
+                    )
+                    memberships_changed({membership.user_id for membership in memberships})
+                    return created
+            except IntegrityError:
+                if not missing or attempt == HANDLE_ALLOCATION_ATTEMPTS - 1:
+                    raise
+
 
 class AnonymousProject(models.Model):
     value = None
@@ -18,24 +57,90 @@ class Project(models.Model):
     title = models.CharField(max_length=120)
     handle = models.SlugField(unique=True, blank=True, null=True)
     active = models.BooleanField(default=True)  # type: ignore
-    updated = models.DateTimeField(
-        auto_now_add=False, related_name="updated_projects", auto_now=True
-    )
+    updated = models.DateTimeField(auto_now_add=False, auto_now=True)
     timestamp = models.DateTimeField(auto_now_add=True, auto_now=False)
+    # Set when the owner deletes the project; a background job then removes its
+    # items in batches and finally the row itself
+    deletion_requested_at = models.DateTimeField(null=True, blank=True)
+    deletion_total = models.PositiveIntegerField(null=True, blank=True)
+    deletion_done = models.PositiveIntegerField(default=0)
+    # Bumped on every save; sessions store (id, version) so a stale cached
+    # copy of the active project is recognised without a query
+    version = models.PositiveIntegerField(default=1)
+    # Maintained by items.models on every create/delete (see projects.counters);
+    # `manage.py reconcile_item_counters` repairs any drift
+    items_count = models.IntegerField(default=0)
+    last_item_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ProjectManager()
+    all_objects = models.Manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded owner so a change of owner moves the owner membership
+        instance._loaded_owner_id = instance.owner_id
+        return instance
 
     def save(self, *args, **kwargs):
-        if not self.handle:
-            self.handle = unique_slug_generator(self, slug_field="handle")
-        super().save(*args, **kwargs)
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        if self.handle:
+            return super().save(*args, **kwargs)
+
+        for attempt in range(HANDLE_ALLOCATION_ATTEMPTS):
+            self.handle = unique_slug_generator(
+                self, slug_field="handle", reserved=RESERVED_HANDLES
+            )
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                self.handle = None
+                if attempt == HANDLE_ALLOCATION_ATTEMPTS - 1:
+                    raise
 
     def get_absolute_url(self):
-        return reverse("projects:project_detail", kwargs={"id": self.id})  # type: ignore
+        return reverse("projects:project_detail", kwargs={"handle": self.handle})
 
     def get_delete_url(self):
         return reverse("projects:project_delete", kwargs={"handle": self.handle})
 
     class Meta:
         ordering = ["-updated", "-timestamp"]
+        indexes = [
+            models.Index(
+                fields=["owner", "-timestamp", "id"], name="projects_owner_ts_idx"
+            ),
+            # Keyset order of the admin changelist across all owners
+            models.Index(fields=["-timestamp", "id"], name="projects_ts_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.handle})"
+
+
+class Membership(models.Model):
+    """A user's role in a project. The owner has one too, created with the project."""
+
+    class Role(models.TextChoices):
+        OWNER = "owner", "Owner"
+        EDITOR = "editor", "Editor"
+        VIEWER = "viewer", "Viewer"
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="memberships")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="memberships")
+    role = models.CharField(max_length=10, choices=Role.choices, default=Role.VIEWER)
+    timestamp = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["project", "user"], name="projects_membership_unique")
+        ]
+        # The permission matrix is loaded per user
+        indexes = [models.Index(fields=["user", "project"], name="projects_membership_user_idx")]
+
+    def __str__(self):
+        return f"{self.user} ({self.role}) in {self.project_id}"
@@ -0,0 +1,170 @@
+import time
+from django.core.cache import cache
+from django.db import transaction
+from django.core.exceptions import PermissionDenied
+from main.utils.metrics import record_cache
+from main.utils.replicas import PRIMARY_ALIAS
+from .cache import PROJECT_CACHE_TIMEOUT, PROJECT_CACHE_VERSION
+from .models import Membership
+
+VIEW = "view"
+CHANGE_ITEMS = "change_items"
+CHANGE_PROJECT = "change_project"
+DELETE_PROJECT = "delete_project"
+MANAGE_MEMBERS = "manage_members"
+
+ROLE_PERMISSIONS = {
+    Membership.Role.OWNER: frozenset(
+        {VIEW, CHANGE_ITEMS, CHANGE_PROJECT, DELETE_PROJECT, MANAGE_MEMBERS}
+    ),
+    Membership.Role.EDITOR: frozenset({VIEW, CHANGE_ITEMS}),
+    Membership.Role.VIEWER: frozenset({VIEW}),
+}
+
+
+def permissions_version_key(user_id):
+    return f"project_roles_version_{user_id}"
+
+
+def project_roles_cache_key(user_id):
+    return f"project_roles_{user_id}"
+
+
+def new_version():
+    # Never reused, so an entry cached before an eviction can't match again
+    return time.time_ns()
+
+
+def project_roles_query(user_id):
+    """
+    (project id, role) for every live project the user belongs to, in one query.
+
+    Always from the primary: a lagging replica read right after an
+    invalidation would cache the revoked rows again.
+    """
+    return (
+        Membership.objects.using(PRIMARY_ALIAS)  # type: ignore
+        .filter(user_id=user_id, project__deletion_requested_at__isnull=True)
+        .values_list("project_id", "role")
+    )
+
+
+def _cached_roles(found, user_id):
+    version = found.get(permissions_version_key(user_id))
+    entry = found.get(project_roles_cache_key(user_id))
+    if version is not None and entry is not None and entry[0] == version:
+        return version, entry[1]
+    return version, None
+
+
+def get_project_roles(user_id):
+    """
+    The user's permission matrix as {project id: role}, cached per user.
+
+    The entry is tagged with the user's permissions version, which every
+    membership change replaces. A matrix computed from data read before the
+    change is tagged with the old version and ignored, so it can't linger.
+    """
+    version_key = permissions_version_key(user_id)
+    found = cache.get_many(
+        [version_key, project_roles_cache_key(user_id)], version=PROJECT_CACHE_VERSION
+    )
+    version, roles = _cached_roles(found, user_id)
+    record_cache(roles is not None, roles is None)
+    if roles is not None:
+        return roles
+    if version is None:
+        cache.add(version_key, new_version(), timeout=None, version=PROJECT_CACHE_VERSION)
+        version = cache.get(version_key, version=PROJECT_CACHE_VERSION)
+    roles = dict(project_roles_query(user_id))
+    cache.set(
+        project_roles_cache_key(user_id),
+        (version, roles),
+        timeout=PROJECT_CACHE_TIMEOUT,
+        version=PROJECT_CACHE_VERSION,
+    )
+    return roles
+
+
+async def aget_project_roles(user_id):
+    """Async `get_project_roles`, for async views and middleware."""
+    version_key = permissions_version_key(user_id)
+    found = await cache.aget_many(
+        [version_key, project_roles_cache_key(user_id)], version=PROJECT_CACHE_VERSION
+    )
+    version, roles = _cached_roles(found, user_id)
+    record_cache(roles is not None, roles is None)
+    if roles is not None:
+        return roles
+    if version is None:
+        await cache.aadd(version_key, new_version(), timeout=None, version=PROJECT_CACHE_VERSION)
+        version = await cache.aget(version_key, version=PROJECT_CACHE_VERSION)
+    roles = {project_id: role async for project_id, role in project_roles_query(user_id)}
+    await cache.aset(
+        project_roles_cache_key(user_id),
+        (version, roles),
+        timeout=PROJECT_CACHE_TIMEOUT,
+        version=PROJECT_CACHE_VERSION,
+    )
+    return roles
+
+
+def invalidate_project_roles(user_ids):
+    """Start a new permissions version for each user; their cached matrices lapse."""
+    cache.set_many(
+        {permissions_version_key(user_id): new_version() for user_id in user_ids},
+        timeout=None,
+        version=PROJECT_CACHE_VERSION,
+    )
+
+
+def memberships_changed(user_ids):
+    """
+    Invalidate the matrices of users whose memberships the current transaction
+    changed: at once, so the rest of the transaction sees the change, and again
+    on commit, so a matrix rebuilt from the old rows in between is dropped.
+    """
+    user_ids = list(user_ids)
+    invalidate_project_roles(user_ids)
+    transaction.on_commit(lambda: invalidate_project_roles(user_ids))
+
+
+def request_project_roles(request):
+    """The matrix for `request.user`, loaded at most once per request."""
+    roles = getattr(request, "project_roles", None)
+    if roles is None:
+        user = request.user
+        roles = get_project_roles(user.pk) if user.is_authenticated else {}
+        request.project_roles = roles
+    return roles
+
+
+async def arequest_project_roles(request):
+    roles = getattr(request, "project_roles", None)
+    if roles is None:
+        # Async views run after login_required has loaded the user
+        user = request.user
+        roles = await aget_project_roles(user.pk) if user.is_authenticated else {}
+        request.project_roles = roles
+    return roles
+
+
+def role_allows(role, permission):
+    return role is not None and permission in ROLE_PERMISSIONS[role]
+
+
+def project_permissions(roles, project):
+    """The set of permissions the matrix grants on `project`, for templates."""
+    role = roles.get(project.pk)
+    return ROLE_PERMISSIONS[role] if role is not None else frozenset()
+
+
+def check_project_permission(roles, project, permission):
+    if not role_allows(roles.get(project.pk), permission):
+        raise PermissionDenied
+
+
+def check_active_project_permission(request, permission):
+    """Raise PermissionDenied unless the user's role in the active project allows `permission`."""
+    if not role_allows(getattr(request, "project_role", None), permission):
+        raise PermissionDenied
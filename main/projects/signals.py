@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from activity.log import record
+from activity.models import Activity
+from .cache import invalidate_project_cache
+from .models import Membership, Project
+from .permissions import memberships_changed
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, **kwargs):
+    invalidate_project_cache(instance)
+    # Whoever owns the project holds the owner role in it
+    if created and instance.owner_id is not None:
+        Membership.objects.create(  # type: ignore
+            project=instance, user_id=instance.owner_id, role=Membership.Role.OWNER
+        )
+    elif instance.owner_id not in (None, getattr(instance, "_loaded_owner_id", None)):
+        Membership.objects.update_or_create(  # type: ignore
+            project=instance,
+            user_id=instance.owner_id,
+            defaults={"role": Membership.Role.OWNER},
+        )
+    instance._loaded_owner_id = instance.owner_id
+    record(Activity.Verb.CREATED if created else Activity.Verb.UPDATED, instance)
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    invalidate_project_cache(instance)
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def membership_changed(sender, instance, **kwargs):
+    memberships_changed([instance.user_id])
@@ -0,0 +1,7 @@
+from jobs.queue import task
+from .deletion import purge_project
+
+
+@task(queue="default", max_attempts=10)
+def purge_project_task(project_id):
+    purge_project(project_id)
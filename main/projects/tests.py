@@ -1,3 +1,453 @@
-from django.test import TestCase
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.cache import SessionStore
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import resolve
+from items.models import Items
+from jobs.models import Job
+from .counters import reconcile_item_counters
+from .deletion import purge_project
+from .context_proccer import user_context_projects
+from .cache import set_cached_active_project
+from .middleware import (
+    ACTIVE_PROJECT_SESSION_KEY,
+    LEGACY_SESSION_KEY,
+    ProjectMiddleware,
+    store_active_project,
+)
+from main.utils.generators import unique_slug_generator
+from .models import Membership, Project
+from main.utils.replicas import routing
+from .permissions import get_project_roles, project_roles_query
 
-# Create your tests here.
+User = get_user_model()
+
+# The manifest storage needs collectstatic; tests that render pages don't care
+# Query counts are pinned for the deployed setup, where sessions live in the
+# shared cache
+CACHE_SESSIONS = "main.utils.sessions"
+TEST_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+@override_settings(SESSION_ENGINE=CACHE_SESSIONS)
+class ProjectMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.project = Project.objects.create(owner=self.user, title="Launch")
+        self.middleware = ProjectMiddleware(lambda request: HttpResponse())
+
+    def make_request(self, project=None):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        request.session = SessionStore()
+        if project is not None:
+            store_active_project(request.session, project)
+        return request
+
+    def test_query_count_is_fixed_across_requests(self):
+        request = self.make_request(self.project)
+        # The permission matrix, then the project
+        with self.assertNumQueries(2):
+            response = self.middleware(request)
+        self.assertEqual(request.active_project, self.project)
+        self.assertEqual(response["X-Active-Project"], self.project.handle)
+
+        for _ in range(3):
+            request = self.make_request(self.project)
+            with self.assertNumQueries(0):
+                self.middleware(request)
+            self.assertEqual(request.active_project, self.project)
+
+    def test_save_and_delete_invalidate_cache(self):
+        self.middleware(self.make_request(self.project))
+        request = self.make_request(self.project)
+
+        self.project.title = "Relaunch"
+        self.project.save()
+        with self.assertNumQueries(1):
+            self.middleware(request)
+        self.assertEqual(request.active_project.title, "Relaunch")
+        # The session now refers to the new version
+        self.assertEqual(
+            request.session[ACTIVE_PROJECT_SESSION_KEY],
+            [self.project.pk, self.project.version],
+        )
+
+        self.project.delete()
+        request = self.make_request(request.active_project)
+        self.middleware(request)
+        self.assertIsNone(request.active_project)
+        self.assertNotIn(ACTIVE_PROJECT_SESSION_KEY, request.session)
+
+    def test_stale_version_is_refetched_even_if_cached(self):
+        stale = Project.objects.get(pk=self.project.pk)
+        self.project.save()
+        set_cached_active_project(stale)
+        request = self.make_request(self.project)
+        # The permission matrix is cold too
+        with self.assertNumQueries(2):
+            self.middleware(request)
+        self.assertEqual(request.active_project.version, self.project.version)
+
+    def test_legacy_handle_is_upgraded_to_id_and_version(self):
+        request = self.make_request()
+        request.session[LEGACY_SESSION_KEY] = self.project.handle
+        self.middleware(request)
+        self.assertEqual(request.active_project, self.project)
+        self.assertNotIn(LEGACY_SESSION_KEY, request.session)
+        self.assertEqual(
+            request.session[ACTIVE_PROJECT_SESSION_KEY],
+            [self.project.pk, self.project.version],
+        )
+
+    def test_other_users_project_is_not_activated(self):
+        other = User.objects.create_user(username="other", password="pass")
+        other_project = Project.objects.create(owner=other, title="Private")
+        request = self.make_request(other_project)
+        self.middleware(request)
+        self.assertIsNone(request.active_project)
+
+    def test_no_handle_costs_no_queries(self):
+        request = self.make_request()
+        with self.assertNumQueries(0):
+            self.middleware(request)
+        self.assertIsNone(request.active_project)
+
+    def test_cache_warm_request_runs_no_queries(self):
+        self.client.force_login(self.user)
+        session = self.client.session
+        store_active_project(session, self.project)
+        session.save()
+        cookie = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        seen = []
+
+        def view(request):
+            seen.append(request.active_project)
+            return HttpResponse()
+
+        stack = SessionMiddleware(AuthenticationMiddleware(ProjectMiddleware(view)))
+
+        def get():
+            request = RequestFactory().get("/")
+            request.COOKIES[settings.SESSION_COOKIE_NAME] = cookie
+            return stack(request)
+
+        get()
+        # Session, user id and project all come from the cache
+        with self.assertNumQueries(0):
+            get()
+        self.assertEqual(seen, [self.project, self.project])
+
+
+class UserContextProjectsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.project = Project.objects.create(owner=self.user, title="Launch")
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+
+    def test_switcher_is_lazy_and_cached(self):
+        with self.assertNumQueries(0):
+            context = user_context_projects(self.request)
+        # The permission matrix, then the rows of the projects in it
+        with self.assertNumQueries(2):
+            projects_list = list(context["projects_list"])
+        self.assertEqual(
+            [(p.id, p.title, p.handle, p.active) for p in projects_list],
+            [(self.project.id, "Launch", self.project.handle, True)],
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(len(user_context_projects(self.request)["projects_list"]), 1)
+
+    def test_project_changes_invalidate_switcher(self):
+        len(user_context_projects(self.request)["projects_list"])
+
+        Project.objects.create(owner=self.user, title="Second")
+        self.assertEqual(len(user_context_projects(self.request)["projects_list"]), 2)
+
+        self.project.title = "Renamed"
+        self.project.save()
+        titles = [p.title for p in user_context_projects(self.request)["projects_list"]]
+        self.assertIn("Renamed", titles)
+
+        self.project.delete()
+        self.assertEqual(len(user_context_projects(self.request)["projects_list"]), 1)
+
+
+class ItemCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.project = Project.objects.create(owner=self.user, title="Launch")
+
+    def counters(self):
+        self.project.refresh_from_db()
+        return self.project.items_count, self.project.last_item_at
+
+    def test_single_creates_and_deletes(self):
+        first = Items.objects.create(project=self.project, title="First")
+        second = Items.objects.create(project=self.project, title="Second")
+        self.assertEqual(self.counters(), (2, second.timestamp))
+
+        # Editing an item changes neither counter
+        first.title = "Renamed"
+        first.save()
+        second.delete()
+        self.assertEqual(self.counters(), (1, second.timestamp))
+
+    def test_bulk_paths(self):
+        other = Project.objects.create(owner=self.user, title="Other")
+        Items.objects.bulk_create(
+            [Items(project=self.project, title=f"Item {i}") for i in range(5)]
+            + [Items(project=other, title="Elsewhere")]
+        )
+        self.assertEqual(self.counters()[0], 5)
+        Items.objects.filter(title__in=["Item 0", "Elsewhere"]).delete()
+        self.assertEqual(self.counters()[0], 4)
+        other.refresh_from_db()
+        self.assertEqual(other.items_count, 0)
+
+    def test_switcher_shows_counts_without_extra_queries(self):
+        Items.objects.create(project=self.project, title="First")
+        request = RequestFactory().get("/")
+        request.user = self.user
+        with self.assertNumQueries(2):
+            summaries = list(user_context_projects(request)["projects_list"])
+        self.assertEqual(summaries[0].items_count, 1)
+
+        # The cached list is dropped once the counter change commits
+        with self.captureOnCommitCallbacks(execute=True):
+            Items.objects.create(project=self.project, title="Second")
+        summaries = list(user_context_projects(request)["projects_list"])
+        self.assertEqual(summaries[0].items_count, 2)
+
+    def test_reconcile_repairs_drift(self):
+        item = Items.objects.create(project=self.project, title="First")
+        untouched = Project.objects.create(owner=self.user, title="Empty")
+        Project.objects.filter(pk=self.project.pk).update(items_count=7, last_item_at=None)
+
+        self.assertEqual(reconcile_item_counters(batch_size=1), 1)
+        self.assertEqual(self.counters(), (1, item.timestamp))
+        untouched.refresh_from_db()
+        self.assertEqual(untouched.items_count, 0)
+        self.assertEqual(reconcile_item_counters(), 0)
+
+
+class ProjectHandleTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+
+    def test_handle_comes_from_title(self):
+        project = Project.objects.create(owner=self.user, title="Summer Shoot")
+        self.assertEqual(project.handle, "summer-shoot")
+
+    def test_route_words_are_never_handles(self):
+        for title in ("Create", "Activate", "Deactivate"):
+            project = Project.objects.create(owner=self.user, title=title)
+            self.assertTrue(project.handle.startswith(f"{title.lower()}-"))
+        (bulk,) = Project.objects.bulk_create([Project(owner=self.user, title="Create")])
+        self.assertNotEqual(bulk.handle, "create")
+
+        for project in Project.objects.all():
+            for url in (project.get_absolute_url(), project.get_delete_url()):
+                self.assertEqual(resolve(url).kwargs, {"handle": project.handle})
+
+    def test_collision_is_resolved_in_one_query(self):
+        Project.objects.create(owner=self.user, title="Summer Shoot")
+        project = Project(owner=self.user, title="Summer Shoot")
+        with self.assertNumQueries(1):
+            handle = unique_slug_generator(project, slug_field="handle")
+        self.assertTrue(handle.startswith("summer-shoot-"))
+
+    def test_bulk_create_assigns_distinct_handles(self):
+        Project.objects.create(owner=self.user, title="Teaser")
+        projects = [Project(owner=self.user, title="Teaser") for _ in range(5)]
+        Project.objects.bulk_create(projects)
+        handles = set(Project.objects.values_list("handle", flat=True))
+        self.assertEqual(len(handles), 6)
+
+    def test_save_retries_when_handle_is_taken_concurrently(self):
+        Project.objects.create(owner=self.user, title="Teaser")
+        project = Project(owner=self.user, title="Teaser")
+        with mock.patch(
+            "projects.models.unique_slug_generator", side_effect=["teaser", "teaser-2"]
+        ):
+            project.save()
+        self.assertEqual(project.handle, "teaser-2")
+
+
+@override_settings(SESSION_ENGINE=CACHE_SESSIONS)
+class ProjectDeletionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.project = Project.objects.create(owner=self.user, title="Launch")
+        self.client.force_login(self.user)
+
+    def add_items(self, count):
+        Items.objects.bulk_create(
+            Items(project=self.project, title=f"Item {i}") for i in range(count)
+        )
+
+    def delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/projects/{self.project.handle}/delete/",
+                {"confirm_title": "Launch", "confirm_understand": "on"},
+            )
+        self.assertEqual(response.status_code, 302)
+
+    def test_request_cost_does_not_grow_with_items(self):
+        # User, permission matrix, project lookup, mark deleted, the members
+        # whose matrices lapse, enqueue the purge job (session is cached), then
+        # the activity entry written after the response
+        with self.assertNumQueries(7):
+            self.delete()
+        self.project = Project.objects.create(owner=self.user, title="Launch")
+        self.add_items(500)
+        with self.assertNumQueries(7):
+            self.delete()
+
+    def test_project_is_hidden_and_purge_is_queued(self):
+        self.add_items(3)
+        self.delete()
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+        self.assertEqual(Job.objects.get().task, "projects.tasks.purge_project_task")
+        self.assertEqual(Items.objects.filter(project=self.project).count(), 3)
+
+    def test_purge_deletes_in_batches_and_resumes_after_failure(self):
+        self.add_items(25)
+        self.delete()
+        with mock.patch(
+            "projects.deletion.delete_asset_files", side_effect=RuntimeError("storage down")
+        ):
+            with self.assertRaises(RuntimeError):
+                purge_project(self.project.pk, batch_size=10)
+
+        project = Project.all_objects.get(pk=self.project.pk)
+        self.assertEqual((project.deletion_done, project.deletion_total), (25, 25))
+        self.assertFalse(Items.objects.filter(project=project).exists())
+
+        purge_project(self.project.pk, batch_size=10)
+        self.assertFalse(Project.all_objects.filter(pk=self.project.pk).exists())
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class MembershipTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username="owner", password="pass")
+        self.project = Project.objects.create(owner=self.owner, title="Launch")
+        self.item = Items.objects.create(project=self.project, title="First")
+        self.members = {}
+        for role in (Membership.Role.EDITOR, Membership.Role.VIEWER):
+            user = User.objects.create_user(username=role, password="pass")
+            Membership.objects.create(project=self.project, user=user, role=role)
+            self.members[role] = user
+
+    def login(self, user):
+        self.client.force_login(user)
+        session = self.client.session
+        store_active_project(session, self.project)
+        session.save()
+
+    def test_owner_membership_comes_with_the_project(self):
+        self.assertEqual(
+            get_project_roles(self.owner.pk), {self.project.pk: Membership.Role.OWNER}
+        )
+
+    def test_viewer_can_read_but_not_change_items(self):
+        self.login(self.members[Membership.Role.VIEWER])
+        self.assertEqual(self.client.get("/items/").status_code, 200)
+        self.assertEqual(self.client.get(f"/items/{self.item.pk}/").status_code, 200)
+        response = self.client.post("/items/create/", {"title": "Nope"})
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(f"/items/{self.item.pk}/update", {"title": "Nope"})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Items.objects.count(), 1)
+
+    def test_editor_can_change_items_but_not_the_project(self):
+        self.login(self.members[Membership.Role.EDITOR])
+        response = self.client.post("/items/create/", {"title": "Second"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Items.objects.filter(project=self.project).count(), 2)
+
+        handle = self.project.handle
+        self.assertEqual(self.client.get(f"/projects/{handle}/").status_code, 200)
+        for path in ("update", "delete", "members"):
+            response = self.client.get(f"/projects/{handle}/{path}/")
+            self.assertEqual(response.status_code, 403, path)
+
+    def test_non_member_sees_nothing(self):
+        outsider = User.objects.create_user(username="outsider", password="pass")
+        self.login(outsider)
+        self.assertEqual(self.client.get(f"/projects/{self.project.handle}/").status_code, 404)
+        response = self.client.get("/projects/")
+        self.assertNotContains(response, self.project.handle)
+
+    def test_role_changes_apply_to_the_next_request(self):
+        viewer = self.members[Membership.Role.VIEWER]
+        self.login(viewer)
+        self.assertEqual(self.client.post("/items/create/", {"title": "Draft"}).status_code, 403)
+
+        membership = Membership.objects.get(user=viewer)
+        membership.role = Membership.Role.EDITOR
+        membership.save()
+        self.assertEqual(self.client.post("/items/create/", {"title": "Draft"}).status_code, 302)
+
+        membership.delete()
+        self.assertEqual(self.client.get(f"/projects/{self.project.handle}/").status_code, 404)
+
+    def test_owner_manages_members(self):
+        self.login(self.owner)
+        url = f"/projects/{self.project.handle}/members/"
+        outsider = User.objects.create_user(username="outsider", password="pass")
+        response = self.client.post(url, {"username": "outsider", "role": "viewer"})
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        self.assertEqual(get_project_roles(outsider.pk), {self.project.pk: "viewer"})
+
+        # The owner's own role can't be changed or removed
+        response = self.client.post(url, {"username": "owner", "role": "viewer"})
+        self.assertEqual(response.status_code, 200)
+        owner_membership = Membership.objects.get(user=self.owner)
+        self.assertEqual(self.client.post(url, {"remove": owner_membership.pk}).status_code, 404)
+        self.assertEqual(self.client.post(url, {"remove": "not-an-id"}).status_code, 404)
+
+        self.client.post(url, {"remove": Membership.objects.get(user=outsider).pk})
+        self.assertEqual(get_project_roles(outsider.pk), {})
+
+    def test_removed_member_is_denied_on_their_next_request(self):
+        editor = self.members[Membership.Role.EDITOR]
+        self.login(editor)
+        handle = self.project.handle
+        # Warm the editor's cached matrix
+        self.assertEqual(self.client.get(f"/projects/{handle}/").status_code, 200)
+
+        owner = Client()
+        owner.force_login(self.owner)
+        removal = {"remove": Membership.objects.get(user=editor).pk}
+        owner.post(f"/projects/{handle}/members/", removal)
+
+        self.assertEqual(self.client.get(f"/projects/{handle}/").status_code, 404)
+        self.assertNotContains(self.client.get("/projects/"), handle)
+
+    @mock.patch("main.utils.replicas.replica_configured", lambda: True)
+    def test_matrix_is_rebuilt_from_the_primary(self):
+        with routing(use_replica=True):
+            self.assertEqual(project_roles_query(self.owner.pk).db, "default")
+
+    def test_warm_permission_checks_run_no_queries(self):
+        get_project_roles(self.owner.pk)
+        with self.assertNumQueries(0):
+            roles = get_project_roles(self.owner.pk)
+        self.assertEqual(roles, {self.project.pk: Membership.Role.OWNER})
@@ -3,6 +3,7 @@ from . import views
 
 app_name = "projects"
 
+# Literal segments here must be in models.RESERVED_HANDLES
 urlpatterns = [
     # CRUD operations
     path("", views.project_list_view, name="project_list"),
@@ -10,6 +11,7 @@ urlpatterns = [
     path("<slug:handle>/", views.project_detail_view, name="project_detail"),
     path("<slug:handle>/update/", views.project_update_view, name="project_update"),
     path("<slug:handle>/delete/", views.project_delete_view, name="project_delete"),
+    path("<slug:handle>/members/", views.project_members_view, name="project_members"),
     path(
         "activate/<str:handle>/", views.activate_prject_views, name="project_activate"
     ),
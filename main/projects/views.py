@@ -1,26 +1,39 @@
 from django.contrib import messages
-from django.shortcuts import redirect, render, get_object_or_404
-from django.contrib.auth.decorators import login_required
-from .models import Project, AnonymousProject
-from .forms import ProjectForm
-from items.models import Items
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect, render
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from activity.log import record
+from activity.models import Activity
+from .models import Membership, Project
+from .deletion import request_project_deletion
+from .forms import MembershipForm, MembershipRemoveForm, ProjectForm
+from .middleware import clear_active_project, store_active_project
+from .permissions import (
+    CHANGE_PROJECT,
+    DELETE_PROJECT,
+    MANAGE_MEMBERS,
+    arequest_project_roles,
+    check_project_permission,
+    project_permissions,
+    request_project_roles,
+)
+from main.utils.asyncviews import aget_object_or_404, arender, login_required
+from main.utils.conditional import conditional_page
+from main.utils.fragments import aattach_cached_fragments
+from main.utils.pagination import apaginate_request
 
 
 def delete_project_from_session(request):
-    try:
-        del request.session["project_handle"]
-    except:
-        pass
-    try:
-        request.project = AnonymousProject()
-    except:
-        pass
+    clear_active_project(request.session)
+    request.active_project = None
 
 
 # Create your views here.
 def activate_prject_views(request, handle=None):
+    roles = request_project_roles(request)
     try:
-        project_obj = Project.objects.get(owner=request.user, handle=handle)  # type: ignore
+        project_obj = Project.objects.get(handle=handle, pk__in=roles)  # type: ignore
     except Project.DoesNotExist:  # type: ignore
         project_obj = None
 
@@ -29,7 +42,8 @@ def activate_prject_views(request, handle=None):
         messages.error(request, "Project could not activate, try again")
         return redirect("/")
 
-    request.session["project_handle"] = handle
+    store_active_project(request.session, project_obj)
+    record(Activity.Verb.ACTIVATED, project_obj)
     messages.success(request, "Project activated successfully")
     return redirect("/")
 
@@ -40,52 +54,123 @@ def deactivate_prject_views(request, handle=None):
     return redirect("/")
 
 
+def deleting_projects_filter(request):
+    # Only the owner sees a deleted project's progress; members lose it at once
+    return Q(owner=request.user, deletion_requested_at__isnull=False)
+
+
+async def project_list_stamp(request):
+    # Includes projects being deleted: their progress is shown and bumps `updated`
+    roles = await arequest_project_roles(request)
+    stats = await Project.all_objects.filter(  # type: ignore
+        Q(pk__in=roles) | deleting_projects_filter(request)
+    ).aaggregate(  # type: ignore
+        latest=Max("updated"),
+        count=Count("id", filter=Q(deletion_requested_at__isnull=True)),
+        deleting=Count("id", filter=Q(deletion_requested_at__isnull=False)),
+    )
+    request.projects_stats = stats
+    return (stats["latest"], stats["count"], stats["deleting"]), stats["latest"]
+
+
+async def project_detail_stamp(request, handle=None):
+    # Editing an item doesn't touch the project, so the feed has its own stamp
+    latest_activity = (
+        Activity.objects.filter(project=OuterRef("pk"))  # type: ignore
+        .order_by("-timestamp", "-id")
+        .values("id")[:1]
+    )
+    roles = await arequest_project_roles(request)
+    row = await (
+        Project.objects.filter(handle=handle, pk__in=roles)  # type: ignore
+        .values_list("updated", Subquery(latest_activity))
+        .afirst()
+    )
+    if row is None:
+        return None
+    updated, activity_id = row
+    return (handle, updated, activity_id), updated
+
+
 # CRUD Views
 @login_required
-def project_list_view(request):
-    """List all projects owned by the current user"""
-    projects = Project.objects.filter(owner=request.user).order_by("-updated")  # type: ignore
+@conditional_page(project_list_stamp)
+async def project_list_view(request):
+    """List all projects the current user is a member of"""
+    roles = await arequest_project_roles(request)
+    projects_qs = Project.objects.filter(pk__in=roles)  # type: ignore
+    page = await apaginate_request(request, projects_qs)
+    await aattach_cached_fragments(
+        page, "projects/card.html", "updated", context_name="project"
+    )
+    stats = getattr(request, "projects_stats", None)
+    projects_count = stats["count"] if stats else await projects_qs.acount()
+    deleting = []
+    if stats is None or stats["deleting"]:
+        deleting = [
+            row
+            async for row in Project.all_objects.filter(  # type: ignore
+                deleting_projects_filter(request)
+            ).values("title", "deletion_total", "deletion_done")
+        ]
     context = {
-        "object_list": projects,
+        "object_list": page,
+        "projects_count": projects_count,
+        "deleting_projects": deleting,
         "active_project": getattr(request, "active_project", None),
     }
-    return render(request, "projects/list.html", context)
+    return await arender(request, "projects/list.html", context)
 
 
 @login_required
-def project_detail_view(request, id=None):
+@conditional_page(project_detail_stamp)
+async def project_detail_view(request, handle=None):
     """Show details of a specific project"""
-    project = get_object_or_404(Project, id=id, owner=request.user)
+    roles = await arequest_project_roles(request)
+    project = await aget_object_or_404(
+        Project.objects, handle=handle, pk__in=roles  # type: ignore
+    )
+    activity = await apaginate_request(
+        request, Activity.objects.filter(project=project)  # type: ignore
+    )
     context = {
         "object": project,
+        "role": roles[project.pk],
+        "permissions": project_permissions(roles, project),
+        "activity": activity,
         "active_project": getattr(request, "active_project", None),
     }
-    return render(request, "projects/detail.html", context)
+    return await arender(request, "projects/detail.html", context)
 
 
 @login_required
-def project_create_view(request):
+async def project_create_view(request):
     """Create a new project"""
     form = ProjectForm(request.POST or None)
     if form.is_valid():
         project = form.save(commit=False)
         project.owner = request.user
-        project.save()
+        await project.asave()
         messages.success(request, f"Project '{project.title}' created successfully!")
-        return redirect("projects:project_detail", id=project.id)
+        return redirect("projects:project_detail", handle=project.handle)
 
     context = {"form": form, "active_project": getattr(request, "active_project", None)}
-    return render(request, "projects/create.html", context)
+    return await arender(request, "projects/create.html", context)
 
 
 @login_required
-def project_update_view(request, handle=None):
+async def project_update_view(request, handle=None):
     """Update an existing project"""
-    project = get_object_or_404(Project, handle=handle, owner=request.user)
+    roles = await arequest_project_roles(request)
+    project = await aget_object_or_404(
+        Project.objects, handle=handle, pk__in=roles  # type: ignore
+    )
+    check_project_permission(roles, project, CHANGE_PROJECT)
     form = ProjectForm(request.POST or None, instance=project)
 
     if form.is_valid():
-        updated_project = form.save()
+        updated_project = form.save(commit=False)
+        await updated_project.asave()
         messages.success(
             request, f"Project '{updated_project.title}' updated successfully!"
         )
@@ -96,23 +181,17 @@ def project_update_view(request, handle=None):
         "object": project,
         "active_project": getattr(request, "active_project", None),
     }
-    return render(request, "projects/update.html", context)
+    return await arender(request, "projects/update.html", context)
 
 
 @login_required
-def project_delete_view(request, handle=None):
-    """Delete an existing project"""
-    project = get_object_or_404(Project, handle=handle, owner=request.user)
-    items_qs = Items.objects.filter(project=project).all()
-    items_count = items_qs.count()
-    items_exist = items_count.exists()
-
-    if items_exist and items_count > 10:
-        messages.error(
-            request,
-            "Project has items associated with it. Please delete the items first.",
-        )
-        return redirect(project.get_delete_url(), handle=handle)
+async def project_delete_view(request, handle=None):
+    """Delete an existing project; its contents are removed in the background"""
+    roles = await arequest_project_roles(request)
+    project = await aget_object_or_404(
+        Project.objects.select_related("owner"), handle=handle, pk__in=roles  # type: ignore
+    )
+    check_project_permission(roles, project, DELETE_PROJECT)
 
     if request.method == "POST":
         # Check confirmation
@@ -128,9 +207,11 @@ def project_delete_view(request, handle=None):
                 and request.active_project.handle == project.handle
             ):
                 delete_project_from_session(request)
-            project.delete()
+            await sync_to_async(request_project_deletion)(project)
             messages.success(
-                request, f"Project '{project_title}' deleted successfully!"
+                request,
+                f"Project '{project_title}' deleted. "
+                "Its items are being removed in the background.",
             )
             return redirect("projects:project_list")
         else:
@@ -143,4 +224,44 @@ def project_delete_view(request, handle=None):
         "object": project,
         "active_project": getattr(request, "active_project", None),
     }
-    return render(request, "projects/delete.html", context)
+    return await arender(request, "projects/delete.html", context)
+
+
+@login_required
+def project_members_view(request, handle=None):
+    """List a project's members; the owner adds, re-roles and removes them"""
+    roles = request_project_roles(request)
+    project = get_object_or_404(Project.objects, handle=handle, pk__in=roles)  # type: ignore
+    check_project_permission(roles, project, MANAGE_MEMBERS)
+    memberships = project.memberships.select_related("user").order_by("timestamp")
+
+    form = MembershipForm(project=project)
+    if request.method == "POST":
+        if "remove" in request.POST:
+            remove_form = MembershipRemoveForm(request.POST, project=project)
+            if not remove_form.is_valid():
+                # Not one of the removable memberships (or not an id at all)
+                raise Http404("No such member.")
+            membership = remove_form.cleaned_data["remove"]
+            membership.delete()
+            messages.success(request, f"Removed {membership.user.username} from the project.")
+            return redirect("projects:project_members", handle=project.handle)
+
+        form = MembershipForm(request.POST, project=project)
+        if form.is_valid():
+            membership, created = Membership.objects.update_or_create(  # type: ignore
+                project=project, user=form.member, defaults={"role": form.cleaned_data["role"]}
+            )
+            verb = "Added" if created else "Updated"
+            messages.success(
+                request, f"{verb} {form.member.username} as {membership.get_role_display().lower()}."
+            )
+            return redirect("projects:project_members", handle=project.handle)
+
+    context = {
+        "object": project,
+        "memberships": memberships,
+        "form": form,
+        "active_project": getattr(request, "active_project", None),
+    }
+    return render(request, "projects/members.html", context)